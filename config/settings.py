@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'drf_spectacular',
     'catalog',
@@ -110,6 +111,42 @@ ELASTICSEARCH = {
 }
 
 
+PRODUCT_GATEWAY = {
+    'backend': os.environ.get('PRODUCT_GATEWAY_BACKEND', 'fakestore'),
+    'mirror_fallback': os.environ.get('PRODUCT_MIRROR_FALLBACK', 'true').lower() in ('1', 'true', 'yes'),
+    'base_url': os.environ.get('PRODUCT_API_URL', 'https://fakestoreapi.com'),
+    'connect_timeout': float(os.environ.get('PRODUCT_API_CONNECT_TIMEOUT', '2')),
+    'read_timeout': float(os.environ.get('PRODUCT_API_READ_TIMEOUT', os.environ.get('PRODUCT_API_TIMEOUT', '5'))),
+    'pool_size': int(os.environ.get('PRODUCT_API_POOL_SIZE', '10')),
+    'keep_alive': os.environ.get('PRODUCT_API_KEEP_ALIVE', 'true').lower() in ('1', 'true', 'yes'),
+    'max_workers': int(os.environ.get('PRODUCT_API_MAX_WORKERS', '8')),
+    'batch_deadline': float(os.environ.get('PRODUCT_API_BATCH_DEADLINE', '8')),
+    'cache_backend': os.environ.get('PRODUCT_CACHE_BACKEND', 'local') or None,
+    'cache_alias': os.environ.get('PRODUCT_CACHE_ALIAS', 'default'),
+    'cache_ttl': float(os.environ.get('PRODUCT_CACHE_TTL', '300')),
+    'cache_max_entries': int(os.environ.get('PRODUCT_CACHE_MAX_ENTRIES', '1024')),
+    'negative_cache_ttl': float(os.environ.get('PRODUCT_NEGATIVE_CACHE_TTL', '30')),
+    'negative_cache_max_entries': int(os.environ.get('PRODUCT_NEGATIVE_CACHE_MAX_ENTRIES', '4096')),
+    'resilience_enabled': os.environ.get('PRODUCT_RESILIENCE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'refresh_workers': int(os.environ.get('PRODUCT_REFRESH_WORKERS', '2')),
+    'breaker_failure_threshold': int(os.environ.get('PRODUCT_BREAKER_FAILURE_THRESHOLD', '5')),
+    'breaker_reset_timeout': float(os.environ.get('PRODUCT_BREAKER_RESET_TIMEOUT', '30')),
+    'stale_ttl': float(os.environ.get('PRODUCT_STALE_TTL', '86400')),
+    'stale_max_entries': int(os.environ.get('PRODUCT_STALE_MAX_ENTRIES', '4096')),
+}
+
+# Seconds before the product details stored on a favorite are refreshed on read.
+FAVORITE_SNAPSHOT_MAX_AGE = float(os.environ.get('FAVORITE_SNAPSHOT_MAX_AGE', '86400'))
+
+# In-process cache of enriched favorite pages, keyed by customer and favorites version.
+FAVORITE_LIST_CACHE = {
+    'enabled': os.environ.get('FAVORITE_LIST_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'ttl': float(os.environ.get('FAVORITE_LIST_CACHE_TTL', '60')),
+    'max_entries': int(os.environ.get('FAVORITE_LIST_CACHE_MAX_ENTRIES', '10000')),
+    'max_pages_per_customer': int(os.environ.get('FAVORITE_LIST_CACHE_MAX_PAGES', '8')),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -156,13 +193,30 @@ AUTH_USER_MODEL = 'user.Customer'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CustomerJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Tokens carry the customer's id, flags and token version, so requests are
+# authenticated from the claims plus a cached version check instead of a
+# customer lookup. A revocation reaches other processes within ``ttl`` seconds.
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'user.authentication.CustomerTokenObtainPairSerializer',
+    'TOKEN_USER_CLASS': 'user.authentication.CustomerTokenUser',
+}
+
+JWT_TOKEN_VERSION_CACHE = {
+    'ttl': float(os.environ.get('JWT_TOKEN_VERSION_CACHE_TTL', '30')),
+    'max_entries': int(os.environ.get('JWT_TOKEN_VERSION_CACHE_MAX_ENTRIES', '10000')),
+}
+
+# Default and maximum ``limit`` of cursor-paginated endpoints.
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '200'))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'desafio-aiqfome API',
     'DESCRIPTION': 'API for managing customers and their favorite products.',
@@ -1,7 +1,22 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.forms import AdminPasswordChangeForm
 
-from .models import Customer, Favorite
+from .application import RevokeCustomerTokens
+from .infrastructure import DjangoCustomerRepository
+from .models import Customer, Favorite, FavoriteChange, Product, ProductPopularity
+
+
+class CustomerPasswordChangeForm(AdminPasswordChangeForm):
+    """Admin password form that also revokes the tokens issued so far.
+
+    The version is bumped here rather than in ``set_password``, which Django
+    also calls when it upgrades a password hash on login.
+    """
+
+    def save(self, commit=True):
+        self.user.token_version += 1
+        return super().save(commit=commit)
 
 
 @admin.register(Customer)
@@ -9,7 +24,8 @@ class CustomerAdmin(UserAdmin):
     """Admin configuration for the customer model."""
 
     model = Customer
-    list_display = ("email", "name", "is_active", "is_staff")
+    change_password_form = CustomerPasswordChangeForm
+    list_display = ("email", "name", "is_active", "is_staff", "deleted_at")
     ordering = ("email",)
     search_fields = ("email", "name")
 
@@ -17,6 +33,7 @@ class CustomerAdmin(UserAdmin):
         (None, {"fields": ("email", "password", "name")}),
         ("Permissions", {"fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions")}),
         ("Important dates", {"fields": ("last_login", "date_joined")}),
+        ("Deletion", {"fields": ("deleted_at", "purged_rows")}),
     )
     add_fieldsets = (
         (
@@ -27,7 +44,50 @@ class CustomerAdmin(UserAdmin):
             },
         ),
     )
-    readonly_fields = ("date_joined", "last_login")
+    readonly_fields = ("date_joined", "last_login", "deleted_at", "purged_rows")
+    actions = ("revoke_tokens",)
+
+    # Issued tokens carry these flags, so changing one revokes them.
+    token_claim_fields = ("is_active", "is_staff")
+
+    def save_model(self, request, obj, form, change):
+        if change and any(field in form.changed_data for field in self.token_claim_fields):
+            obj.token_version += 1
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Revoke issued tokens")
+    def revoke_tokens(self, request, queryset):
+        use_case = RevokeCustomerTokens(DjangoCustomerRepository())
+        customer_ids = list(queryset.filter(deleted_at__isnull=True).values_list("pk", flat=True))
+        for customer_id in customer_ids:
+            use_case.execute(customer_id=customer_id)
+        self.message_user(request, f"Revoked the tokens of {len(customer_ids)} customer(s).")
+
+
+class MostFavoritedProductFilter(admin.SimpleListFilter):
+    """Filter favorites by product, offering the most favorited products.
+
+    Choices come from the popularity counters instead of a DISTINCT over
+    the whole favorites table.
+    """
+
+    title = "product"
+    parameter_name = "product_id"
+    max_choices = 20
+
+    def lookups(self, request, model_admin):
+        top = (
+            ProductPopularity.objects.filter(favorite_count__gt=0)
+            .order_by("-favorite_count", "product_id")
+            .values_list("product_id", "favorite_count")[: self.max_choices]
+        )
+        return [(str(product_id), f"{product_id} ({count})") for product_id, count in top]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(product_id=int(value))
+        return queryset
 
 
 @admin.register(Favorite)
@@ -36,4 +96,32 @@ class FavoriteAdmin(admin.ModelAdmin):
 
     list_display = ("customer", "product_id", "created_at")
     search_fields = ("customer__email", "customer__name")
-    list_filter = ("product_id",)
+    list_filter = (MostFavoritedProductFilter,)
+
+
+@admin.register(FavoriteChange)
+class FavoriteChangeAdmin(admin.ModelAdmin):
+    """Read-only view of the favorites change log."""
+
+    list_display = ("id", "customer", "product_id", "action", "created_at")
+    search_fields = ("customer__email",)
+    list_filter = ("action",)
+    readonly_fields = ("customer", "product_id", "action", "created_at")
+
+
+@admin.register(ProductPopularity)
+class ProductPopularityAdmin(admin.ModelAdmin):
+    """Read-only view of the per-product favorite counters."""
+
+    list_display = ("product_id", "favorite_count", "updated_at")
+    ordering = ("-favorite_count", "product_id")
+    readonly_fields = ("product_id", "favorite_count", "updated_at")
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    """Read-only view of the local product catalog mirror."""
+
+    list_display = ("id", "title", "category", "price", "synced_at")
+    search_fields = ("title",)
+    readonly_fields = ("content_hash", "synced_at")
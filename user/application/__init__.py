@@ -1,13 +1,55 @@
-from .favorite_use_cases import AddFavorite, ListFavorites, RemoveFavorite
-from .use_cases import CreateCustomer, DeleteCustomer, GetCustomer, ListCustomers, UpdateCustomer
+from .favorite_use_cases import (
+    AddFavorite,
+    AddFavorites,
+    AsyncAddFavorite,
+    AsyncAddFavorites,
+    AsyncListFavorites,
+    AsyncSyncFavorites,
+    CompactFavoriteChanges,
+    ExportProductFavoriters,
+    GetFavoritesVersion,
+    ListFavoriteChanges,
+    ListFavorites,
+    ListMostFavoritedProducts,
+    ReconcileProductPopularity,
+    RefreshFavoriteSnapshots,
+    RemoveFavorite,
+    SyncFavorites,
+)
+from .use_cases import (
+    CreateCustomer,
+    DeleteCustomer,
+    ExportCustomers,
+    GetCustomer,
+    ListCustomers,
+    PurgeDeletedCustomers,
+    RevokeCustomerTokens,
+    UpdateCustomer,
+)
 
 __all__ = [
     "CreateCustomer",
     "DeleteCustomer",
+    "ExportCustomers",
     "GetCustomer",
     "ListCustomers",
+    "PurgeDeletedCustomers",
+    "RevokeCustomerTokens",
     "UpdateCustomer",
     "AddFavorite",
+    "AddFavorites",
     "ListFavorites",
+    "AsyncAddFavorite",
+    "AsyncAddFavorites",
+    "AsyncListFavorites",
+    "SyncFavorites",
+    "AsyncSyncFavorites",
     "RemoveFavorite",
+    "ListFavoriteChanges",
+    "CompactFavoriteChanges",
+    "ListMostFavoritedProducts",
+    "ExportProductFavoriters",
+    "ReconcileProductPopularity",
+    "GetFavoritesVersion",
+    "RefreshFavoriteSnapshots",
 ]
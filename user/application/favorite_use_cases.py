@@ -1,53 +1,542 @@
 from __future__ import annotations
 
-from user.domain import FavoriteDTO, FavoriteRepository, ProductGateway, ProductNotFoundError
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from asgiref.sync import sync_to_async
+
+from user.domain import (
+    AsyncProductGateway,
+    BulkFavoriteResultDTO,
+    FavoriteChangeDTO,
+    FavoriteDTO,
+    FavoriteListCache,
+    FavoriteRepository,
+    FavoriteSyncResultDTO,
+    PageDTO,
+    ProductGateway,
+    ProductPopularityDTO,
+    ProductNotFoundError,
+)
+
+
+def _stale_product_ids(favorites: Sequence[FavoriteDTO], max_age: Optional[float]) -> List[int]:
+    """Product ids whose stored snapshot is missing or older than ``max_age`` seconds."""
+    now = datetime.now(timezone.utc)
+    stale = []
+    for favorite in favorites:
+        if favorite.snapshot_at is None:
+            stale.append(favorite.product_id)
+        elif max_age is not None and (now - favorite.snapshot_at).total_seconds() > max_age:
+            stale.append(favorite.product_id)
+    return list(dict.fromkeys(stale))
+
+
+def _with_product_details(
+    favorites: Sequence[FavoriteDTO],
+    details_by_id: Dict[int, Optional[Dict[str, Any]]],
+) -> List[FavoriteDTO]:
+    """Overlay freshly fetched details; favorites without them keep their snapshot."""
+    now = datetime.now(timezone.utc)
+    detailed = []
+    for favorite in favorites:
+        details = details_by_id.get(favorite.product_id)
+        if details is None:
+            detailed.append(favorite)
+            continue
+        detailed.append(
+            replace(
+                favorite,
+                title=details.get("title"),
+                image=details.get("image"),
+                price=details.get("price"),
+                review=details.get("review"),
+                snapshot_at=now,
+            )
+        )
+    return detailed
+
+
+def _found(details_by_id: Dict[int, Optional[Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+    return {product_id: details for product_id, details in details_by_id.items() if details is not None}
+
+
+def _split_page(favorites: Sequence[FavoriteDTO], limit: int) -> Tuple[List[FavoriteDTO], Optional[int]]:
+    """Trim a ``limit + 1`` lookahead fetch to one page and its next keyset position."""
+    page = list(favorites[:limit])
+    next_after = page[-1].id if len(favorites) > limit and page else None
+    return page, next_after
+
+
+def _bulk_results(
+    product_ids: Sequence[int],
+    known: Set[int],
+    added: Set[int],
+) -> List[BulkFavoriteResultDTO]:
+    """``known`` holds stored and validated ids; a validated id missing from ``added`` was stored concurrently."""
+    results = []
+    for product_id in product_ids:
+        if product_id in added:
+            status = BulkFavoriteResultDTO.ADDED
+        elif product_id in known:
+            status = BulkFavoriteResultDTO.DUPLICATE
+        else:
+            status = BulkFavoriteResultDTO.UNKNOWN_PRODUCT
+        results.append(BulkFavoriteResultDTO(product_id=product_id, status=status))
+    return results
+
+
+def _sync_result(
+    desired: Sequence[int],
+    stored: Set[int],
+    found: Dict[int, Dict[str, Any]],
+) -> FavoriteSyncResultDTO:
+    new_ids = [product_id for product_id in desired if product_id not in stored]
+    return FavoriteSyncResultDTO(
+        added=[product_id for product_id in new_ids if product_id in found],
+        removed=sorted(stored - set(desired)),
+        unknown_products=[product_id for product_id in new_ids if product_id not in found],
+    )
+
+
+def _applied(result: FavoriteSyncResultDTO, added: Set[int], removed: Set[int]) -> FavoriteSyncResultDTO:
+    """Keep only the changes written, dropping those a concurrent request made first."""
+    return replace(
+        result,
+        added=[product_id for product_id in result.added if product_id in added],
+        removed=[product_id for product_id in result.removed if product_id in removed],
+    )
+
+
+def _invalidate(cache: Optional[FavoriteListCache], customer_id: int) -> None:
+    if cache is not None:
+        cache.invalidate(customer_id)
+
+
+def _all_snapshotted(favorites: Sequence[FavoriteDTO]) -> bool:
+    return all(favorite.snapshot_at is not None for favorite in favorites)
 
 
 class AddFavorite:
-    """Use case for marking a product as favorite for a customer."""
+    """Use case for marking a product as favorite for a customer.
 
-    def __init__(self, repository: FavoriteRepository, product_gateway: ProductGateway):
+    The details fetched to validate the product are stored on the favorite
+    as a snapshot, so listing favorites does not need the product service.
+    """
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: ProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
         self._repository = repository
         self._product_gateway = product_gateway
+        self._cache = cache
 
     def execute(self, *, customer_id: int, product_id: int) -> FavoriteDTO:
-        if not self._product_gateway.exists(product_id):
+        details = self._product_gateway.get_details(product_id)
+        if details is None:
             raise ProductNotFoundError(product_id)
 
-        return self._repository.add(customer_id=customer_id, product_id=product_id)
+        favorite = self._repository.add(customer_id=customer_id, product_id=product_id, details=details)
+        _invalidate(self._cache, customer_id)
+        return favorite
+
+
+class AddFavorites:
+    """Use case for marking many products as favorite in one go.
+
+    Products already favorited are skipped before validation; the rest are
+    validated with one batched gateway call and inserted in one statement.
+    """
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: ProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._cache = cache
+
+    def execute(self, *, customer_id: int, product_ids: Iterable[int]) -> List[BulkFavoriteResultDTO]:
+        product_ids = list(dict.fromkeys(product_ids))
+        existing = self._repository.existing_product_ids(customer_id=customer_id, product_ids=product_ids)
+        candidates = [product_id for product_id in product_ids if product_id not in existing]
+
+        found = _found(self._product_gateway.get_many(candidates)) if candidates else {}
+        added = self._repository.add_many(customer_id=customer_id, details_by_product_id=found)
+        if added:
+            _invalidate(self._cache, customer_id)
+        return _bulk_results(product_ids, existing | set(found), added)
+
+
+class SyncFavorites:
+    """Use case replacing a customer's favorites with a desired set of products.
+
+    The stored set is read in one query and only products that are new to the
+    customer are validated; inserts and deletions are applied in one transaction.
+    Unknown products are reported and left out.
+    """
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: ProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._cache = cache
+
+    def execute(self, *, customer_id: int, product_ids: Iterable[int]) -> FavoriteSyncResultDTO:
+        desired = list(dict.fromkeys(product_ids))
+        stored = self._repository.existing_product_ids(customer_id=customer_id)
+        new_ids = [product_id for product_id in desired if product_id not in stored]
+
+        found = _found(self._product_gateway.get_many(new_ids)) if new_ids else {}
+        result = _sync_result(desired, stored, found)
+        if result.added or result.removed:
+            added, removed = self._repository.apply_diff(customer_id=customer_id, add=found, remove=result.removed)
+            result = _applied(result, added, removed)
+            _invalidate(self._cache, customer_id)
+        return result
 
 
 class ListFavorites:
-    """Use case for listing all favorites of a customer with product details."""
+    """Use case for listing all favorites of a customer with product details.
 
-    def __init__(self, repository: FavoriteRepository, product_gateway: ProductGateway):
+    Details come from the snapshots stored on each favorite. Only snapshots
+    that are missing or older than ``snapshot_max_age`` seconds are refreshed
+    through the product gateway; if that refresh fails, stored snapshots are
+    served as they are. Refreshed details are written to the requesting
+    customer's rows only and leave the favorites version alone, since the
+    listing already serves them.
+
+    With a ``cache`` and the customer's favorites ``version``, enriched pages
+    are served from the cache until the next write bumps the version.
+    """
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: ProductGateway,
+        *,
+        snapshot_max_age: float | None = None,
+        cache: FavoriteListCache | None = None,
+    ):
         self._repository = repository
         self._product_gateway = product_gateway
+        self._snapshot_max_age = snapshot_max_age
+        self._cache = cache
 
     def execute(self, *, customer_id: int):
-        favorites = self._repository.list(customer_id=customer_id)
-        detailed = []
-        for favorite in favorites:
-            details = self._product_gateway.get_details(favorite.product_id)
-            detailed.append(
-                FavoriteDTO(
-                    id=favorite.id,
-                    customer_id=favorite.customer_id,
-                    product_id=favorite.product_id,
-                    title=(details or {}).get("title"),
-                    image=(details or {}).get("image"),
-                    price=(details or {}).get("price"),
-                    review=(details or {}).get("review"),
-                )
+        return self._with_snapshots(customer_id, self._repository.list(customer_id=customer_id))
+
+    def execute_page(
+        self,
+        *,
+        customer_id: int,
+        limit: int,
+        after: int | None = None,
+        version: int | None = None,
+    ) -> PageDTO[FavoriteDTO]:
+        """Return at most ``limit`` favorites with ids greater than ``after``.
+
+        Only the favorites on the page are enriched, so the cost depends on
+        the page size rather than on how many favorites the customer has.
+        ``version`` must be read before calling so a cached page is never
+        newer than the version it is stored under.
+        """
+        use_cache = self._cache is not None and version is not None
+        if use_cache:
+            cached = self._cache.get(customer_id=customer_id, version=version, after=after, limit=limit)
+            if cached is not None:
+                return cached
+
+        favorites = self._repository.list(customer_id=customer_id, after=after, limit=limit + 1)
+        items, next_after = _split_page(favorites, limit)
+        page = PageDTO(items=self._with_snapshots(customer_id, items), next_after=next_after)
+        if use_cache:
+            self._cache.set(customer_id=customer_id, version=version, after=after, limit=limit, page=page)
+        return page
+
+    def _with_snapshots(self, customer_id: int, favorites: Sequence[FavoriteDTO]) -> List[FavoriteDTO]:
+        stale_ids = _stale_product_ids(favorites, self._snapshot_max_age)
+        if not stale_ids:
+            return list(favorites)
+
+        try:
+            details_by_id = self._product_gateway.get_many(stale_ids)
+        except RuntimeError:
+            if not _all_snapshotted(favorites):
+                raise
+            return list(favorites)
+
+        self._repository.save_snapshots(details_by_id, customer_id=customer_id)
+        return _with_product_details(favorites, details_by_id)
+
+
+class AsyncAddFavorite:
+    """Async variant of ``AddFavorite`` for views served under ASGI."""
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: AsyncProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._cache = cache
+
+    async def execute(self, *, customer_id: int, product_id: int) -> FavoriteDTO:
+        details = await self._product_gateway.get_details(product_id)
+        if details is None:
+            raise ProductNotFoundError(product_id)
+
+        favorite = await sync_to_async(self._repository.add)(
+            customer_id=customer_id,
+            product_id=product_id,
+            details=details,
+        )
+        _invalidate(self._cache, customer_id)
+        return favorite
+
+
+class AsyncAddFavorites:
+    """Async variant of ``AddFavorites``."""
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: AsyncProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._cache = cache
+
+    async def execute(self, *, customer_id: int, product_ids: Iterable[int]) -> List[BulkFavoriteResultDTO]:
+        product_ids = list(dict.fromkeys(product_ids))
+        existing = await sync_to_async(self._repository.existing_product_ids)(
+            customer_id=customer_id,
+            product_ids=product_ids,
+        )
+        candidates = [product_id for product_id in product_ids if product_id not in existing]
+
+        found = _found(await self._product_gateway.get_many(candidates)) if candidates else {}
+        added = await sync_to_async(self._repository.add_many)(customer_id=customer_id, details_by_product_id=found)
+        if added:
+            _invalidate(self._cache, customer_id)
+        return _bulk_results(product_ids, existing | set(found), added)
+
+
+class AsyncSyncFavorites:
+    """Async variant of ``SyncFavorites``."""
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: AsyncProductGateway,
+        *,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._cache = cache
+
+    async def execute(self, *, customer_id: int, product_ids: Iterable[int]) -> FavoriteSyncResultDTO:
+        desired = list(dict.fromkeys(product_ids))
+        stored = await sync_to_async(self._repository.existing_product_ids)(customer_id=customer_id)
+        new_ids = [product_id for product_id in desired if product_id not in stored]
+
+        found = _found(await self._product_gateway.get_many(new_ids)) if new_ids else {}
+        result = _sync_result(desired, stored, found)
+        if result.added or result.removed:
+            added, removed = await sync_to_async(self._repository.apply_diff)(
+                customer_id=customer_id,
+                add=found,
+                remove=result.removed,
             )
-        return detailed
+            result = _applied(result, added, removed)
+            _invalidate(self._cache, customer_id)
+        return result
+
+
+class AsyncListFavorites:
+    """Async variant of ``ListFavorites``; product lookups overlap on the event loop."""
+
+    def __init__(
+        self,
+        repository: FavoriteRepository,
+        product_gateway: AsyncProductGateway,
+        *,
+        snapshot_max_age: float | None = None,
+        cache: FavoriteListCache | None = None,
+    ):
+        self._repository = repository
+        self._product_gateway = product_gateway
+        self._snapshot_max_age = snapshot_max_age
+        self._cache = cache
+
+    async def execute(self, *, customer_id: int):
+        favorites = await sync_to_async(self._repository.list)(customer_id=customer_id)
+        return await self._with_snapshots(customer_id, favorites)
+
+    async def execute_page(
+        self,
+        *,
+        customer_id: int,
+        limit: int,
+        after: int | None = None,
+        version: int | None = None,
+    ) -> PageDTO[FavoriteDTO]:
+        # The cache is in-process and never blocks, so it is used directly on the loop.
+        use_cache = self._cache is not None and version is not None
+        if use_cache:
+            cached = self._cache.get(customer_id=customer_id, version=version, after=after, limit=limit)
+            if cached is not None:
+                return cached
+
+        favorites = await sync_to_async(self._repository.list)(
+            customer_id=customer_id,
+            after=after,
+            limit=limit + 1,
+        )
+        items, next_after = _split_page(favorites, limit)
+        page = PageDTO(items=await self._with_snapshots(customer_id, items), next_after=next_after)
+        if use_cache:
+            self._cache.set(customer_id=customer_id, version=version, after=after, limit=limit, page=page)
+        return page
+
+    async def _with_snapshots(self, customer_id: int, favorites: Sequence[FavoriteDTO]) -> List[FavoriteDTO]:
+        stale_ids = _stale_product_ids(favorites, self._snapshot_max_age)
+        if not stale_ids:
+            return list(favorites)
+
+        try:
+            details_by_id = await self._product_gateway.get_many(stale_ids)
+        except RuntimeError:
+            if not _all_snapshotted(favorites):
+                raise
+            return list(favorites)
+
+        await sync_to_async(self._repository.save_snapshots)(details_by_id, customer_id=customer_id)
+        return _with_product_details(favorites, details_by_id)
 
 
 class RemoveFavorite:
     """Use case for removing an existing favorite."""
 
-    def __init__(self, repository: FavoriteRepository):
+    def __init__(self, repository: FavoriteRepository, *, cache: FavoriteListCache | None = None):
         self._repository = repository
+        self._cache = cache
 
     def execute(self, *, customer_id: int, product_id: int) -> None:
         self._repository.remove(customer_id=customer_id, product_id=product_id)
+        _invalidate(self._cache, customer_id)
+
+
+class GetFavoritesVersion:
+    """Use case returning the version counter of a customer's favorites."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, customer_id: int) -> int:
+        return self._repository.favorites_version(customer_id=customer_id)
+
+
+class ListFavoriteChanges:
+    """Use case returning a customer's favorite changes after a known sequence."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, customer_id: int, since: int = 0, limit: int = 100) -> PageDTO[FavoriteChangeDTO]:
+        """Return up to ``limit`` changes with ``next_after`` set to the last sequence when more remain."""
+        changes = list(
+            self._repository.changes_since(customer_id=customer_id, since=since, limit=limit + 1)
+        )
+        if len(changes) <= limit:
+            return PageDTO(items=changes, next_after=None)
+        changes = changes[:limit]
+        return PageDTO(items=changes, next_after=changes[-1].sequence)
+
+
+class CompactFavoriteChanges:
+    """Use case dropping change log entries superseded by a later change."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, batch_size: int = 10000) -> int:
+        return self._repository.compact_changes(batch_size=max(1, int(batch_size)))
+
+
+class ListMostFavoritedProducts:
+    """Use case returning the products favorited by the most customers."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, limit: int = 10) -> List[ProductPopularityDTO]:
+        return list(self._repository.most_favorited(limit=limit))
+
+
+class ExportProductFavoriters:
+    """Use case streaming the ids of customers who favorited a product."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, product_id: int, after: Optional[int] = None, batch_size: int = 2000) -> Iterator[int]:
+        return self._repository.iterate_customer_ids(
+            product_id=product_id,
+            after=after,
+            batch_size=max(1, int(batch_size)),
+        )
+
+
+class ReconcileProductPopularity:
+    """Use case correcting the per-product favorite counters against the favorites table."""
+
+    def __init__(self, repository: FavoriteRepository):
+        self._repository = repository
+
+    def execute(self, *, batch_size: int = 1000) -> int:
+        return self._repository.reconcile_popularity(batch_size=max(1, int(batch_size)))
+
+
+class RefreshFavoriteSnapshots:
+    """Use case refreshing stored product snapshots in batches."""
+
+    def __init__(self, repository: FavoriteRepository, product_gateway: ProductGateway):
+        self._repository = repository
+        self._product_gateway = product_gateway
+
+    def execute(self, *, max_age: float | None = None, batch_size: int = 100) -> int:
+        """Refresh snapshots older than ``max_age`` seconds (all when ``None``).
+
+        Returns the number of favorite rows updated.
+        """
+        older_than = None
+        if max_age is not None:
+            older_than = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+
+        product_ids = self._repository.snapshot_product_ids(older_than=older_than)
+        batch_size = max(1, int(batch_size))
+        updated = 0
+        for start in range(0, len(product_ids), batch_size):
+            details_by_id = self._product_gateway.get_many(product_ids[start:start + batch_size])
+            updated += self._repository.save_snapshots(details_by_id)
+        return updated
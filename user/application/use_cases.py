@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Callable, Iterator, List, Optional, Sequence
 
-from user.domain import CustomerDTO, CustomerRepository
+from user.domain import (
+    CustomerDTO,
+    CustomerNotFoundError,
+    CustomerPurgeDTO,
+    CustomerRepository,
+    FavoriteListCache,
+    PageDTO,
+)
 
 
 class CreateCustomer:
@@ -24,6 +31,40 @@ class ListCustomers:
     def execute(self) -> Sequence[CustomerDTO]:
         return self._repository.list()
 
+    def execute_page(
+        self,
+        *,
+        limit: int,
+        after: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+    ) -> PageDTO[CustomerDTO]:
+        """Return at most ``limit`` customers with ids greater than ``after``."""
+        customers = self._repository.list(
+            after=after,
+            limit=limit + 1,
+            name_prefix=name_prefix,
+            email_prefix=email_prefix,
+        )
+        page = list(customers[:limit])
+        next_after = page[-1].id if len(customers) > limit and page else None
+        return PageDTO(items=page, next_after=next_after)
+
+
+class ExportCustomers:
+    """Use case streaming every matching customer without loading them all."""
+
+    def __init__(self, repository: CustomerRepository):
+        self._repository = repository
+
+    def execute(
+        self,
+        *,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+    ) -> Iterator[CustomerDTO]:
+        return self._repository.iterate(name_prefix=name_prefix, email_prefix=email_prefix)
+
 
 class GetCustomer:
     """Use case retrieving a single customer."""
@@ -50,10 +91,54 @@ class UpdateCustomer:
 
 
 class DeleteCustomer:
-    """Use case deleting a customer."""
+    """Use case deleting a customer; its rows are purged later by ``PurgeDeletedCustomers``."""
 
-    def __init__(self, repository: CustomerRepository):
+    def __init__(self, repository: CustomerRepository, *, favorite_cache: FavoriteListCache | None = None):
         self._repository = repository
+        self._favorite_cache = favorite_cache
 
     def execute(self, *, customer_id: int) -> None:
         self._repository.delete(customer_id)
+        if self._favorite_cache is not None:
+            self._favorite_cache.invalidate(customer_id)
+
+
+class RevokeCustomerTokens:
+    """Use case invalidating every token issued so far to a customer."""
+
+    def __init__(self, repository: CustomerRepository):
+        self._repository = repository
+
+    def execute(self, *, customer_id: int) -> None:
+        self._repository.revoke_tokens(customer_id)
+
+
+class PurgeDeletedCustomers:
+    """Use case removing deleted customers and their rows in bounded batches."""
+
+    def __init__(self, repository: CustomerRepository):
+        self._repository = repository
+
+    def execute(
+        self,
+        *,
+        batch_size: int = 1000,
+        limit: int = 100,
+        progress: Optional[Callable[[CustomerPurgeDTO], None]] = None,
+    ) -> List[CustomerPurgeDTO]:
+        """Purge up to ``limit`` deleted customers and return their final progress."""
+        batch_size = max(1, int(batch_size))
+        purged = []
+        for customer_id in self._repository.deleted_customer_ids(limit=limit):
+            try:
+                while True:
+                    result = self._repository.purge_batch(customer_id, batch_size=batch_size)
+                    if progress is not None:
+                        progress(result)
+                    if result.completed:
+                        break
+            except CustomerNotFoundError:
+                # Another worker finished this customer first.
+                continue
+            purged.append(result)
+        return purged
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.infrastructure import get_token_version_cache
+
+TOKEN_VERSION_CLAIM = "token_version"
+
+
+class CustomerRefreshToken(RefreshToken):
+    """Refresh token carrying the claims needed to authenticate without a customer lookup.
+
+    Access tokens derived from it, including through the refresh endpoint,
+    copy these claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["is_staff"] = user.is_staff
+        token["is_active"] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class CustomerTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = CustomerRefreshToken
+
+
+class CustomerTokenUser(TokenUser):
+    """Customer built from token claims, with an integer id like the model's."""
+
+    @cached_property
+    def id(self) -> int:
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self) -> int:
+        return self.id
+
+    @cached_property
+    def is_active(self) -> bool:
+        return bool(self.token.get("is_active", False))
+
+
+class CustomerJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts the signed claims instead of loading the customer.
+
+    The only state checked is the customer's token version, served from an
+    in-process cache: tokens issued before a revocation (password change,
+    deletion, deactivation) carry an older version and are rejected. Tokens
+    without the version claim fall back to the usual customer lookup.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user = CustomerTokenUser(validated_token)
+            user_id = user.id
+        except (KeyError, TypeError, ValueError) as exc:
+            raise InvalidToken("Token contained no recognizable user identification") from exc
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        cache = get_token_version_cache()
+        token_version = validated_token[TOKEN_VERSION_CLAIM]
+        current = cache.get(user_id)
+        if current is not None and current < token_version:
+            # The token was issued after a revocation this process has not seen yet.
+            cache.invalidate(user_id)
+            current = cache.get(user_id)
+        if current != token_version:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+        return user
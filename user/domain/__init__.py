@@ -1,15 +1,37 @@
-from .entities import CustomerDTO, FavoriteDTO, UserDTO
+from .entities import (
+    BulkFavoriteResultDTO,
+    CustomerDTO,
+    CustomerPurgeDTO,
+    FavoriteChangeDTO,
+    FavoriteDTO,
+    FavoriteSyncResultDTO,
+    PageDTO,
+    ProductPopularityDTO,
+    UserDTO,
+)
 from .exceptions import (
     CustomerNotFoundError,
     FavoriteAlreadyExistsError,
     FavoriteNotFoundError,
     ProductNotFoundError,
 )
-from .interfaces import CustomerRepository, FavoriteRepository, ProductGateway
+from .interfaces import (
+    AsyncProductGateway,
+    CustomerRepository,
+    FavoriteListCache,
+    FavoriteRepository,
+    ProductGateway,
+)
 
 __all__ = [
     "CustomerDTO",
+    "CustomerPurgeDTO",
     "FavoriteDTO",
+    "BulkFavoriteResultDTO",
+    "FavoriteSyncResultDTO",
+    "FavoriteChangeDTO",
+    "PageDTO",
+    "ProductPopularityDTO",
     "UserDTO",
     "CustomerNotFoundError",
     "FavoriteAlreadyExistsError",
@@ -17,5 +39,7 @@ __all__ = [
     "ProductNotFoundError",
     "CustomerRepository",
     "FavoriteRepository",
+    "FavoriteListCache",
     "ProductGateway",
+    "AsyncProductGateway",
 ]
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, Generic, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -27,3 +30,60 @@ class FavoriteDTO:
     image: Optional[str] = None
     price: Optional[float] = None
     review: Optional[Dict[str, Any]] = None
+    snapshot_at: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class BulkFavoriteResultDTO:
+    """Outcome of one product id in a bulk favorite request."""
+
+    ADDED = "added"
+    DUPLICATE = "duplicate"
+    UNKNOWN_PRODUCT = "unknown_product"
+
+    product_id: int
+    status: str
+
+
+@dataclass(frozen=True)
+class FavoriteChangeDTO:
+    """One entry of a customer's favorites change log."""
+
+    sequence: int
+    product_id: int
+    action: str
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class ProductPopularityDTO:
+    """Number of customers that favorited a product."""
+
+    product_id: int
+    favorite_count: int
+
+
+@dataclass(frozen=True)
+class CustomerPurgeDTO:
+    """Rows removed while purging a deleted customer; ``completed`` once the customer row is gone."""
+
+    customer_id: int
+    purged_rows: int
+    completed: bool = False
+
+
+@dataclass(frozen=True)
+class FavoriteSyncResultDTO:
+    """Difference applied when replacing a customer's favorites with a new set."""
+
+    added: Sequence[int]
+    removed: Sequence[int]
+    unknown_products: Sequence[int]
+
+
+@dataclass(frozen=True)
+class PageDTO(Generic[T]):
+    """One keyset page of results; ``next_after`` is the id to seek past for the next page."""
+
+    items: Sequence[T]
+    next_after: Optional[int] = None
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Protocol, Sequence, runtime_checkable
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Set, Tuple, runtime_checkable
 
-from .entities import CustomerDTO, FavoriteDTO
+from .entities import CustomerDTO, CustomerPurgeDTO, FavoriteChangeDTO, FavoriteDTO, PageDTO, ProductPopularityDTO
 
 
 @runtime_checkable
@@ -12,7 +13,22 @@ class CustomerRepository(Protocol):
     def create(self, *, name: str, email: str, password: str) -> CustomerDTO:
         ...
 
-    def list(self) -> Sequence[CustomerDTO]:
+    def list(
+        self,
+        *,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+    ) -> Sequence[CustomerDTO]:
+        ...
+
+    def iterate(
+        self,
+        *,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+    ) -> Iterator[CustomerDTO]:
         ...
 
     def get(self, customer_id: int) -> CustomerDTO:
@@ -24,20 +40,129 @@ class CustomerRepository(Protocol):
     def delete(self, customer_id: int) -> None:
         ...
 
+    def deleted_customer_ids(self, *, limit: int = 100) -> List[int]:
+        ...
+
+    def purge_batch(self, customer_id: int, *, batch_size: int = 1000) -> CustomerPurgeDTO:
+        ...
+
+    def token_version(self, customer_id: int) -> Optional[int]:
+        ...
+
+    def revoke_tokens(self, customer_id: int) -> None:
+        ...
+
 
 @runtime_checkable
 class FavoriteRepository(Protocol):
     """Repository abstraction for managing customer favorites."""
 
-    def add(self, *, customer_id: int, product_id: int) -> FavoriteDTO:
+    def add(
+        self,
+        *,
+        customer_id: int,
+        product_id: int,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> FavoriteDTO:
+        ...
+
+    def list(
+        self,
+        *,
+        customer_id: int,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[FavoriteDTO]:
+        ...
+
+    def add_many(self, *, customer_id: int, details_by_product_id: Dict[int, Dict[str, Any]]) -> Set[int]:
+        ...
+
+    def existing_product_ids(
+        self,
+        *,
+        customer_id: int,
+        product_ids: Optional[Iterable[int]] = None,
+    ) -> Set[int]:
         ...
 
-    def list(self, *, customer_id: int) -> Sequence[FavoriteDTO]:
+    def apply_diff(
+        self,
+        *,
+        customer_id: int,
+        add: Dict[int, Dict[str, Any]],
+        remove: Iterable[int],
+    ) -> Tuple[Set[int], Set[int]]:
         ...
 
     def remove(self, *, customer_id: int, product_id: int) -> None:
         ...
 
+    def favorites_version(self, *, customer_id: int) -> int:
+        ...
+
+    def changes_since(self, *, customer_id: int, since: int = 0, limit: int = 100) -> Sequence[FavoriteChangeDTO]:
+        ...
+
+    def compact_changes(self, *, batch_size: int = 10000) -> int:
+        ...
+
+    def most_favorited(self, *, limit: int) -> Sequence[ProductPopularityDTO]:
+        ...
+
+    def iterate_customer_ids(
+        self,
+        *,
+        product_id: int,
+        after: Optional[int] = None,
+        batch_size: int = 2000,
+    ) -> Iterator[int]:
+        ...
+
+    def reconcile_popularity(self, *, batch_size: int = 1000) -> int:
+        ...
+
+    def save_snapshots(
+        self,
+        details_by_product_id: Dict[int, Optional[Dict[str, Any]]],
+        *,
+        customer_id: Optional[int] = None,
+        customer_batch_size: int = 500,
+    ) -> int:
+        ...
+
+    def snapshot_product_ids(self, *, older_than: Optional[datetime] = None) -> List[int]:
+        ...
+
+
+@runtime_checkable
+class FavoriteListCache(Protocol):
+    """Cache of enriched favorite pages keyed by customer and favorites version."""
+
+    def get(
+        self,
+        *,
+        customer_id: int,
+        version: int,
+        after: Optional[int],
+        limit: int,
+    ) -> Optional[PageDTO[FavoriteDTO]]:
+        ...
+
+    def set(
+        self,
+        *,
+        customer_id: int,
+        version: int,
+        after: Optional[int],
+        limit: int,
+        page: PageDTO[FavoriteDTO],
+    ) -> None:
+        ...
+
+    def invalidate(self, customer_id: int) -> None:
+        ...
+
 
 @runtime_checkable
 class ProductGateway(Protocol):
@@ -48,3 +173,20 @@ class ProductGateway(Protocol):
 
     def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
         ...
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        ...
+
+
+@runtime_checkable
+class AsyncProductGateway(Protocol):
+    """Asyncio counterpart of ``ProductGateway`` for views served under ASGI."""
+
+    async def exists(self, product_id: int) -> bool:
+        ...
+
+    async def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        ...
@@ -1,8 +1,64 @@
+from .async_gateway import SyncToAsyncProductGateway
+from .customer_import import CustomerImportResult, import_customers, read_customer_rows
+from .elasticsearch_gateway import ElasticsearchProductGateway
+from .favorite_cache import VersionedFavoriteListCache
+from .product_cache import CachedProductGateway, CacheStats, DjangoProductCache, LocalProductCache
 from .product_gateway import FakeStoreProductGateway
+from .product_mirror import DjangoProductGateway, ProductSyncResult, sync_product_catalog
+from .partitioning import FavoritePartitioner
+from .providers import (
+    build_async_product_gateway,
+    build_favorite_list_cache,
+    build_product_gateway,
+    build_token_version_cache,
+    get_async_product_gateway,
+    get_favorite_list_cache,
+    get_product_gateway,
+    get_token_version_cache,
+    product_gateway_stats,
+    reset_product_gateway,
+)
+from .resilience import CircuitBreaker, CircuitState, ResilienceStats, ResilientProductGateway
 from .repositories import DjangoCustomerRepository, DjangoFavoriteRepository
+from .signals import customer_tokens_revoked, product_catalog_synced
+from .single_flight import SingleFlight, SingleFlightStats
+from .token_versions import TokenVersionCache
 
 __all__ = [
     "DjangoCustomerRepository",
     "DjangoFavoriteRepository",
     "FakeStoreProductGateway",
+    "SyncToAsyncProductGateway",
+    "DjangoProductGateway",
+    "ElasticsearchProductGateway",
+    "ProductSyncResult",
+    "FavoritePartitioner",
+    "sync_product_catalog",
+    "CustomerImportResult",
+    "import_customers",
+    "read_customer_rows",
+    "CachedProductGateway",
+    "CacheStats",
+    "DjangoProductCache",
+    "LocalProductCache",
+    "VersionedFavoriteListCache",
+    "build_favorite_list_cache",
+    "get_favorite_list_cache",
+    "TokenVersionCache",
+    "build_token_version_cache",
+    "get_token_version_cache",
+    "build_async_product_gateway",
+    "build_product_gateway",
+    "get_async_product_gateway",
+    "get_product_gateway",
+    "product_gateway_stats",
+    "reset_product_gateway",
+    "CircuitBreaker",
+    "CircuitState",
+    "ResilienceStats",
+    "ResilientProductGateway",
+    "product_catalog_synced",
+    "customer_tokens_revoked",
+    "SingleFlight",
+    "SingleFlightStats",
 ]
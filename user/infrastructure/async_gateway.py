@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+
+from user.domain import AsyncProductGateway, ProductGateway
+
+
+class SyncToAsyncProductGateway(AsyncProductGateway):
+    """Expose a blocking ``ProductGateway`` through the async interface.
+
+    Calls run through asgiref's ``sync_to_async``; keep ``thread_sensitive``
+    enabled for gateways that use the Django ORM so they share its connection.
+    """
+
+    def __init__(self, gateway: ProductGateway, *, thread_sensitive: bool = True):
+        self._gateway = gateway
+        self._thread_sensitive = thread_sensitive
+
+    def _run(self, fn):
+        return sync_to_async(fn, thread_sensitive=self._thread_sensitive)
+
+    @property
+    def inner(self) -> ProductGateway:
+        return self._gateway
+
+    async def exists(self, product_id: int) -> bool:
+        return await self._run(self._gateway.exists)(product_id)
+
+    async def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        return await self._run(self._gateway.get_details)(product_id)
+
+    async def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        return await self._run(self._gateway.get_many)(list(product_ids))
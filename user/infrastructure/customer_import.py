@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import IO, Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+
+_STAGING_TABLE = "customer_import_staging"
+_IMPORTED_FIELDS = ("name", "email", "password")
+
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+
+@dataclass(frozen=True)
+class CustomerImportRow:
+    """One customer read from an import file; ``row`` is its 1-based position."""
+
+    row: int
+    name: str
+    email: str
+    password: str
+
+
+@dataclass(frozen=True)
+class CustomerImportResult:
+    """Outcome of a bulk customer import; ``last_row`` is the last row committed."""
+
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    last_row: int = 0
+
+
+def read_customer_rows(stream: IO[str], *, format: str = "csv") -> Iterator[Tuple[int, dict]]:
+    """Yield ``(row, record)`` pairs from a CSV (with header) or NDJSON stream."""
+    if format == "csv":
+        records: Iterable[dict] = csv.DictReader(stream)
+    elif format == "ndjson":
+        records = (json.loads(line) for line in stream if line.strip())
+    else:
+        raise ValueError(f"Unsupported import format: {format!r}")
+    return enumerate(records, start=1)
+
+
+def _to_import_row(row: int, record: dict) -> Optional[CustomerImportRow]:
+    values = [str(record.get(name) or "").strip() for name in _IMPORTED_FIELDS]
+    name, email, password = values
+    if not all(values):
+        return None
+    email = BaseUserManager.normalize_email(email)
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return CustomerImportRow(row=row, name=name, email=email, password=password)
+
+
+def _hash_passwords(passwords: Sequence[str]) -> List[str]:
+    return [make_password(password) for password in passwords]
+
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs):
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def _slices(items: Sequence, parts: int) -> List[Sequence]:
+    size = max(1, -(-len(items) // parts))
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+class _CustomerLoader:
+    """Load hashed customers into the customer table through a COPY-filled staging table."""
+
+    def __init__(self, model):
+        self._model = model
+        self._table = connection.ops.quote_name(model._meta.db_table)
+        # Every other column gets its model default, since COPY bypasses them.
+        self._default_fields = [
+            model_field
+            for model_field in model._meta.concrete_fields
+            if not model_field.primary_key and model_field.name not in _IMPORTED_FIELDS
+        ]
+
+    def load(self, rows: Sequence[CustomerImportRow], hashes: Sequence[str]) -> List[int]:
+        """Insert ``rows`` in one transaction and return the rows skipped as duplicates."""
+        columns = [*_IMPORTED_FIELDS, *(model_field.column for model_field in self._default_fields)]
+        defaults = [
+            model_field.get_db_prep_save(model_field.get_default(), connection) for model_field in self._default_fields
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {_STAGING_TABLE} "
+                "(row_number bigint, name text, email text, password text)"
+            )
+            cursor.execute(f"TRUNCATE {_STAGING_TABLE}")
+            with cursor.cursor.copy(f"COPY {_STAGING_TABLE} (row_number, name, email, password) FROM STDIN") as copy:
+                for row, password_hash in zip(rows, hashes):
+                    copy.write_row((row.row, row.name, row.email, password_hash))
+
+            # Rows are inserted in file order, so the first occurrence of an
+            # email wins and every later one, or one already stored, is skipped.
+            column_list = ", ".join(connection.ops.quote_name(column) for column in columns)
+            cursor.execute(
+                f"INSERT INTO {self._table} ({column_list}) "
+                f"SELECT name, email, password{', %s' * len(defaults)} FROM {_STAGING_TABLE} ORDER BY row_number "
+                "ON CONFLICT (email) DO NOTHING RETURNING email",
+                defaults,
+            )
+            inserted = {email for (email,) in cursor.fetchall()}
+
+        skipped = []
+        for row in rows:
+            if row.email in inserted:
+                inserted.discard(row.email)
+            else:
+                skipped.append(row.row)
+        return skipped
+
+
+def import_customers(
+    records: Iterable[Tuple[int, dict]],
+    *,
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+    start_after: int = 0,
+    progress: Optional[Callable[[CustomerImportResult], None]] = None,
+    on_skipped: Optional[Callable[[int, str], None]] = None,
+    model=None,
+) -> CustomerImportResult:
+    """Create customers from ``(row, record)`` pairs, hashing passwords across processes.
+
+    Each chunk of ``chunk_size`` rows is hashed in slices spread over
+    ``workers`` processes (all cores by default; ``1`` hashes inline) while
+    the previous chunk is loaded, then committed with a single COPY and
+    INSERT. ``progress`` receives the running result after every commit, so
+    ``last_row`` can be stored and passed back as ``start_after`` to resume.
+    ``on_skipped`` receives the row number and reason of every row left out,
+    once the chunk that read it commits, so a resumed import reports each
+    row once.
+    """
+    loader = _CustomerLoader(model or get_user_model())
+    workers = workers or os.cpu_count() or 1
+    result = CustomerImportResult(last_row=start_after)
+
+    # Invalid rows read since the last chunk was cut; each chunk takes them along.
+    invalid: List[int] = []
+
+    def valid_rows() -> Iterator[CustomerImportRow]:
+        for row, record in records:
+            if row <= start_after:
+                continue
+            parsed = _to_import_row(row, record)
+            if parsed is None:
+                invalid.append(row)
+            else:
+                yield parsed
+
+    def report_invalid(rows: Sequence[int]) -> None:
+        if on_skipped is not None:
+            for row in rows:
+                on_skipped(row, INVALID)
+
+    if workers == 1:
+        executor: Executor = _InlineExecutor()
+    else:
+        # Spawned workers share no database connection with this process. They
+        # run django.setup before unpickling any task, since importing this
+        # package needs the app registry.
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+
+    pending: Deque[Tuple[Sequence[CustomerImportRow], List[int], List[Future]]] = deque()
+
+    def commit_oldest() -> None:
+        nonlocal result
+        rows, chunk_invalid, futures = pending.popleft()
+        hashes = [password_hash for future in futures for password_hash in future.result()]
+        skipped = loader.load(rows, hashes)
+        report_invalid(chunk_invalid)
+        if on_skipped is not None:
+            for row in skipped:
+                on_skipped(row, DUPLICATE)
+        result = replace(
+            result,
+            imported=result.imported + len(rows) - len(skipped),
+            duplicates=result.duplicates + len(skipped),
+            invalid=result.invalid + len(chunk_invalid),
+            # A chunk cut short by the end of the input may have read invalid
+            # rows past its last valid one.
+            last_row=max([rows[-1].row, *chunk_invalid]),
+        )
+        if progress is not None:
+            progress(result)
+
+    with executor:
+        rows_iter = valid_rows()
+        while chunk := list(itertools.islice(rows_iter, chunk_size)):
+            futures = [
+                executor.submit(_hash_passwords, [row.password for row in part])
+                for part in _slices(chunk, workers)
+            ]
+            pending.append((chunk, invalid[:], futures))
+            invalid.clear()
+            # Keep one chunk hashing while the previous one is loaded.
+            if len(pending) > 1:
+                commit_oldest()
+        while pending:
+            commit_oldest()
+
+    if invalid:
+        # Only invalid rows follow the last chunk; nothing to load, but the
+        # checkpoint moves past them.
+        report_invalid(invalid)
+        result = replace(result, invalid=result.invalid + len(invalid), last_row=invalid[-1])
+        if progress is not None:
+            progress(result)
+    return result
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from elasticsearch import ApiError, Elasticsearch, TransportError
+
+from catalog.infrastructure import get_elasticsearch_client
+from user.domain import ProductGateway
+
+from .product_gateway import to_product_details
+
+
+class ElasticsearchProductGateway(ProductGateway):
+    """Product gateway answering lookups from the Elasticsearch ``products`` index.
+
+    Batches are resolved with a single ``_mget`` request that only returns the
+    fields needed for favorites. Products absent from the index are looked up
+    through ``fallback`` when one is configured.
+    """
+
+    SOURCE_FIELDS = ["id", "title", "image", "price", "rating"]
+
+    def __init__(
+        self,
+        client: Elasticsearch | None = None,
+        index: str | None = None,
+        fallback: ProductGateway | None = None,
+    ):
+        cfg = getattr(settings, "ELASTICSEARCH", {})
+        self._client = client or get_elasticsearch_client()
+        self._index = index or cfg.get("index", "products")
+        self._fallback = fallback
+
+    def exists(self, product_id: int) -> bool:
+        return self.get_details(product_id) is not None
+
+    def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([product_id]).get(product_id)
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        unique_ids = [product_id for product_id in dict.fromkeys(product_ids) if product_id > 0]
+        if not unique_ids:
+            return {}
+
+        try:
+            response = self._client.mget(
+                index=self._index,
+                ids=[str(product_id) for product_id in unique_ids],
+                source_includes=self.SOURCE_FIELDS,
+            )
+        except (ApiError, TransportError) as exc:
+            raise RuntimeError("Could not reach product index") from exc
+
+        details: Dict[int, Optional[Dict[str, Any]]] = {}
+        for doc in response.get("docs", []):
+            if doc.get("error"):
+                raise RuntimeError(f"Product index returned an error for id={doc.get('_id')}")
+            if doc.get("found"):
+                source = dict(doc.get("_source") or {})
+                source.setdefault("id", int(doc["_id"]))
+                details[int(doc["_id"])] = to_product_details(source)
+
+        missing = [product_id for product_id in unique_ids if product_id not in details]
+        if missing:
+            if self._fallback is not None:
+                details.update(self._fallback.get_many(missing))
+            else:
+                details.update(dict.fromkeys(missing))
+
+        return details
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from user.domain import FavoriteDTO, FavoriteListCache, PageDTO
+
+from .product_cache import CacheStats, LocalProductCache
+
+_PageKey = Tuple[Optional[int], int]
+
+
+class VersionedFavoriteListCache(FavoriteListCache):
+    """In-process cache of enriched favorite pages.
+
+    Each customer has one entry holding the favorites version it was built
+    for and the pages served at that version. A lookup with any other version
+    is a miss, so a write is never served stale even when the explicit
+    ``invalidate`` of another process has not reached this one. Entries are
+    bounded by the storage's TTL and LRU size, and by ``max_pages_per_customer``.
+    """
+
+    def __init__(self, storage: LocalProductCache | None = None, *, max_pages_per_customer: int = 8):
+        self._storage = storage or LocalProductCache(max_entries=10000, ttl=60)
+        self._max_pages = max(1, int(max_pages_per_customer))
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _entry(self, customer_id: int) -> Optional[Tuple[int, Dict[_PageKey, PageDTO[FavoriteDTO]]]]:
+        return self._storage.get_many([customer_id]).get(customer_id)
+
+    def get(
+        self,
+        *,
+        customer_id: int,
+        version: int,
+        after: Optional[int],
+        limit: int,
+    ) -> Optional[PageDTO[FavoriteDTO]]:
+        entry = self._entry(customer_id)
+        page = entry[1].get((after, limit)) if entry is not None and entry[0] == version else None
+        with self._lock:
+            if page is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return page
+
+    def set(
+        self,
+        *,
+        customer_id: int,
+        version: int,
+        after: Optional[int],
+        limit: int,
+        page: PageDTO[FavoriteDTO],
+    ) -> None:
+        entry = self._entry(customer_id)
+        if entry is not None and entry[0] > version:
+            return
+        pages = dict(entry[1]) if entry is not None and entry[0] == version else {}
+        pages[(after, limit)] = page
+        while len(pages) > self._max_pages:
+            del pages[next(iter(pages))]
+        self._storage.set_many({customer_id: (version, pages)})
+
+    def invalidate(self, customer_id: int) -> None:
+        self._storage.delete(customer_id)
+
+    def clear(self) -> None:
+        self._storage.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        storage = self._storage.stats
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=storage.evictions,
+                size=storage.size,
+            )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import http.client
+import os
+import queue
+import ssl
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when every pooled connection stayed busy for the whole wait."""
+
+
+@dataclass(frozen=True)
+class HTTPResponseData:
+    """Fully read HTTP response returned by ``PooledHTTPClient``."""
+
+    status: int
+    body: bytes
+
+
+def _split_base_url(base_url: str) -> Tuple[str, str, Optional[int], str]:
+    parts = urlsplit(base_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported base URL: {base_url!r}")
+    return parts.scheme, parts.hostname, parts.port, parts.path.rstrip("/")
+
+
+class PooledHTTPClient:
+    """Thread-safe keep-alive connection pool for a single HTTP(S) origin.
+
+    At most ``pool_size`` connections are open at once; idle connections are
+    reused instead of paying a new TCP/TLS handshake per request. The pool is
+    discarded after ``fork`` so workers never share sockets with their parent.
+    """
+
+    _RETRYABLE_ERRORS = (
+        http.client.RemoteDisconnected,
+        http.client.BadStatusLine,
+        BrokenPipeError,
+        ConnectionResetError,
+        ConnectionAbortedError,
+    )
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        pool_size: int = 10,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 5.0,
+        keep_alive: bool = True,
+        ssl_context: ssl.SSLContext | None = None,
+    ):
+        self._scheme, self._host, self._port, self._base_path = _split_base_url(base_url)
+        self._pool_size = max(1, int(pool_size))
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._keep_alive = keep_alive
+        self._ssl_context = ssl_context
+        self._lock = threading.Lock()
+        self._reset_pool()
+
+    def _reset_pool(self) -> None:
+        self._pid = os.getpid()
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self._pool_size)
+
+    def _ensure_pool_owned_by_process(self) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset_pool()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self._scheme == "https":
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self._host,
+                self._port,
+                timeout=self._connect_timeout,
+                context=self._ssl_context or ssl.create_default_context(),
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                self._host,
+                self._port,
+                timeout=self._connect_timeout,
+            )
+        connection.connect()
+        connection.sock.settimeout(self._read_timeout)
+        return connection
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        if self._keep_alive and not response.will_close and self._pid == os.getpid():
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+    def get(self, path: str, *, headers: Optional[Dict[str, str]] = None) -> HTTPResponseData:
+        """Issue a GET request for ``path`` relative to the base URL."""
+        self._ensure_pool_owned_by_process()
+        request_headers = {
+            "Accept": "application/json",
+            "Connection": "keep-alive" if self._keep_alive else "close",
+        }
+        if headers:
+            request_headers.update(headers)
+
+        if not self._slots.acquire(timeout=self._connect_timeout + self._read_timeout):
+            raise PoolTimeout("Timed out waiting for a free HTTP connection")
+        slots = self._slots
+        try:
+            connection, reused = self._checkout()
+            try:
+                return self._send(connection, path, request_headers)
+            except self._RETRYABLE_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+            # The idle connection was closed by the server; retry once on a fresh one.
+            return self._send(self._new_connection(), path, request_headers)
+        finally:
+            slots.release()
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        path: str,
+        headers: Dict[str, str],
+    ) -> HTTPResponseData:
+        try:
+            connection.request("GET", self._base_path + path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection, response)
+        return HTTPResponseData(status=response.status, body=body)
+
+    def close(self) -> None:
+        """Close every idle connection currently held by the pool."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from user.models import Favorite
+
+# Postgres truncates identifiers longer than this, which would make the
+# temporary and archived names collide with the canonical ones.
+_MAX_IDENTIFIER_LENGTH = 63
+
+_MIRROR_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM {shadow} WHERE id = OLD.id AND customer_id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {shadow} SELECT (NEW).* ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+_SOURCE_INDEXES_SQL = """
+SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid), pg_index.indisprimary,
+       pg_get_constraintdef(pg_constraint.oid)
+FROM pg_index
+JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+LEFT JOIN pg_constraint
+    ON pg_constraint.conindid = pg_index.indexrelid AND pg_constraint.conrelid = pg_index.indrelid
+WHERE pg_index.indrelid = to_regclass(%s)
+ORDER BY index_class.relname
+"""
+
+# pg_get_indexdef output: CREATE [UNIQUE] INDEX name ON [ONLY] table USING ...
+_INDEX_DEFINITION = re.compile(r"^(CREATE (?:UNIQUE )?INDEX) \S+ ON (?:ONLY )?\S+ (USING .*)$", re.DOTALL)
+
+
+def _suffixed(name: str, suffix: str) -> str:
+    return name[: _MAX_IDENTIFIER_LENGTH - len(suffix)] + suffix
+
+
+class FavoritePartitioner:
+    """Online migration of the favorites table to hash partitions on ``customer_id``.
+
+    ``prepare`` creates a partitioned shadow table plus a trigger mirroring
+    every write on the live table into it, ``backfill`` copies the existing
+    rows in id-range batches and ``swap`` renames the shadow into place. The
+    live table keeps serving reads and writes until the swap, which only
+    holds its lock for a handful of catalog updates. The previous table is
+    kept, detached from ``Customer``, under the archive name.
+
+    Every index and constraint of the live table is recreated on the shadow,
+    except the primary key: unique keys on a partitioned table must include
+    the partition key, so it becomes ``(id, customer_id)``. Ids still come
+    from the same identity sequence, but the database no longer enforces
+    ``id`` alone to be unique, whatever the migration state says.
+    """
+
+    def __init__(self, model=None, *, using: str = DEFAULT_DB_ALIAS):
+        self._model = model or Favorite
+        self._using = using
+        self.table = self._model._meta.db_table
+        self.shadow = _suffixed(self.table, "_partitioned")
+        self.archive = _suffixed(self.table, "_unpartitioned")
+        self._trigger = _suffixed(self.table, "_mirror_partitioned")
+
+    @property
+    def _connection(self):
+        return connections[self._using]
+
+    def _quote(self, name: str) -> str:
+        return self._connection.ops.quote_name(name)
+
+    def _source_indexes(self) -> List[Tuple[str, str, bool, Optional[str]]]:
+        """``(name, index definition, is primary, constraint definition)`` of every index on the live table."""
+        with self._connection.cursor() as cursor:
+            cursor.execute(_SOURCE_INDEXES_SQL, [self.table])
+            return cursor.fetchall()
+
+    def _relkind(self, table: str) -> Optional[str]:
+        with self._connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def is_partitioned(self) -> bool:
+        return self._relkind(self.table) == "p"
+
+    def shadow_exists(self) -> bool:
+        return self._relkind(self.shadow) is not None
+
+    def prepare(self, *, partitions: int) -> bool:
+        """Create the shadow table, its partitions and the mirroring trigger.
+
+        Returns ``False`` without changes when the shadow already exists, so
+        an interrupted migration can be resumed with the same command.
+        """
+        if partitions < 1:
+            raise ValueError("partitions must be at least 1")
+        if self.is_partitioned():
+            raise RuntimeError(f"{self.table} is already partitioned")
+        if self.shadow_exists():
+            return False
+
+        table, shadow = self._quote(self.table), self._quote(self.shadow)
+        meta = self._model._meta
+        customer_column = meta.get_field("customer").column
+        with transaction.atomic(using=self._using), self._connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {shadow} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                f"INCLUDING IDENTITY) PARTITION BY HASH ({self._quote(customer_column)})"
+            )
+            for remainder in range(partitions):
+                partition = self._quote(_suffixed(self.table, f"_p{remainder}"))
+                cursor.execute(
+                    f"CREATE TABLE {partition} PARTITION OF {shadow} "
+                    f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+                )
+
+            # Check constraints are copied by ``LIKE ... INCLUDING CONSTRAINTS``;
+            # indexes, including the ones Django adds for foreign keys, are not.
+            for name, index_definition, primary, constraint_definition in self._source_indexes():
+                shadow_name = self._quote(_suffixed(name, "_p"))
+                if primary:
+                    # Unique keys on a partitioned table must include the partition key.
+                    cursor.execute(
+                        f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow_name} "
+                        f"PRIMARY KEY ({self._quote(meta.pk.column)}, {self._quote(customer_column)})"
+                    )
+                elif constraint_definition is not None:
+                    cursor.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow_name} {constraint_definition}")
+                else:
+                    create, method = _INDEX_DEFINITION.match(index_definition).groups()
+                    cursor.execute(f"{create} {shadow_name} ON {shadow} {method}")
+
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype = 'f'
+                """,
+                [self.table],
+            )
+            for name, definition in cursor.fetchall():
+                cursor.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {self._quote(name)} {definition}")
+
+            function = self._quote(self._trigger)
+            cursor.execute(_MIRROR_FUNCTION_SQL.format(function=function, shadow=shadow))
+            cursor.execute(
+                f"CREATE TRIGGER {function} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+            )
+        return True
+
+    def backfill(
+        self,
+        *,
+        batch_size: int = 10000,
+        after: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Copy rows with an id greater than ``after`` into the shadow table.
+
+        Each id range is copied in its own transaction with the source rows
+        share-locked, so a concurrent delete either lands before the copy or
+        is mirrored after it. Already mirrored rows are skipped, which makes
+        re-running any range harmless. ``progress`` receives the last id of
+        every batch and the running total. Returns the number of rows copied.
+        """
+        if not self.shadow_exists():
+            raise RuntimeError("Run prepare before backfilling")
+
+        table, shadow = self._quote(self.table), self._quote(self.shadow)
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(id), max(id) FROM {table}")
+            low, high = cursor.fetchone()
+        if low is None:
+            return 0
+
+        start = low - 1 if after is None else after
+        copied = 0
+        while start < high:
+            end = min(start + batch_size, high)
+            with transaction.atomic(using=self._using), self._connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {shadow} SELECT * FROM {table} WHERE id > %s AND id <= %s "
+                    f"FOR SHARE ON CONFLICT DO NOTHING",
+                    [start, end],
+                )
+                copied += cursor.rowcount
+            start = end
+            if progress is not None:
+                progress(end, copied)
+        return copied
+
+    def swap(self) -> None:
+        """Rename the backfilled shadow into place and archive the old table.
+
+        Index and constraint names move with it, so later migrations keep
+        finding them by name, and the identity sequence continues after the
+        highest id handed out by the old table.
+        """
+        if not self.shadow_exists():
+            raise RuntimeError("Run prepare and backfill before swapping")
+
+        table, shadow = self._quote(self.table), self._quote(self.shadow)
+        with transaction.atomic(using=self._using), self._connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+            # ALTER TABLE refuses to run while deferred foreign key checks are pending.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"DROP TRIGGER {self._quote(self._trigger)} ON {table}")
+            cursor.execute(f"DROP FUNCTION {self._quote(self._trigger)}()")
+
+            # pg_get_serial_sequence returns an already quoted, qualified name.
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [self.table])
+            (sequence,) = cursor.fetchone()
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f"GREATEST((SELECT last_value FROM {sequence}), (SELECT coalesce(max(id), 0) FROM {shadow}), 1))",
+                [self.shadow],
+            )
+
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [self.table],
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {self._quote(name)}")
+
+            for name, *_ in self._source_indexes():
+                cursor.execute(f"ALTER INDEX {self._quote(name)} RENAME TO {self._quote(_suffixed(name, '_old'))}")
+                cursor.execute(f"ALTER INDEX {self._quote(_suffixed(name, '_p'))} RENAME TO {self._quote(name)}")
+
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {self._quote(self.archive)}")
+            cursor.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
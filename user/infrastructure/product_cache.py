@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Set
+
+from django.core.cache import caches
+
+from user.domain import ProductGateway
+
+from .signals import product_catalog_synced
+
+# Catalog syncs run in their own process, so besides ``product_catalog_synced``
+# they bump this counter in the shared Django cache. Negative entries record
+# the generation they were written in and are ignored once it moves on.
+_CATALOG_GENERATION_KEY = "product-catalog:generation"
+
+
+def catalog_generation(alias: str = "default") -> int:
+    """Return the current catalog generation stored in the cache ``alias``."""
+    return caches[alias].get_or_set(_CATALOG_GENERATION_KEY, 1, timeout=None)
+
+
+def bump_catalog_generation(alias: str = "default") -> None:
+    """Start a new catalog generation, invalidating every negative entry written before."""
+    cache = caches[alias]
+    try:
+        cache.incr(_CATALOG_GENERATION_KEY)
+    except ValueError:
+        cache.set(_CATALOG_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: Optional[int] = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ProductCache(Protocol):
+    """Storage contract used by ``CachedProductGateway``."""
+
+    def get_many(self, keys: Iterable[int]) -> Dict[int, Any]:
+        ...
+
+    def set_many(self, values: Dict[int, Any]) -> None:
+        ...
+
+    def delete(self, key: int) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+    @property
+    def stats(self) -> CacheStats:
+        ...
+
+
+class LocalProductCache:
+    """Thread-safe per-process LRU cache with a per-entry TTL."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max(1, int(max_entries))
+        self._ttl = float(ttl)
+        self._clock = clock
+        self._entries: "OrderedDict[int, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_many(self, keys: Iterable[int]) -> Dict[int, Any]:
+        now = self._clock()
+        found: Dict[int, Any] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or entry[0] <= now:
+                    if entry is not None:
+                        del self._entries[key]
+                    self._misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self._hits += 1
+                found[key] = entry[1]
+        return found
+
+    def set_many(self, values: Dict[int, Any]) -> None:
+        expires_at = self._clock() + self._ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: int) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+
+class DjangoProductCache:
+    """Product cache stored in one of the configured Django cache backends.
+
+    Size bounds and eviction are delegated to the backend, so ``evictions``
+    stays at zero and ``size`` is unknown. Keys are namespaced by a generation
+    counter, which lets ``clear`` drop every entry without flushing the whole
+    shared backend.
+    """
+
+    def __init__(self, *, alias: str = "default", ttl: float = 300, key_prefix: str = "product"):
+        self._cache = caches[alias]
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self._key_prefix}:generation"
+
+    def _generation(self) -> int:
+        return self._cache.get_or_set(self._generation_key, 1, timeout=None)
+
+    def _key(self, product_id: int, generation: int) -> str:
+        return f"{self._key_prefix}:{generation}:{product_id}"
+
+    def get_many(self, keys: Iterable[int]) -> Dict[int, Any]:
+        generation = self._generation()
+        keys_by_cache_key = {self._key(key, generation): key for key in keys}
+        cached = self._cache.get_many(list(keys_by_cache_key))
+        found = {keys_by_cache_key[cache_key]: value for cache_key, value in cached.items()}
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys_by_cache_key) - len(found)
+        return found
+
+    def set_many(self, values: Dict[int, Any]) -> None:
+        if values:
+            generation = self._generation()
+            self._cache.set_many(
+                {self._key(key, generation): value for key, value in values.items()},
+                timeout=self._ttl,
+            )
+
+    def delete(self, key: int) -> None:
+        self._cache.delete(self._key(key, self._generation()))
+
+    def clear(self) -> None:
+        try:
+            self._cache.incr(self._generation_key)
+        except ValueError:
+            self._cache.set(self._generation_key, time.time_ns(), timeout=None)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses)
+
+
+class CachedProductGateway(ProductGateway):
+    """Read-through cache in front of another product gateway.
+
+    Products the upstream gateway reported as missing are remembered in an
+    optional, separate ``negative_cache`` so they never evict known products.
+    Those entries hold the catalog generation read from the Django cache
+    ``catalog_alias`` and only count while it is current, so a sync run by
+    any process discards them once that cache is shared between processes.
+    """
+
+    def __init__(
+        self,
+        gateway: ProductGateway,
+        cache: ProductCache | None = None,
+        negative_cache: ProductCache | None = None,
+        *,
+        catalog_alias: str = "default",
+    ):
+        self._gateway = gateway
+        self._cache = cache or LocalProductCache()
+        self._negative_cache = negative_cache
+        self._catalog_alias = catalog_alias
+        product_catalog_synced.connect(self._on_catalog_synced, weak=True)
+
+    @property
+    def inner(self) -> ProductGateway:
+        return self._gateway
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    @property
+    def negative_stats(self) -> CacheStats:
+        if self._negative_cache is None:
+            return CacheStats()
+        return self._negative_cache.stats
+
+    def invalidate(self, product_id: int) -> None:
+        self._cache.delete(product_id)
+        if self._negative_cache is not None:
+            self._negative_cache.delete(product_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.clear_negative()
+
+    def clear_negative(self) -> None:
+        if self._negative_cache is not None:
+            self._negative_cache.clear()
+
+    def _on_catalog_synced(self, sender, **kwargs) -> None:
+        self.clear_negative()
+
+    def _known_missing(self, product_ids: List[int]) -> Set[int]:
+        if self._negative_cache is None or not product_ids:
+            return set()
+        entries = self._negative_cache.get_many(product_ids)
+        if not entries:
+            return set()
+        generation = catalog_generation(self._catalog_alias)
+        return {product_id for product_id, recorded in entries.items() if recorded == generation}
+
+    def _remember(self, details: Dict[int, Optional[Dict[str, Any]]]) -> None:
+        self._cache.set_many({key: value for key, value in details.items() if value is not None})
+        missing = [key for key, value in details.items() if value is None]
+        if self._negative_cache is not None and missing:
+            generation = catalog_generation(self._catalog_alias)
+            self._negative_cache.set_many(dict.fromkeys(missing, generation))
+
+    def exists(self, product_id: int) -> bool:
+        return self.get_details(product_id) is not None
+
+    def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        cached = self._cache.get_many([product_id])
+        if product_id in cached:
+            return cached[product_id]
+        if self._known_missing([product_id]):
+            return None
+
+        details = self._gateway.get_details(product_id)
+        self._remember({product_id: details})
+        return details
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        unique_ids = list(dict.fromkeys(product_ids))
+        details: Dict[int, Optional[Dict[str, Any]]] = dict(self._cache.get_many(unique_ids))
+
+        missing = [product_id for product_id in unique_ids if product_id not in details]
+        known_missing = self._known_missing(missing)
+        details.update(dict.fromkeys(known_missing))
+
+        missing = [product_id for product_id in missing if product_id not in known_missing]
+        if missing:
+            fetched = self._gateway.get_many(missing)
+            self._remember(fetched)
+            details.update(fetched)
+
+        return details
@@ -1,16 +1,100 @@
 from __future__ import annotations
 
+import http.client
 import json
-from typing import Any, Dict, Optional
-from urllib import error, request
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
 
 from user.domain import ProductGateway
 
+from .http_client import HTTPResponseData, PooledHTTPClient, PoolTimeout
+from .single_flight import SingleFlight, SingleFlightStats
+
+
+class ProductServiceBusy(RuntimeError):
+    """Raised when a lookup never reached the product service because local capacity ran out."""
+
+
+class ProductServiceTimeout(RuntimeError):
+    """Raised when the product service did not answer in time."""
+
+
+def _get_gateway_config(overrides: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    base_config = getattr(settings, "PRODUCT_GATEWAY", {}).copy()
+    if overrides:
+        base_config.update({k: v for k, v in overrides.items() if v is not None})
+    return base_config
+
+
+def to_product_details(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a FakeStore product payload to the gateway details format."""
+    return {
+        "id": payload.get("id"),
+        "title": payload.get("title"),
+        "image": payload.get("image"),
+        "price": payload.get("price"),
+        "review": payload.get("rating"),
+    }
+
+
+def parse_json_response(response: HTTPResponseData) -> Any:
+    """Decode a product service response, mapping 404 and empty bodies to ``None``."""
+    if response.status == 404:
+        return None
+    if response.status >= 400:
+        raise RuntimeError(f"Product service returned HTTP {response.status}")
+    if response.status != 200 or not response.body.strip():
+        return None
+
+    try:
+        return json.loads(response.body.decode("utf-8"))
+    except ValueError as exc:
+        raise RuntimeError("Product service returned an invalid payload") from exc
+
 
 class FakeStoreProductGateway(ProductGateway):
     """Gateway that validates products against fakestoreapi.com."""
 
-    BASE_URL = "https://fakestoreapi.com/products/{product_id}"
+    PRODUCT_PATH = "/products/{product_id}"
+    CATALOG_PATH = "/products"
+
+    def __init__(
+        self,
+        *,
+        base_url: str | None = None,
+        max_workers: int | None = None,
+        batch_deadline: float | None = None,
+        http_client: PooledHTTPClient | None = None,
+    ):
+        cfg = _get_gateway_config(
+            {
+                "base_url": base_url,
+                "max_workers": max_workers,
+                "batch_deadline": batch_deadline,
+            }
+        )
+        self._max_workers = max(1, int(cfg.get("max_workers", 8)))
+        self._batch_deadline = float(cfg.get("batch_deadline", 8))
+        self._http = http_client or PooledHTTPClient(
+            cfg.get("base_url", "https://fakestoreapi.com"),
+            pool_size=int(cfg.get("pool_size", 10)),
+            connect_timeout=float(cfg.get("connect_timeout", 2)),
+            read_timeout=float(cfg.get("read_timeout", 5)),
+            keep_alive=bool(cfg.get("keep_alive", True)),
+        )
+        self._single_flight = SingleFlight()
+        # Shared by every batch, so concurrent requests never hold more than
+        # ``max_workers`` lookup threads between them.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="product-gateway",
+        )
+
+    @property
+    def single_flight_stats(self) -> SingleFlightStats:
+        return self._single_flight.stats
 
     def exists(self, product_id: int) -> bool:
         return self.get_details(product_id) is not None
@@ -19,25 +103,53 @@ class FakeStoreProductGateway(ProductGateway):
         if product_id <= 0:
             return None
 
-        url = self.BASE_URL.format(product_id=product_id)
-        req = request.Request(url, method="GET")
+        # Concurrent lookups for the same product share one outbound request.
+        return self._single_flight.do(product_id, lambda: self._fetch_details(product_id))
+
+    def _fetch_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        payload = self._get_json(self.PRODUCT_PATH.format(product_id=product_id))
+        if payload is None:
+            return None
+        return to_product_details(payload)
 
+    def fetch_catalog(self) -> List[Dict[str, Any]]:
+        """Return the raw payload of every product in the remote catalog."""
+        payload = self._get_json(self.CATALOG_PATH)
+        if not isinstance(payload, list):
+            raise RuntimeError("Product service returned an invalid catalog payload")
+        return payload
+
+    def _get_json(self, path: str) -> Any:
         try:
-            with request.urlopen(req, timeout=5) as response:
-                if response.status != 200:
-                    return None
-                payload = json.loads(response.read().decode("utf-8"))
-        except error.HTTPError as exc:
-            if exc.code == 404:
-                return None
-            raise RuntimeError(f"Product service returned HTTP {exc.code}") from exc
-        except error.URLError as exc:
+            response = self._http.get(path)
+        except PoolTimeout as exc:
+            raise ProductServiceBusy("No free connection to the product service") from exc
+        except TimeoutError as exc:
+            raise ProductServiceTimeout("Product service timed out") from exc
+        except (OSError, http.client.HTTPException) as exc:
             raise RuntimeError("Could not reach product service") from exc
+        return parse_json_response(response)
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Fetch details for several products concurrently.
+
+        Lookups run on the gateway's bounded worker pool and the whole batch
+        must finish within ``batch_deadline`` seconds. Otherwise lookups still
+        queued are cancelled and ``ProductServiceTimeout`` is raised, or
+        ``ProductServiceBusy`` when none of them got a worker in time.
+        """
+        unique_ids = list(dict.fromkeys(product_ids))
+        if not unique_ids:
+            return {}
+
+        futures = {self._executor.submit(self.get_details, product_id): product_id for product_id in unique_ids}
+        done, pending = wait(futures, timeout=self._batch_deadline)
+
+        if pending:
+            # cancel() only succeeds for lookups that never left the queue.
+            started = [future for future in pending if not future.cancel()]
+            if started:
+                raise ProductServiceTimeout("Product service did not answer within the batch deadline")
+            raise ProductServiceBusy("No free worker for the product lookups within the batch deadline")
 
-        return {
-            "id": payload.get("id"),
-            "title": payload.get("title"),
-            "image": payload.get("image"),
-            "price": payload.get("price"),
-            "review": payload.get("rating"),
-        }
+        return {futures[future]: future.result() for future in done}
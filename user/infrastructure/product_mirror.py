@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from django.db import transaction
+from django.utils import timezone
+
+from user.domain import ProductGateway
+from user.models import Product
+
+from .product_cache import bump_catalog_generation
+from .product_gateway import _get_gateway_config
+from .signals import product_catalog_synced
+
+_SYNCED_FIELDS = ("title", "description", "category", "image", "price", "rating")
+
+
+@dataclass(frozen=True)
+class ProductSyncResult:
+    """Outcome of a catalog synchronisation run."""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+
+def _content_hash(payload: Dict[str, Any]) -> str:
+    normalized = {field: payload.get(field) for field in ("id",) + _SYNCED_FIELDS}
+    encoded = json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _to_price(value: Any) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def sync_product_catalog(
+    payloads: Sequence[Dict[str, Any]],
+    *,
+    prune: bool = True,
+    batch_size: int = 500,
+    model=None,
+    cache_alias: Optional[str] = None,
+    min_prune_ratio: float = 0.5,
+) -> ProductSyncResult:
+    """Upsert the given catalog payloads into the local product mirror.
+
+    Only rows whose content hash changed are written. With ``prune`` the
+    products missing from ``payloads`` are removed from the mirror, unless
+    ``payloads`` holds fewer products than ``min_prune_ratio`` of the mirror:
+    an empty or truncated upstream answer then raises ``RuntimeError``
+    before anything is written, instead of wiping the mirror. The
+    catalog generation in ``cache_alias`` (the product cache alias by
+    default) is bumped afterwards, so every process drops its negative entries.
+    """
+    model = model or Product
+    synced_at = timezone.now()
+
+    incoming: Dict[int, Dict[str, Any]] = {}
+    for payload in payloads:
+        product_id = payload.get("id")
+        if isinstance(product_id, int) and product_id > 0:
+            incoming[product_id] = payload
+
+    with transaction.atomic():
+        if prune:
+            mirrored = model.objects.count()
+            if mirrored and len(incoming) < mirrored * min_prune_ratio:
+                raise RuntimeError(
+                    f"Refusing to prune: upstream returned {len(incoming)} product(s) "
+                    f"for {mirrored} mirrored; sync without pruning to accept it."
+                )
+
+        stored_hashes = dict(
+            model.objects.filter(pk__in=list(incoming)).values_list("id", "content_hash")
+        )
+
+        changed: List[Product] = []
+        created = updated = unchanged = 0
+        for product_id, payload in incoming.items():
+            content_hash = _content_hash(payload)
+            previous_hash = stored_hashes.get(product_id)
+            if previous_hash == content_hash:
+                unchanged += 1
+                continue
+            if previous_hash is None:
+                created += 1
+            else:
+                updated += 1
+            changed.append(
+                model(
+                    id=product_id,
+                    title=payload.get("title") or "",
+                    description=payload.get("description") or "",
+                    category=payload.get("category") or "",
+                    image=payload.get("image") or "",
+                    price=_to_price(payload.get("price")),
+                    rating=payload.get("rating"),
+                    content_hash=content_hash,
+                    synced_at=synced_at,
+                )
+            )
+
+        if changed:
+            model.objects.bulk_create(
+                changed,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=list(_SYNCED_FIELDS) + ["content_hash", "synced_at"],
+            )
+
+        deleted = 0
+        if prune:
+            deleted, _ = model.objects.exclude(pk__in=list(incoming)).delete()
+
+    bump_catalog_generation(cache_alias or _get_gateway_config().get("cache_alias", "default"))
+    product_catalog_synced.send(sender=model)
+    return ProductSyncResult(created=created, updated=updated, unchanged=unchanged, deleted=deleted)
+
+
+class DjangoProductGateway(ProductGateway):
+    """Product gateway reading from the local catalog mirror.
+
+    Products missing from the mirror are looked up through ``fallback``,
+    typically the remote FakeStore gateway, when one is configured.
+    """
+
+    def __init__(self, fallback: ProductGateway | None = None, model=None):
+        self._fallback = fallback
+        self._model = model or Product
+
+    @property
+    def inner(self) -> ProductGateway | None:
+        return self._fallback
+
+    def _to_details(self, instance) -> Dict[str, Any]:
+        return {
+            "id": instance.id,
+            "title": instance.title,
+            "image": instance.image or None,
+            "price": float(instance.price) if instance.price is not None else None,
+            "review": instance.rating,
+        }
+
+    def exists(self, product_id: int) -> bool:
+        if self._model.objects.filter(pk=product_id).exists():
+            return True
+        return self._fallback is not None and self._fallback.exists(product_id)
+
+    def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([product_id]).get(product_id)
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        unique_ids = [product_id for product_id in dict.fromkeys(product_ids) if product_id > 0]
+        if not unique_ids:
+            return {}
+
+        details: Dict[int, Optional[Dict[str, Any]]] = {
+            instance.id: self._to_details(instance)
+            for instance in self._model.objects.filter(pk__in=unique_ids)
+        }
+
+        missing = [product_id for product_id in unique_ids if product_id not in details]
+        if missing:
+            if self._fallback is not None:
+                details.update(self._fallback.get_many(missing))
+            else:
+                details.update(dict.fromkeys(missing))
+
+        return details
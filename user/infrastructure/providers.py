@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict
+from typing import Any, Dict
+
+from django.conf import settings
+
+from user.domain import AsyncProductGateway, ProductGateway
+
+from .async_gateway import SyncToAsyncProductGateway
+from .elasticsearch_gateway import ElasticsearchProductGateway
+from .favorite_cache import VersionedFavoriteListCache
+from .product_cache import CachedProductGateway, DjangoProductCache, LocalProductCache
+from .product_gateway import FakeStoreProductGateway, _get_gateway_config
+from .product_mirror import DjangoProductGateway
+from .resilience import CircuitBreaker, ResilientProductGateway
+from .token_versions import TokenVersionCache
+
+_gateway: ProductGateway | None = None
+_async_gateway: AsyncProductGateway | None = None
+_favorite_list_cache: VersionedFavoriteListCache | None = None
+_token_version_cache: TokenVersionCache | None = None
+_gateway_lock = threading.Lock()
+
+
+def _build_product_cache(cfg: Dict[str, Any], *, prefix: str = "cache", key_prefix: str = "product"):
+    backend = cfg.get("cache_backend", "local")
+    ttl = float(cfg.get(f"{prefix}_ttl", 300))
+    if backend == "django":
+        return DjangoProductCache(
+            alias=cfg.get("cache_alias", "default"),
+            ttl=ttl,
+            key_prefix=key_prefix,
+        )
+    return LocalProductCache(max_entries=int(cfg.get(f"{prefix}_max_entries", 1024)), ttl=ttl)
+
+
+def _with_resilience(gateway: ProductGateway, cfg: Dict[str, Any]) -> ProductGateway:
+    if not cfg.get("resilience_enabled", True):
+        return gateway
+    return ResilientProductGateway(
+        gateway,
+        breaker=CircuitBreaker(
+            failure_threshold=int(cfg.get("breaker_failure_threshold", 5)),
+            reset_timeout=float(cfg.get("breaker_reset_timeout", 30)),
+        ),
+        stale_cache=LocalProductCache(
+            max_entries=int(cfg.get("stale_max_entries", 4096)),
+            ttl=float(cfg.get("stale_ttl", 86400)),
+        ),
+        fresh_ttl=float(cfg.get("cache_ttl", 300)),
+        refresh_workers=int(cfg.get("refresh_workers", 2)),
+    )
+
+
+def build_product_gateway(config: Dict[str, Any] | None = None) -> ProductGateway:
+    """Assemble the product gateway stack described by ``settings.PRODUCT_GATEWAY``."""
+    cfg = _get_gateway_config(config)
+    gateway: ProductGateway = FakeStoreProductGateway()
+
+    backend = cfg.get("backend", "fakestore")
+    if backend == "database":
+        # The mirror is a local table: only the remote fallback needs the
+        # breaker, and ORM queries must stay on the caller's thread.
+        fallback = _with_resilience(gateway, cfg) if cfg.get("mirror_fallback", True) else None
+        gateway = DjangoProductGateway(fallback=fallback)
+    else:
+        if backend == "elasticsearch":
+            fallback = gateway if cfg.get("mirror_fallback", True) else None
+            gateway = ElasticsearchProductGateway(fallback=fallback)
+        gateway = _with_resilience(gateway, cfg)
+
+    if cfg.get("cache_backend"):
+        negative_cache = None
+        if float(cfg.get("negative_cache_ttl", 0)) > 0:
+            negative_cache = _build_product_cache(
+                cfg,
+                prefix="negative_cache",
+                key_prefix="product-missing",
+            )
+        gateway = CachedProductGateway(
+            gateway,
+            _build_product_cache(cfg),
+            negative_cache,
+            catalog_alias=cfg.get("cache_alias", "default"),
+        )
+
+    return gateway
+
+
+def get_product_gateway() -> ProductGateway:
+    """Return the process-wide product gateway, building it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = build_product_gateway()
+    return _gateway
+
+
+def build_async_product_gateway(config: Dict[str, Any] | None = None) -> AsyncProductGateway:
+    """Assemble the gateway used by async views.
+
+    Every backend reuses the blocking stack through ``sync_to_async``, so async
+    views get the same resilience, cache backend, pooled connections and
+    single-flight coalescing as the rest of the process. A native asyncio
+    client would keep one pool per event loop, and under WSGI each async view
+    runs on a loop of its own. Only the ORM-backed gateway needs the thread
+    holding Django's connection; the others run on the executor threads so
+    concurrent views still overlap their calls.
+    """
+    cfg = _get_gateway_config(config)
+    return SyncToAsyncProductGateway(
+        get_product_gateway() if config is None else build_product_gateway(config),
+        thread_sensitive=cfg.get("backend", "fakestore") == "database",
+    )
+
+
+def get_async_product_gateway() -> AsyncProductGateway:
+    """Return the process-wide async product gateway, building it on first use."""
+    global _async_gateway
+    if _async_gateway is None:
+        gateway = build_async_product_gateway()
+        with _gateway_lock:
+            if _async_gateway is None:
+                _async_gateway = gateway
+    return _async_gateway
+
+
+def build_favorite_list_cache(config: Dict[str, Any] | None = None) -> VersionedFavoriteListCache | None:
+    """Build the favorite list cache from ``settings.FAVORITE_LIST_CACHE``; ``None`` when disabled."""
+    cfg = dict(getattr(settings, "FAVORITE_LIST_CACHE", {}) or {})
+    cfg.update(config or {})
+    if not cfg.get("enabled", True):
+        return None
+    return VersionedFavoriteListCache(
+        LocalProductCache(
+            max_entries=int(cfg.get("max_entries", 10000)),
+            ttl=float(cfg.get("ttl", 60)),
+        ),
+        max_pages_per_customer=int(cfg.get("max_pages_per_customer", 8)),
+    )
+
+
+def get_favorite_list_cache() -> VersionedFavoriteListCache | None:
+    """Return the process-wide favorite list cache, building it on first use."""
+    global _favorite_list_cache
+    if _favorite_list_cache is None:
+        with _gateway_lock:
+            if _favorite_list_cache is None:
+                _favorite_list_cache = build_favorite_list_cache()
+    return _favorite_list_cache
+
+
+def build_token_version_cache(config: Dict[str, Any] | None = None) -> TokenVersionCache:
+    """Build the token version cache from ``settings.JWT_TOKEN_VERSION_CACHE``."""
+    cfg = dict(getattr(settings, "JWT_TOKEN_VERSION_CACHE", {}) or {})
+    cfg.update(config or {})
+    return TokenVersionCache(
+        LocalProductCache(
+            max_entries=int(cfg.get("max_entries", 10000)),
+            ttl=float(cfg.get("ttl", 30)),
+        )
+    )
+
+
+def get_token_version_cache() -> TokenVersionCache:
+    """Return the process-wide token version cache, building it on first use."""
+    global _token_version_cache
+    if _token_version_cache is None:
+        with _gateway_lock:
+            if _token_version_cache is None:
+                _token_version_cache = build_token_version_cache()
+    return _token_version_cache
+
+
+def product_gateway_stats(gateway: ProductGateway | None = None) -> Dict[str, Any]:
+    """Collect the counters exposed by each layer of the gateway stack."""
+    stats: Dict[str, Any] = {}
+    layer: Any = gateway or get_product_gateway()
+    while layer is not None:
+        if isinstance(layer, CachedProductGateway):
+            stats["cache"] = asdict(layer.stats)
+            stats["negative_cache"] = asdict(layer.negative_stats)
+        elif isinstance(layer, ResilientProductGateway):
+            stats["resilience"] = asdict(layer.stats)
+        elif isinstance(layer, FakeStoreProductGateway):
+            stats["single_flight"] = asdict(layer.single_flight_stats)
+        layer = getattr(layer, "inner", None)
+    return stats
+
+
+def reset_product_gateway() -> None:
+    """Drop the process-wide gateways and caches so the next call rebuilds them."""
+    global _gateway, _async_gateway, _favorite_list_cache, _token_version_cache
+    with _gateway_lock:
+        _gateway = None
+        _async_gateway = None
+        _favorite_list_cache = None
+        _token_version_cache = None
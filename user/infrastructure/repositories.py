@@ -1,20 +1,81 @@
 from __future__ import annotations
 
-from typing import Sequence
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Exists, F, FilteredRelation, Max, Min, OuterRef, Q
+from django.utils import timezone
 
 from user.domain import (
     CustomerDTO,
     CustomerNotFoundError,
+    CustomerPurgeDTO,
     CustomerRepository,
     FavoriteAlreadyExistsError,
+    FavoriteChangeDTO,
     FavoriteDTO,
     FavoriteNotFoundError,
     FavoriteRepository,
+    ProductPopularityDTO,
 )
-from user.models import Favorite
+from user.models import Favorite, FavoriteChange, ProductPopularity
+
+from .signals import customer_tokens_revoked
+
+# One statement applying signed count deltas: existing rows are updated in
+# place (never below zero) and positive deltas for unseen products are
+# inserted, falling back to an increment if another transaction inserted first.
+_ADJUST_POPULARITY_SQL = """
+WITH delta (product_id, amount) AS (
+    SELECT * FROM unnest(%(product_ids)s::integer[], %(amounts)s::integer[])
+),
+updated AS (
+    UPDATE {table} AS popularity
+    SET favorite_count = GREATEST(popularity.favorite_count + delta.amount, 0), updated_at = %(now)s
+    FROM delta
+    WHERE popularity.product_id = delta.product_id
+    RETURNING popularity.product_id
+)
+INSERT INTO {table} (product_id, favorite_count, updated_at)
+SELECT product_id, amount, %(now)s FROM delta
+WHERE amount > 0 AND product_id NOT IN (SELECT product_id FROM updated)
+ON CONFLICT (product_id) DO UPDATE
+SET favorite_count = {table}.favorite_count + EXCLUDED.favorite_count, updated_at = EXCLUDED.updated_at
+"""
+
+
+# Takes one favorite off the counter of every product a customer favorited.
+# Counter rows are locked in product order first, so concurrent deletions
+# cannot deadlock on them.
+_RELEASE_POPULARITY_SQL = """
+WITH released AS (
+    SELECT popularity.product_id FROM {table} AS popularity
+    JOIN {favorite_table} AS favorite ON favorite.product_id = popularity.product_id
+    WHERE favorite.customer_id = %(customer_id)s
+    ORDER BY popularity.product_id
+    FOR UPDATE OF popularity
+)
+UPDATE {table} AS popularity
+SET favorite_count = GREATEST(popularity.favorite_count - 1, 0), updated_at = %(now)s
+FROM released
+WHERE popularity.product_id = released.product_id
+"""
+
+
+def _adjust_product_popularity(deltas: Dict[int, int], model=None) -> None:
+    """Apply favorite count changes per product in a single statement."""
+    deltas = {product_id: amount for product_id, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    model = model or ProductPopularity
+    sql = _ADJUST_POPULARITY_SQL.format(table=connection.ops.quote_name(model._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            {"product_ids": list(deltas), "amounts": list(deltas.values()), "now": timezone.now()},
+        )
 
 
 class DjangoCustomerRepository(CustomerRepository):
@@ -34,79 +95,637 @@ class DjangoCustomerRepository(CustomerRepository):
         )
         return self._to_dto(instance)
 
-    def list(self) -> Sequence[CustomerDTO]:
-        instances = self._model.objects.order_by("id").all()
-        return [self._to_dto(instance) for instance in instances]
+    def _live(self):
+        """Customers not awaiting the background purge that follows a deletion."""
+        return self._model.objects.filter(deleted_at__isnull=True)
+
+    def _filtered(self, *, name_prefix: Optional[str], email_prefix: Optional[str]):
+        queryset = self._live()
+        if name_prefix:
+            queryset = queryset.filter(name__istartswith=name_prefix)
+        if email_prefix:
+            queryset = queryset.filter(email__istartswith=email_prefix)
+        return queryset
+
+    def list(
+        self,
+        *,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+    ) -> Sequence[CustomerDTO]:
+        """Return customers ordered by id, seeking past ``after`` when given."""
+        queryset = self._filtered(name_prefix=name_prefix, email_prefix=email_prefix)
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        queryset = queryset.order_by("id").values_list("id", "name", "email")
+        if limit is not None:
+            queryset = queryset[:limit]
+        return [CustomerDTO(id=pk, name=name, email=email) for pk, name, email in queryset]
+
+    def iterate(
+        self,
+        *,
+        name_prefix: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+        chunk_size: int = 2000,
+    ) -> Iterator[CustomerDTO]:
+        """Stream customers through a server-side cursor, holding one chunk in memory."""
+        queryset = self._filtered(name_prefix=name_prefix, email_prefix=email_prefix)
+        rows = queryset.order_by("id").values_list("id", "name", "email").iterator(chunk_size=chunk_size)
+        for pk, name, email in rows:
+            yield CustomerDTO(id=pk, name=name, email=email)
 
     def get(self, customer_id: int) -> CustomerDTO:
         try:
-            instance = self._model.objects.get(pk=customer_id)
+            instance = self._live().get(pk=customer_id)
         except self._model.DoesNotExist as exc:
             raise CustomerNotFoundError(customer_id) from exc
         return self._to_dto(instance)
 
     def update(self, *, customer_id: int, name: str, email: str) -> CustomerDTO:
-        try:
-            instance = self._model.objects.get(pk=customer_id)
-        except self._model.DoesNotExist as exc:
-            raise CustomerNotFoundError(customer_id) from exc
+        """Update name and email with one ``UPDATE ... RETURNING`` round trip.
 
-        instance.name = name
-        instance.email = email
-        instance.save(update_fields=["name", "email"])
-        return self._to_dto(instance)
+        A duplicate email still surfaces as ``IntegrityError`` from the unique
+        index, and no returned row means the customer does not exist.
+        """
+        table = connection.ops.quote_name(self._model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET name = %s, email = %s WHERE id = %s AND deleted_at IS NULL "
+                "RETURNING id, name, email",
+                [name, email, customer_id],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise CustomerNotFoundError(customer_id)
+        pk, name, email = row
+        return CustomerDTO(id=pk, name=name, email=email)
 
     def delete(self, customer_id: int) -> None:
-        try:
-            instance = self._model.objects.get(pk=customer_id)
-        except self._model.DoesNotExist as exc:
-            raise CustomerNotFoundError(customer_id) from exc
+        """Mark the customer deleted and inactive with a single UPDATE.
+
+        Its favorites, change log and the row itself are removed later by
+        ``purge_batch``. Favorite writes filter on the same column in the
+        UPDATE they start with, so none can land after this one commits.
+        The token version is bumped too, revoking every issued token, and the
+        customer's favorites stop counting toward product popularity at once
+        rather than when the purge reaches them.
+        """
+        with transaction.atomic():
+            updated = (
+                self._live()
+                .filter(pk=customer_id)
+                .update(deleted_at=timezone.now(), is_active=False, token_version=F("token_version") + 1)
+            )
+            if not updated:
+                raise CustomerNotFoundError(customer_id)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    _RELEASE_POPULARITY_SQL.format(
+                        table=connection.ops.quote_name(ProductPopularity._meta.db_table),
+                        favorite_table=connection.ops.quote_name(Favorite._meta.db_table),
+                    ),
+                    {"customer_id": customer_id, "now": timezone.now()},
+                )
+        customer_tokens_revoked.send(sender=self.__class__, customer_id=customer_id)
+
+    def token_version(self, customer_id: int) -> Optional[int]:
+        """Return the token version of an active customer, or ``None`` if it may not authenticate."""
+        return (
+            self._live()
+            .filter(pk=customer_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+
+    def revoke_tokens(self, customer_id: int) -> None:
+        """Invalidate every token issued so far to the customer."""
+        updated = self._live().filter(pk=customer_id).update(token_version=F("token_version") + 1)
+        if not updated:
+            raise CustomerNotFoundError(customer_id)
+        customer_tokens_revoked.send(sender=self.__class__, customer_id=customer_id)
+
+    def deleted_customer_ids(self, *, limit: int = 100) -> List[int]:
+        """Return deleted customers still awaiting their purge, oldest deletion first."""
+        queryset = self._model.objects.filter(deleted_at__isnull=False).order_by("deleted_at", "pk")
+        return list(queryset.values_list("pk", flat=True)[:limit])
+
+    def purge_batch(self, customer_id: int, *, batch_size: int = 1000) -> CustomerPurgeDTO:
+        """Remove up to ``batch_size`` rows of a deleted customer in one transaction.
+
+        Favorites go first, then change log entries; popularity already stopped
+        counting the favorites when the customer was deleted. A batch that
+        comes up short found the customer empty, so it also deletes the
+        customer row and reports completion.
+        """
+        with transaction.atomic():
+            try:
+                instance = self._model.objects.select_for_update().get(pk=customer_id, deleted_at__isnull=False)
+            except self._model.DoesNotExist as exc:
+                raise CustomerNotFoundError(customer_id) from exc
+
+            favorites = list(
+                Favorite.objects.filter(customer_id=customer_id).order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if favorites:
+                Favorite.objects.filter(customer_id=customer_id, id__in=favorites).delete()
+
+            change_ids = []
+            if len(favorites) < batch_size:
+                change_ids = list(
+                    FavoriteChange.objects.filter(customer_id=customer_id)
+                    .order_by("id")
+                    .values_list("id", flat=True)[: batch_size - len(favorites)]
+                )
+                if change_ids:
+                    FavoriteChange.objects.filter(id__in=change_ids).delete()
+
+            purged = len(favorites) + len(change_ids)
+            if purged < batch_size:
+                instance.delete()
+                return CustomerPurgeDTO(customer_id=customer_id, purged_rows=instance.purged_rows + purged, completed=True)
 
-        instance.delete()
+            self._model.objects.filter(pk=customer_id).update(purged_rows=F("purged_rows") + purged)
+            return CustomerPurgeDTO(customer_id=customer_id, purged_rows=instance.purged_rows + purged)
 
 
 class DjangoFavoriteRepository(FavoriteRepository):
-    """Favorite repository backed by Django ORM models."""
+    """Favorite repository backed by Django ORM models.
 
-    def __init__(self, favorite_model=None, customer_model=None):
+    The customer existence check is never a separate lookup: reads fold it
+    into their query through a LEFT JOIN from the customer row, and writes
+    get it from the favorites version UPDATE they run anyway.
+    """
+
+    _FAVORITE_FIELDS = ("id", "product_id", "title", "image", "price", "rating", "snapshot_at")
+
+    def __init__(self, favorite_model=None, customer_model=None, change_model=None, popularity_model=None):
         self._favorite_model = favorite_model or Favorite
         self._customer_model = customer_model or get_user_model()
+        self._change_model = change_model or FavoriteChange
+        self._popularity_model = popularity_model or ProductPopularity
 
-    def _get_customer(self, customer_id: int):
-        try:
-            return self._customer_model.objects.get(pk=customer_id)
-        except self._customer_model.DoesNotExist as exc:
-            raise CustomerNotFoundError(customer_id) from exc
+    def _customer_rows(
+        self,
+        customer_id: int,
+        relation: str,
+        fields: Sequence[str],
+        *,
+        condition: Q | None = None,
+        limit: Optional[int] = None,
+    ) -> List[tuple]:
+        """Read a customer's related rows through a LEFT JOIN from the customer row.
+
+        A missing customer yields no rows and one without matches yields a
+        single row of NULLs, so both cases are told apart in one query. The
+        first field must be the related primary key. The customer id is
+        also repeated as a constant in the join, so pruning a table
+        hash-partitioned on ``customer_id`` down to one partition does not
+        depend on the planner carrying it through the outer join.
+        """
+        join = Q(**{f"{relation}__customer_id": customer_id}) & (condition or Q())
+        rows = (
+            self._customer_model.objects.filter(pk=customer_id, deleted_at__isnull=True)
+            .annotate(related=FilteredRelation(relation, condition=join))
+            .order_by("related__id")
+            .values_list(*(f"related__{field}" for field in fields))
+        )
+        if limit is not None:
+            rows = rows[:limit]
+        rows = list(rows)
+        if not rows:
+            raise CustomerNotFoundError(customer_id)
+        return [row for row in rows if row[0] is not None]
+
+    def _bump_version(self, customer_id: int) -> None:
+        """Increment the favorites version, which also proves the customer exists.
+
+        Writes run this first: the UPDATE locks the customer row, so concurrent
+        writes to one customer's favorites are serialized behind it, and a
+        customer deleted meanwhile is re-checked and reported as not found.
+        """
+        updated = self._customer_model.objects.filter(pk=customer_id, deleted_at__isnull=True).update(
+            favorites_version=F("favorites_version") + 1
+        )
+        if not updated:
+            raise CustomerNotFoundError(customer_id)
+
+    def _row_to_dto(self, customer_id: int, row: tuple) -> FavoriteDTO:
+        pk, product_id, title, image, price, rating, snapshot_at = row
+        return FavoriteDTO(
+            id=pk,
+            customer_id=customer_id,
+            product_id=product_id,
+            title=title,
+            image=image,
+            price=float(price) if price is not None else None,
+            review=rating,
+            snapshot_at=snapshot_at,
+        )
 
     def _to_dto(self, instance) -> FavoriteDTO:
         return FavoriteDTO(
             id=instance.id,
             customer_id=instance.customer_id,
             product_id=instance.product_id,
+            title=instance.title,
+            image=instance.image,
+            price=float(instance.price) if instance.price is not None else None,
+            review=instance.rating,
+            snapshot_at=instance.snapshot_at,
         )
 
-    def add(self, *, customer_id: int, product_id: int) -> FavoriteDTO:
-        customer = self._get_customer(customer_id)
+    def _snapshot_fields(self, details: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "title": details.get("title"),
+            "image": details.get("image"),
+            "price": details.get("price"),
+            "rating": details.get("review"),
+            "snapshot_at": timezone.now(),
+        }
+
+    def add(
+        self,
+        *,
+        customer_id: int,
+        product_id: int,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> FavoriteDTO:
         try:
-            instance = self._favorite_model.objects.create(
-                customer=customer,
-                product_id=product_id,
-            )
+            with transaction.atomic():
+                self._bump_version(customer_id)
+                instance = self._favorite_model.objects.create(
+                    customer_id=customer_id,
+                    product_id=product_id,
+                    **(self._snapshot_fields(details) if details else {}),
+                )
+                self._change_model.objects.create(
+                    customer_id=customer_id,
+                    product_id=product_id,
+                    action=self._change_model.ADDED,
+                )
+                _adjust_product_popularity({product_id: 1}, self._popularity_model)
         except IntegrityError as exc:
             raise FavoriteAlreadyExistsError(customer_id, product_id) from exc
 
         return self._to_dto(instance)
 
-    def list(self, *, customer_id: int) -> Sequence[FavoriteDTO]:
-        self._get_customer(customer_id)
-        instances = self._favorite_model.objects.filter(customer_id=customer_id).order_by("id")
-        return [self._to_dto(instance) for instance in instances]
+    def _change_rows(self, customer_id: int, product_ids: Iterable[int], action: str) -> List[FavoriteChange]:
+        return [
+            self._change_model(customer_id=customer_id, product_id=product_id, action=action)
+            for product_id in product_ids
+        ]
+
+    def add_many(self, *, customer_id: int, details_by_product_id: Dict[int, Dict[str, Any]]) -> Set[int]:
+        """Insert favorites with their snapshots in one statement, skipping existing pairs.
+
+        Returns the product ids actually inserted. Stored ids are re-read once
+        the version bump holds the customer lock, so favorites a concurrent
+        request added first are neither logged nor counted again.
+        """
+        if not details_by_product_id:
+            return set()
+        with transaction.atomic():
+            self._bump_version(customer_id)
+            stored = self._stored_product_ids(customer_id, details_by_product_id)
+            added = {
+                product_id: details
+                for product_id, details in details_by_product_id.items()
+                if product_id not in stored
+            }
+            if added:
+                self._insert_many(customer_id, added)
+                self._change_model.objects.bulk_create(
+                    self._change_rows(customer_id, added, self._change_model.ADDED)
+                )
+                _adjust_product_popularity(dict.fromkeys(added, 1), self._popularity_model)
+        return set(added)
+
+    def _stored_product_ids(self, customer_id: int, product_ids: Iterable[int]) -> Set[int]:
+        """Read which of ``product_ids`` the customer has; call it holding the customer lock."""
+        return set(
+            self._favorite_model.objects.filter(customer_id=customer_id, product_id__in=list(product_ids))
+            .order_by()
+            .values_list("product_id", flat=True)
+        )
+
+    def _insert_many(self, customer_id: int, details_by_product_id: Dict[int, Dict[str, Any]]) -> None:
+        self._favorite_model.objects.bulk_create(
+            [
+                self._favorite_model(
+                    customer_id=customer_id,
+                    product_id=product_id,
+                    **self._snapshot_fields(details),
+                )
+                for product_id, details in details_by_product_id.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    def existing_product_ids(
+        self,
+        *,
+        customer_id: int,
+        product_ids: Optional[Iterable[int]] = None,
+    ) -> Set[int]:
+        """Return the customer's favorited product ids, optionally limited to ``product_ids``."""
+        condition = None
+        if product_ids is not None:
+            condition = Q(favorites__product_id__in=list(product_ids))
+        rows = self._customer_rows(customer_id, "favorites", ("id", "product_id"), condition=condition)
+        return {product_id for _, product_id in rows}
+
+    def apply_diff(
+        self,
+        *,
+        customer_id: int,
+        add: Dict[int, Dict[str, Any]],
+        remove: Iterable[int],
+    ) -> Tuple[Set[int], Set[int]]:
+        """Insert ``add`` and delete ``remove`` atomically, one statement each.
+
+        Change log rows for both sides are written with a single insert.
+        Stored ids are re-read once the version bump holds the customer lock,
+        and only the changes still missing are applied, so rows a concurrent
+        request already inserted or deleted are neither logged nor counted.
+        Returns the product ids actually added and removed.
+        """
+        remove = list(remove)
+        with transaction.atomic():
+            self._bump_version(customer_id)
+            stored = self._stored_product_ids(customer_id, [*add, *remove])
+            add = {product_id: details for product_id, details in add.items() if product_id not in stored}
+            remove = [product_id for product_id in remove if product_id in stored]
+            if add:
+                self._insert_many(customer_id, add)
+            if remove:
+                self._favorite_model.objects.filter(
+                    customer_id=customer_id,
+                    product_id__in=remove,
+                ).delete()
+            self._change_model.objects.bulk_create(
+                self._change_rows(customer_id, add, self._change_model.ADDED)
+                + self._change_rows(customer_id, remove, self._change_model.REMOVED)
+            )
+            _adjust_product_popularity(
+                {**dict.fromkeys(add, 1), **dict.fromkeys(remove, -1)},
+                self._popularity_model,
+            )
+        return set(add), set(remove)
+
+    def list(
+        self,
+        *,
+        customer_id: int,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[FavoriteDTO]:
+        """Return favorites ordered by id, seeking past ``after`` when given."""
+        condition = Q(favorites__id__gt=after) if after is not None else None
+        rows = self._customer_rows(
+            customer_id,
+            "favorites",
+            self._FAVORITE_FIELDS,
+            condition=condition,
+            limit=limit,
+        )
+        return [self._row_to_dto(customer_id, row) for row in rows]
 
     def remove(self, *, customer_id: int, product_id: int) -> None:
-        self._get_customer(customer_id)
-        deleted, _ = self._favorite_model.objects.filter(
-            customer_id=customer_id,
-            product_id=product_id,
-        ).delete()
-        if deleted == 0:
-            raise FavoriteNotFoundError(customer_id, product_id)
+        with transaction.atomic():
+            self._bump_version(customer_id)
+            deleted, _ = self._favorite_model.objects.filter(
+                customer_id=customer_id,
+                product_id=product_id,
+            ).delete()
+            if deleted == 0:
+                raise FavoriteNotFoundError(customer_id, product_id)
+            self._change_model.objects.create(
+                customer_id=customer_id,
+                product_id=product_id,
+                action=self._change_model.REMOVED,
+            )
+            _adjust_product_popularity({product_id: -1}, self._popularity_model)
+
+    def favorites_version(self, *, customer_id: int) -> int:
+        """Return the customer's favorites version with a single indexed lookup."""
+        version = (
+            self._customer_model.objects.filter(pk=customer_id, deleted_at__isnull=True)
+            .values_list("favorites_version", flat=True)
+            .first()
+        )
+        if version is None:
+            raise CustomerNotFoundError(customer_id)
+        return version
+
+    def changes_since(self, *, customer_id: int, since: int = 0, limit: int = 100) -> Sequence[FavoriteChangeDTO]:
+        """Return change log entries with a sequence greater than ``since``, oldest first."""
+        rows = self._customer_rows(
+            customer_id,
+            "favorite_changes",
+            ("id", "product_id", "action", "created_at"),
+            condition=Q(favorite_changes__id__gt=since),
+            limit=limit,
+        )
+        return [
+            FavoriteChangeDTO(sequence=pk, product_id=product_id, action=action, created_at=created_at)
+            for pk, product_id, action, created_at in rows
+        ]
+
+    def most_favorited(self, *, limit: int) -> Sequence[ProductPopularityDTO]:
+        """Return the ``limit`` products with the most favorites, served by the rank index."""
+        rows = (
+            self._popularity_model.objects.filter(favorite_count__gt=0)
+            .order_by("-favorite_count", "product_id")
+            .values_list("product_id", "favorite_count")[:limit]
+        )
+        return [ProductPopularityDTO(product_id=product_id, favorite_count=count) for product_id, count in rows]
+
+    def iterate_customer_ids(
+        self,
+        *,
+        product_id: int,
+        after: Optional[int] = None,
+        batch_size: int = 2000,
+    ) -> Iterator[int]:
+        """Yield ids of customers who favorited ``product_id``, ascending, after ``after``.
+
+        Rows are fetched in keyset batches over the (product_id, customer_id)
+        index, so each query is a bounded index range scan and no cursor or
+        transaction stays open while the caller consumes the ids.
+        """
+        while True:
+            # Deleted customers awaiting their purge are left out.
+            favorites = self._favorite_model.objects.filter(product_id=product_id, customer__deleted_at__isnull=True)
+            if after is not None:
+                favorites = favorites.filter(customer_id__gt=after)
+            batch = list(favorites.order_by("customer_id").values_list("customer_id", flat=True)[:batch_size])
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            after = batch[-1]
+
+    def reconcile_popularity(self, *, batch_size: int = 1000) -> int:
+        """Recount favorites per product in batches of product ids and fix drifted counters.
+
+        Batches are paged by keyset over the product ids present in either
+        table, so sparse ids cost no empty round trips. Each batch runs in its
+        own transaction with its popularity rows locked, so increments from
+        concurrent writes queue behind the correction instead of being
+        overwritten. Returns the number of corrected products.
+        """
+        batch_size = max(1, int(batch_size))
+        corrected = 0
+        after = 0
+        while True:
+            product_ids = sorted(
+                {
+                    *self._next_product_ids(self._favorite_model.objects.all(), after, batch_size),
+                    *self._next_product_ids(self._popularity_model.objects.all(), after, batch_size),
+                }
+            )[:batch_size]
+            if not product_ids:
+                return corrected
+            after = product_ids[-1]
+            filters = {"product_id__in": product_ids}
+            with transaction.atomic():
+                stored = dict(
+                    self._popularity_model.objects.select_for_update()
+                    .filter(**filters)
+                    .values_list("product_id", "favorite_count")
+                )
+                actual = dict(
+                    self._favorite_model.objects.filter(**filters, customer__deleted_at__isnull=True)
+                    .values("product_id")
+                    .annotate(total=Count("id"))
+                    .values_list("product_id", "total")
+                )
+                drifted = {
+                    product_id: actual.get(product_id, 0)
+                    for product_id in stored.keys() | actual.keys()
+                    if stored.get(product_id, 0) != actual.get(product_id, 0)
+                }
+                if drifted:
+                    self._popularity_model.objects.bulk_create(
+                        [
+                            self._popularity_model(product_id=product_id, favorite_count=count)
+                            for product_id, count in drifted.items()
+                        ],
+                        update_conflicts=True,
+                        unique_fields=["product_id"],
+                        update_fields=["favorite_count", "updated_at"],
+                    )
+                corrected += len(drifted)
+            # A short batch means both tables ran out of ids.
+            if len(product_ids) < batch_size:
+                return corrected
+
+    def _next_product_ids(self, queryset, after: int, limit: int) -> List[int]:
+        return list(
+            queryset.filter(product_id__gt=after)
+            .order_by("product_id")
+            .values_list("product_id", flat=True)
+            .distinct()[:limit]
+        )
+
+    def compact_changes(self, *, batch_size: int = 10000) -> int:
+        """Delete change log entries superseded by a later entry for the same product.
+
+        Replaying only the latest entry per (customer, product) still yields the
+        final state from any ``since``, so compaction never invalidates a client's
+        position. Work is split into sequence ranges to keep transactions short.
+        """
+        bounds = self._change_model.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            return 0
+
+        superseded = Exists(
+            self._change_model.objects.filter(
+                customer_id=OuterRef("customer_id"),
+                product_id=OuterRef("product_id"),
+                id__gt=OuterRef("id"),
+            )
+        )
+        deleted = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            count, _ = self._change_model.objects.filter(
+                superseded,
+                id__gte=start,
+                id__lt=start + batch_size,
+            ).delete()
+            deleted += count
+        return deleted
+
+    def save_snapshots(
+        self,
+        details_by_product_id: Dict[int, Optional[Dict[str, Any]]],
+        *,
+        customer_id: Optional[int] = None,
+        customer_batch_size: int = 500,
+    ) -> int:
+        """Overwrite the stored snapshot of the favorites of the given products.
+
+        ``None`` details mean the product was looked up and not found: only
+        ``snapshot_at`` is stamped, so it is not looked up again until the
+        snapshot is stale. Returns the number of rows given new details.
+
+        With ``customer_id`` only that customer's favorites are written, by a
+        listing backfilling what it already served: the favorites version is
+        left alone and no lock is taken. Without it, every affected customer
+        is refreshed ``customer_batch_size`` at a time, each batch in its own
+        transaction that locks the customers before their favorite rows (the
+        order every favorite write takes) and bumps their favorites version.
+        """
+        if customer_id is not None:
+            return self._write_snapshots(
+                self._favorite_model.objects.filter(customer_id=customer_id),
+                details_by_product_id,
+            )
+
+        found_ids = [product_id for product_id, details in details_by_product_id.items() if details is not None]
+        affected = self._customer_model.objects.filter(
+            deleted_at__isnull=True,
+            pk__in=self._favorite_model.objects.filter(product_id__in=list(details_by_product_id)).values(
+                "customer_id"
+            ),
+        ).order_by("pk")
+        batch_size = max(1, int(customer_batch_size))
+        updated = 0
+        after = 0
+        while True:
+            with transaction.atomic():
+                customer_ids = list(
+                    affected.filter(pk__gt=after).select_for_update().values_list("pk", flat=True)[:batch_size]
+                )
+                if not customer_ids:
+                    break
+                self._customer_model.objects.filter(
+                    pk__in=customer_ids,
+                    favorites__product_id__in=found_ids,
+                ).update(favorites_version=F("favorites_version") + 1)
+                updated += self._write_snapshots(
+                    self._favorite_model.objects.filter(customer_id__in=customer_ids),
+                    details_by_product_id,
+                )
+            if len(customer_ids) < batch_size:
+                break
+            after = customer_ids[-1]
+        return updated
+
+    def _write_snapshots(self, favorites, details_by_product_id: Dict[int, Optional[Dict[str, Any]]]) -> int:
+        updated = 0
+        for product_id, details in details_by_product_id.items():
+            if details is None:
+                favorites.filter(product_id=product_id).update(snapshot_at=timezone.now())
+            else:
+                updated += favorites.filter(product_id=product_id).update(**self._snapshot_fields(details))
+        return updated
+
+    def snapshot_product_ids(self, *, older_than: Optional[datetime] = None) -> List[int]:
+        """Return favorited product ids, limited to stale snapshots when ``older_than`` is set."""
+        queryset = self._favorite_model.objects.all()
+        if older_than is not None:
+            queryset = queryset.filter(Q(snapshot_at__isnull=True) | Q(snapshot_at__lt=older_than))
+        return list(queryset.order_by("product_id").values_list("product_id", flat=True).distinct())
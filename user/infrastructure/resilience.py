@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from user.domain import ProductGateway
+
+from .product_cache import LocalProductCache
+from .product_gateway import ProductServiceBusy, ProductServiceTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Classic three-state circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected. Once ``reset_timeout`` seconds have passed a single
+    probe is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._reset_timeout = float(reset_timeout)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            if self._state is CircuitState.OPEN and self._reset_elapsed():
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def _reset_elapsed(self) -> bool:
+        return self._clock() - self._opened_at >= self._reset_timeout
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is not self._state:
+            logger.warning("Product gateway circuit %s -> %s", self._state.value, state.value)
+            self._state = state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return True
+            if self._state is CircuitState.OPEN:
+                if not self._reset_elapsed():
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._transition(CircuitState.CLOSED)
+
+    def release_probe(self) -> None:
+        """Let a new probe through after a call that said nothing about the upstream."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state is CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+                self._transition(CircuitState.OPEN)
+
+
+@dataclass(frozen=True)
+class ResilienceStats:
+    """Snapshot of the resilience wrapper counters."""
+
+    state: str
+    stale_served: int = 0
+    short_circuited: int = 0
+    timeouts: int = 0
+    background_refreshes: int = 0
+
+
+class ResilientProductGateway(ProductGateway):
+    """Protect callers from a slow or failing product gateway.
+
+    * Details younger than ``fresh_ttl`` are served directly.
+    * Older details (up to the stale cache TTL) are served immediately while a
+      background refresh is scheduled (stale-while-revalidate).
+    * Synchronous upstream calls run on the caller's thread, bounded by the
+      inner gateway's own timeouts, and go through a ``CircuitBreaker``; when
+      the circuit is open, stale details are still served and anything else
+      fails fast with ``RuntimeError``. Only upstream errors and timeouts count
+      as failures, not lookups turned away for lack of local capacity.
+
+    Background refreshes run on ``executor``, which no foreground call waits on.
+    """
+
+    def __init__(
+        self,
+        gateway: ProductGateway,
+        *,
+        breaker: CircuitBreaker | None = None,
+        stale_cache: LocalProductCache | None = None,
+        fresh_ttl: float = 300,
+        refresh_workers: int = 2,
+        executor: Executor | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._gateway = gateway
+        self._breaker = breaker or CircuitBreaker()
+        self._stale = stale_cache or LocalProductCache(max_entries=4096, ttl=86400)
+        self._fresh_ttl = float(fresh_ttl)
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max(1, int(refresh_workers)),
+            thread_name_prefix="product-gateway-refresh",
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refreshing: Set[int] = set()
+        self._stale_served = 0
+        self._short_circuited = 0
+        self._timeouts = 0
+        self._background_refreshes = 0
+
+    @property
+    def inner(self) -> ProductGateway:
+        return self._gateway
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def stats(self) -> ResilienceStats:
+        with self._lock:
+            return ResilienceStats(
+                state=self._breaker.state.value,
+                stale_served=self._stale_served,
+                short_circuited=self._short_circuited,
+                timeouts=self._timeouts,
+                background_refreshes=self._background_refreshes,
+            )
+
+    def exists(self, product_id: int) -> bool:
+        return self.get_details(product_id) is not None
+
+    def get_details(self, product_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([product_id]).get(product_id)
+
+    def get_many(self, product_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        unique_ids = list(dict.fromkeys(product_ids))
+        if not unique_ids:
+            return {}
+
+        now = self._clock()
+        details: Dict[int, Optional[Dict[str, Any]]] = {}
+        expired: List[int] = []
+        for product_id, (fetched_at, value) in self._stale.get_many(unique_ids).items():
+            details[product_id] = value
+            if now - fetched_at >= self._fresh_ttl:
+                expired.append(product_id)
+
+        if expired:
+            with self._lock:
+                self._stale_served += len(expired)
+            self._schedule_refresh(expired)
+
+        missing = [product_id for product_id in unique_ids if product_id not in details]
+        if missing:
+            details.update(self._fetch(missing))
+        return details
+
+    def _remember(self, fetched: Dict[int, Optional[Dict[str, Any]]]) -> None:
+        fetched_at = self._clock()
+        self._stale.set_many(
+            {key: (fetched_at, value) for key, value in fetched.items() if value is not None}
+        )
+        for key, value in fetched.items():
+            if value is None:
+                self._stale.delete(key)
+
+    def _fetch(self, product_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        if not self._breaker.allow_request():
+            with self._lock:
+                self._short_circuited += 1
+            raise RuntimeError("Product service circuit is open")
+
+        return self._call(product_ids)
+
+    def _call(self, product_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        try:
+            fetched = self._gateway.get_many(product_ids)
+        except ProductServiceBusy:
+            self._breaker.release_probe()
+            raise
+        except Exception as exc:
+            self._breaker.record_failure()
+            if isinstance(exc, ProductServiceTimeout):
+                with self._lock:
+                    self._timeouts += 1
+            raise
+
+        self._breaker.record_success()
+        self._remember(fetched)
+        return fetched
+
+    def _schedule_refresh(self, product_ids: List[int]) -> None:
+        with self._lock:
+            pending = [product_id for product_id in product_ids if product_id not in self._refreshing]
+            self._refreshing.update(pending)
+        if not pending:
+            return
+        if not self._breaker.allow_request():
+            self._finish_refresh(pending)
+            return
+        self._executor.submit(self._refresh, pending)
+
+    def _refresh(self, product_ids: List[int]) -> None:
+        try:
+            self._call(product_ids)
+        except Exception:
+            logger.warning("Background refresh failed for products %s", product_ids, exc_info=True)
+        else:
+            with self._lock:
+                self._background_refreshes += 1
+        finally:
+            self._finish_refresh(product_ids)
+
+    def _finish_refresh(self, product_ids: List[int]) -> None:
+        with self._lock:
+            self._refreshing.difference_update(product_ids)
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent after the product catalog has been re-synchronised from its source, so
+# cached lookups (notably "unknown product" answers) can be discarded.
+product_catalog_synced = Signal()
+
+# Sent with ``customer_id`` after a customer's token version was bumped through
+# a queryset UPDATE, which fires no ``post_save``.
+customer_tokens_revoked = Signal()
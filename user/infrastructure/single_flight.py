@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Snapshot of single-flight counters."""
+
+    calls: int = 0
+    collapsed: int = 0
+
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls sharing a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still in flight wait for it and receive the same result or exception.
+    Threads and asyncio tasks are tracked separately, since a coroutine must
+    never block its event loop waiting on a thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._async_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._leaders = 0
+        self._collapsed = 0
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(calls=self._leaders, collapsed=self._collapsed)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._collapsed += 1
+                leader = False
+            else:
+                call = self._calls[key] = _InFlightCall()
+                self._leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            future = calls.get(key)
+            if future is not None:
+                self._collapsed += 1
+                leader = False
+            else:
+                future = calls[key] = loop.create_future()
+                self._leaders += 1
+                leader = True
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved even when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                calls.pop(key, None)
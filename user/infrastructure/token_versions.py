@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from .product_cache import CacheStats, LocalProductCache
+from .repositories import DjangoCustomerRepository
+from .signals import customer_tokens_revoked
+
+# Stored for customers that may not authenticate; token versions are never negative.
+_INACTIVE = -1
+
+
+class TokenVersionCache:
+    """In-process cache of the token version each customer currently accepts.
+
+    A miss loads the version with one primary key lookup and customers that
+    are inactive or deleted are cached as ``None``. Revocations made in this
+    process drop the entry right away and again once their transaction
+    commits; other processes see them when the storage's TTL expires.
+    """
+
+    def __init__(
+        self,
+        storage: LocalProductCache | None = None,
+        *,
+        loader: Callable[[int], Optional[int]] | None = None,
+    ):
+        self._storage = storage or LocalProductCache(max_entries=10000, ttl=30)
+        self._loader = loader or DjangoCustomerRepository().token_version
+        customer_tokens_revoked.connect(self._on_tokens_revoked, weak=True)
+        post_save.connect(self._on_customer_saved, sender=get_user_model(), weak=True)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._storage.stats
+
+    def get(self, customer_id: int) -> Optional[int]:
+        """Return the customer's token version, or ``None`` if it may not authenticate."""
+        version = self._storage.get_many([customer_id]).get(customer_id)
+        if version is None:
+            loaded = self._loader(customer_id)
+            version = _INACTIVE if loaded is None else loaded
+            self._storage.set_many({customer_id: version})
+        return None if version == _INACTIVE else version
+
+    def invalidate(self, customer_id: int) -> None:
+        self._storage.delete(customer_id)
+
+    def clear(self) -> None:
+        self._storage.clear()
+
+    def _forget(self, customer_id: int) -> None:
+        # A request racing the revoking transaction may reload the old
+        # version before it commits, so the entry is dropped once more after.
+        self.invalidate(customer_id)
+        transaction.on_commit(partial(self.invalidate, customer_id))
+
+    def _on_tokens_revoked(self, sender, customer_id: int, **kwargs) -> None:
+        self._forget(customer_id)
+
+    def _on_customer_saved(self, sender, instance, **kwargs) -> None:
+        self._forget(instance.pk)
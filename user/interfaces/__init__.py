@@ -1,13 +1,25 @@
 from .views import (
     CustomerDetailView,
+    CustomerExportView,
     CustomerListCreateView,
+    FavoriteBulkCreateView,
+    FavoriteChangesView,
     FavoriteDetailView,
     FavoriteListCreateView,
+    MostFavoritedProductsView,
+    ProductFavoritersView,
+    ProductGatewayStatsView,
 )
 
 __all__ = [
     "CustomerDetailView",
     "CustomerListCreateView",
+    "CustomerExportView",
     "FavoriteListCreateView",
+    "FavoriteBulkCreateView",
+    "FavoriteChangesView",
     "FavoriteDetailView",
+    "MostFavoritedProductsView",
+    "ProductFavoritersView",
+    "ProductGatewayStatsView",
 ]
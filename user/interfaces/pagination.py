@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+
+
+def encode_cursor(after: int) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps({"after": after}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """Return the keyset position stored in ``cursor``; ``None`` starts from the beginning."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        after = json.loads(raw)["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(after, int) or isinstance(after, bool) or after < 0:
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def parse_limit(value: str | None) -> int:
+    """Parse the ``limit`` query parameter, capping it at ``API_MAX_PAGE_SIZE``."""
+    if value is None or value == "":
+        return settings.API_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError as exc:
+        raise ValueError("Invalid limit") from exc
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return min(limit, settings.API_MAX_PAGE_SIZE)
+
+
+def parse_after(value: str | None) -> int | None:
+    """Parse a raw ``after`` keyset position; missing means from the beginning."""
+    if value is None or value == "":
+        return None
+    try:
+        after = int(value)
+    except ValueError as exc:
+        raise ValueError("Invalid after") from exc
+    if after < 0:
+        raise ValueError("Invalid after")
+    return after
+
+
+def parse_since(value: str | None) -> int:
+    """Parse the ``since`` sequence of a change feed; missing means from the beginning."""
+    if value is None or value == "":
+        return 0
+    try:
+        since = int(value)
+    except ValueError as exc:
+        raise ValueError("Invalid since") from exc
+    if since < 0:
+        raise ValueError("Invalid since")
+    return since
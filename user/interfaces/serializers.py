@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from user.domain import BulkFavoriteResultDTO
+
 
 class CustomerOutputSerializer(serializers.Serializer):
     id = serializers.IntegerField()
@@ -16,10 +18,56 @@ class CustomerCreateInputSerializer(CustomerInputSerializer):
     password = serializers.CharField(write_only=True, min_length=1)
 
 
+class CustomerPageSerializer(serializers.Serializer):
+    results = CustomerOutputSerializer(many=True)
+    next = serializers.CharField(allow_null=True, help_text="Cursor for the next page, or null on the last page.")
+
+
 class FavoriteCreateSerializer(serializers.Serializer):
     product_id = serializers.IntegerField(min_value=1)
 
 
+class FavoriteBulkCreateSerializer(serializers.Serializer):
+    MAX_ITEMS = 500
+
+    product_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_ITEMS,
+    )
+
+
+class FavoriteSyncSerializer(serializers.Serializer):
+    MAX_ITEMS = 2000
+
+    product_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=True,
+        max_length=MAX_ITEMS,
+    )
+
+
+class FavoriteSyncResultSerializer(serializers.Serializer):
+    added = serializers.ListField(child=serializers.IntegerField())
+    removed = serializers.ListField(child=serializers.IntegerField())
+    unknown_products = serializers.ListField(child=serializers.IntegerField())
+
+
+class FavoriteBulkResultSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=[
+            BulkFavoriteResultDTO.ADDED,
+            BulkFavoriteResultDTO.DUPLICATE,
+            BulkFavoriteResultDTO.UNKNOWN_PRODUCT,
+        ]
+    )
+
+
+class FavoriteBulkResponseSerializer(serializers.Serializer):
+    results = FavoriteBulkResultSerializer(many=True)
+
+
 class FavoriteOutputSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     customer_id = serializers.IntegerField()
@@ -30,3 +78,31 @@ class FavoriteOutputSerializer(serializers.Serializer):
     rating = serializers.FloatField(required=False, allow_null=True)
     image = serializers.CharField(required=False, allow_null=True, allow_blank=True)
     review = serializers.JSONField(required=False, allow_null=True)
+    snapshot_at = serializers.DateTimeField(required=False, allow_null=True)
+
+
+class FavoritePageSerializer(serializers.Serializer):
+    results = FavoriteOutputSerializer(many=True)
+    next = serializers.CharField(allow_null=True, help_text="Cursor for the next page, or null on the last page.")
+
+
+class FavoriteChangeSerializer(serializers.Serializer):
+    sequence = serializers.IntegerField()
+    product_id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=["added", "removed"])
+    created_at = serializers.DateTimeField()
+
+
+class FavoriteChangesSerializer(serializers.Serializer):
+    changes = FavoriteChangeSerializer(many=True)
+    last_sequence = serializers.IntegerField(help_text="Pass as `since` on the next call.")
+    has_more = serializers.BooleanField()
+
+
+class ProductPopularitySerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    favorite_count = serializers.IntegerField()
+
+
+class MostFavoritedProductsSerializer(serializers.Serializer):
+    results = ProductPopularitySerializer(many=True)
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import inspect
+import itertools
+import json
 from collections.abc import Mapping
 from dataclasses import asdict
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
 
-from drf_spectacular.utils import OpenApiResponse, extend_schema
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework.exceptions import (
     AuthenticationFailed,
     NotAuthenticated,
@@ -19,12 +27,19 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from user.application import (
-    AddFavorite,
+    AsyncAddFavorite,
+    AsyncAddFavorites,
+    AsyncSyncFavorites,
+    AsyncListFavorites,
     CreateCustomer,
     DeleteCustomer,
+    ExportCustomers,
+    ExportProductFavoriters,
     GetCustomer,
+    GetFavoritesVersion,
     ListCustomers,
-    ListFavorites,
+    ListFavoriteChanges,
+    ListMostFavoritedProducts,
     RemoveFavorite,
     UpdateCustomer,
 )
@@ -38,16 +53,106 @@ from user.domain import (
 from user.infrastructure import (
     DjangoCustomerRepository,
     DjangoFavoriteRepository,
-    FakeStoreProductGateway,
+    get_async_product_gateway,
+    get_favorite_list_cache,
+    product_gateway_stats,
 )
+from user.interfaces.pagination import decode_cursor, encode_cursor, parse_after, parse_limit, parse_since
 from user.interfaces.serializers import (
     CustomerCreateInputSerializer,
     CustomerInputSerializer,
     CustomerOutputSerializer,
+    CustomerPageSerializer,
+    FavoriteBulkCreateSerializer,
+    FavoriteBulkResponseSerializer,
+    FavoriteChangesSerializer,
     FavoriteCreateSerializer,
     FavoriteOutputSerializer,
+    FavoritePageSerializer,
+    FavoriteSyncResultSerializer,
+    FavoriteSyncSerializer,
+    MostFavoritedProductsSerializer,
 )
 
+_CURSOR_PARAMETERS = [
+    OpenApiParameter(
+        name="limit",
+        type=int,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Page size, capped at API_MAX_PAGE_SIZE.",
+    ),
+    OpenApiParameter(
+        name="after",
+        type=str,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Opaque cursor returned as `next` by the previous page.",
+    ),
+]
+
+_CUSTOMER_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name="name_prefix",
+        type=str,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Only customers whose name starts with this value (case-insensitive).",
+    ),
+    OpenApiParameter(
+        name="email_prefix",
+        type=str,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Only customers whose email starts with this value (case-insensitive).",
+    ),
+]
+
+
+def _customer_filters(request: Request) -> Dict[str, Any]:
+    return {
+        "name_prefix": request.query_params.get("name_prefix") or None,
+        "email_prefix": request.query_params.get("email_prefix") or None,
+    }
+
+
+# Lines pulled per thread hop when an export is streamed to an ASGI server.
+_STREAM_BATCH_SIZE = 500
+
+
+async def _batched_async(lines: Iterator[str], batch_size: int = _STREAM_BATCH_SIZE) -> AsyncIterator[str]:
+    # Thread-sensitive, so the reads behind ``lines`` stay on the thread
+    # holding Django's database connection.
+    next_batch = sync_to_async(lambda: list(itertools.islice(lines, batch_size)), thread_sensitive=True)
+    while batch := await next_batch():
+        for line in batch:
+            yield line
+
+
+def _ndjson_response(request: Request, lines: Iterator[str], *, filename: str) -> StreamingHttpResponse:
+    """Stream ``lines`` as an NDJSON attachment without buffering them.
+
+    ASGI servers are handed an async iterator, since Django would otherwise
+    collect a sync one into a list before sending anything; it reads the
+    lines a batch at a time through ``sync_to_async``.
+    """
+    if isinstance(request._request, ASGIRequest):
+        lines = _batched_async(lines)
+    response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's ``If-None-Match`` header."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if "*" in candidates:
+        return True
+    return etag.removeprefix("W/") in {candidate.removeprefix("W/") for candidate in candidates}
+
 
 class _JSONViewMixin:
     def _load_payload(self, request: Request) -> Dict[str, Any]:
@@ -97,6 +202,37 @@ class _BaseAPIView(_JSONViewMixin, APIView):
         return super().handle_exception(exc)
 
 
+class _AsyncAPIView(_BaseAPIView):
+    """Base view whose handlers are coroutines, served natively under ASGI.
+
+    Authentication, permissions and throttling touch the database, so
+    ``initial`` runs through ``sync_to_async``; the handler itself is awaited
+    on the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
 class IsStaffOrTargetCustomer(BasePermission):
     """Allow access to staff users or to the customer matching the route."""
 
@@ -132,13 +268,33 @@ class CustomerListCreateView(_CustomerBaseView):
 
     @extend_schema(
         summary="List customers",
-        description="Return all registered customers. Requires staff credentials.",
-        responses={200: CustomerOutputSerializer(many=True)},
+        description=(
+            "Return registered customers ordered by id, paginated with an opaque `next` "
+            "cursor and optionally filtered by name/email prefix. Requires staff credentials."
+        ),
+        parameters=_CURSOR_PARAMETERS + _CUSTOMER_FILTER_PARAMETERS,
+        responses={
+            200: CustomerPageSerializer,
+            400: OpenApiResponse(description="Invalid limit or cursor."),
+        },
         auth=[{'BearerAuth': []}],
     )
     def get(self, request: Request):
-        customers = ListCustomers(self.repository).execute()
-        data = [asdict(customer) for customer in customers]
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            after = decode_cursor(request.query_params.get("after"))
+        except ValueError as exc:
+            return self._error_response(message=f"{exc}.", status=400)
+
+        page = ListCustomers(self.repository).execute_page(
+            limit=limit,
+            after=after,
+            **_customer_filters(request),
+        )
+        data = {
+            "results": [asdict(customer) for customer in page.items],
+            "next": encode_cursor(page.next_after) if page.next_after is not None else None,
+        }
         return Response(data, status=200)
 
     @extend_schema(
@@ -181,6 +337,28 @@ class CustomerListCreateView(_CustomerBaseView):
         return Response(asdict(customer), status=201)
 
 
+class CustomerExportView(_CustomerBaseView):
+    """Stream every customer as newline-delimited JSON."""
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Export customers",
+        description=(
+            "Stream all matching customers as NDJSON, one object per line, ordered by id. "
+            "Rows are read through a server-side cursor, so memory stays constant. "
+            "Requires staff credentials."
+        ),
+        parameters=_CUSTOMER_FILTER_PARAMETERS,
+        responses={200: OpenApiResponse(description="NDJSON stream of customers.")},
+        auth=[{'BearerAuth': []}],
+    )
+    def get(self, request: Request):
+        customers = ExportCustomers(self.repository).execute(**_customer_filters(request))
+        lines = (json.dumps(asdict(customer)) + "\n" for customer in customers)
+        return _ndjson_response(request, lines, filename="customers.ndjson")
+
+
 class CustomerDetailView(_CustomerBaseView):
     """Entrypoint for retrieving, updating, and deleting customers."""
 
@@ -253,21 +431,24 @@ class CustomerDetailView(_CustomerBaseView):
     )
     def delete(self, request: Request, customer_id: int):
         try:
-            DeleteCustomer(self.repository).execute(customer_id=customer_id)
+            DeleteCustomer(self.repository, favorite_cache=get_favorite_list_cache()).execute(
+                customer_id=customer_id
+            )
         except CustomerNotFoundError:
             return self._error_response(message="Customer not found.", status=404)
 
         return Response(status=204)
 
 
-class _FavoriteBaseView(_BaseAPIView):
+class _FavoriteBaseView(_AsyncAPIView):
     repository_class = DjangoFavoriteRepository
-    product_gateway_class = FakeStoreProductGateway
 
-    def dispatch(self, request, *args, **kwargs):
+    async def dispatch(self, request, *args, **kwargs):
         self.repository = self.repository_class()
-        self.product_gateway = self.product_gateway_class()
-        return super().dispatch(request, *args, **kwargs)
+        self.product_gateway = get_async_product_gateway()
+        self.favorite_cache = get_favorite_list_cache()
+        return await super().dispatch(request, *args, **kwargs)
+
 
 class FavoriteListCreateView(_FavoriteBaseView):
     """List and add favorites for a specific customer."""
@@ -276,29 +457,63 @@ class FavoriteListCreateView(_FavoriteBaseView):
 
     @extend_schema(
         summary="List favorites",
-        description="Return the favorite products stored for the given customer.",
+        description=(
+            "Return the favorite products stored for the given customer. Product details come "
+            "from the snapshot taken when each favorite was added and are refreshed once older "
+            "than FAVORITE_SNAPSHOT_MAX_AGE. Results are ordered by id and paginated with an "
+            "opaque `next` cursor. The `ETag` header carries the customer's favorites version; "
+            "send it back in `If-None-Match` to get a 304 without re-reading the favorites."
+        ),
+        parameters=_CURSOR_PARAMETERS,
         responses={
-            200: FavoriteOutputSerializer(many=True),
+            200: FavoritePageSerializer,
+            304: OpenApiResponse(description="Favorites unchanged since the given ETag."),
+            400: OpenApiResponse(description="Invalid limit or cursor."),
             404: OpenApiResponse(description="Customer not found."),
             503: OpenApiResponse(description="External product service unavailable."),
         },
         auth=[{'BearerAuth': []}],
     )
-    def get(self, request: Request, customer_id: int):
+    async def get(self, request: Request, customer_id: int):
         try:
-            favorites = ListFavorites(self.repository, self.product_gateway).execute(
+            limit = parse_limit(request.query_params.get("limit"))
+            after = decode_cursor(request.query_params.get("after"))
+        except ValueError as exc:
+            return self._error_response(message=f"{exc}.", status=400)
+
+        # The version is read before the page so a concurrent write can only
+        # make the ETag older than the body, never newer.
+        try:
+            version = await sync_to_async(GetFavoritesVersion(self.repository).execute)(
                 customer_id=customer_id
             )
         except CustomerNotFoundError:
             return self._error_response(message="Customer not found.", status=404)
+
+        etag = quote_etag(f"favorites-{version}")
+        if _etag_matches(request, etag):
+            return Response(status=304, headers={"ETag": etag})
+
+        try:
+            page = await AsyncListFavorites(
+                self.repository,
+                self.product_gateway,
+                snapshot_max_age=settings.FAVORITE_SNAPSHOT_MAX_AGE,
+                cache=self.favorite_cache,
+            ).execute_page(customer_id=customer_id, limit=limit, after=after, version=version)
+        except CustomerNotFoundError:
+            return self._error_response(message="Customer not found.", status=404)
         except RuntimeError:
             return self._error_response(
                 message="Unable to fetch product details from external service.",
                 status=503,
             )
 
-        data = [asdict(favorite) for favorite in favorites]
-        return Response(data, status=200)
+        data = {
+            "results": [asdict(favorite) for favorite in page.items],
+            "next": encode_cursor(page.next_after) if page.next_after is not None else None,
+        }
+        return Response(data, status=200, headers={"ETag": etag})
 
     @extend_schema(
         summary="Add favorite",
@@ -311,7 +526,7 @@ class FavoriteListCreateView(_FavoriteBaseView):
         },
         auth=[{'BearerAuth': []}],
     )
-    def post(self, request: Request, customer_id: int):
+    async def post(self, request: Request, customer_id: int):
         try:
             payload = self._load_payload(request)
         except ValueError:
@@ -328,7 +543,11 @@ class FavoriteListCreateView(_FavoriteBaseView):
         product_id = serializer.validated_data["product_id"]
 
         try:
-            favorite = AddFavorite(self.repository, self.product_gateway).execute(
+            favorite = await AsyncAddFavorite(
+                self.repository,
+                self.product_gateway,
+                cache=self.favorite_cache,
+            ).execute(
                 customer_id=customer_id,
                 product_id=product_id,
             )
@@ -349,6 +568,169 @@ class FavoriteListCreateView(_FavoriteBaseView):
 
         return Response(asdict(favorite), status=201)
 
+    @extend_schema(
+        summary="Replace favorites",
+        description=(
+            "Make the customer's favorites equal to `product_ids`. The stored set is diffed in "
+            "one query, only newly added ids are validated, and inserts and deletions are applied "
+            "in one transaction. Unknown products are reported and skipped."
+        ),
+        request=FavoriteSyncSerializer,
+        responses={
+            200: FavoriteSyncResultSerializer,
+            400: OpenApiResponse(description="Invalid payload."),
+            404: OpenApiResponse(description="Customer not found."),
+            503: OpenApiResponse(description="External product service unavailable."),
+        },
+        auth=[{'BearerAuth': []}],
+    )
+    async def put(self, request: Request, customer_id: int):
+        try:
+            payload = self._load_payload(request)
+        except ValueError:
+            return self._error_response(message="Invalid JSON payload.", status=400)
+
+        serializer = FavoriteSyncSerializer(data=payload)
+        if not serializer.is_valid():
+            return self._error_response(
+                message="Invalid payload.",
+                status=400,
+                details=serializer.errors,
+            )
+
+        try:
+            result = await AsyncSyncFavorites(
+                self.repository,
+                self.product_gateway,
+                cache=self.favorite_cache,
+            ).execute(
+                customer_id=customer_id,
+                product_ids=serializer.validated_data["product_ids"],
+            )
+        except CustomerNotFoundError:
+            return self._error_response(message="Customer not found.", status=404)
+        except RuntimeError:
+            return self._error_response(
+                message="Unable to validate products with external service.",
+                status=503,
+            )
+
+        return Response(asdict(result), status=200)
+
+
+class FavoriteBulkCreateView(_FavoriteBaseView):
+    """Add many favorites for a customer in a single request."""
+
+    permission_classes = [IsAuthenticated, IsStaffOrTargetCustomer]
+
+    @extend_schema(
+        summary="Add favorites in bulk",
+        description=(
+            "Validate up to 500 product ids with one batched lookup and store the new ones in a "
+            "single insert. Each id is reported as `added`, `duplicate` or `unknown_product`."
+        ),
+        request=FavoriteBulkCreateSerializer,
+        responses={
+            200: FavoriteBulkResponseSerializer,
+            400: OpenApiResponse(description="Invalid payload."),
+            404: OpenApiResponse(description="Customer not found."),
+            503: OpenApiResponse(description="External product service unavailable."),
+        },
+        auth=[{'BearerAuth': []}],
+    )
+    async def post(self, request: Request, customer_id: int):
+        try:
+            payload = self._load_payload(request)
+        except ValueError:
+            return self._error_response(message="Invalid JSON payload.", status=400)
+
+        serializer = FavoriteBulkCreateSerializer(data=payload)
+        if not serializer.is_valid():
+            return self._error_response(
+                message="Invalid payload.",
+                status=400,
+                details=serializer.errors,
+            )
+
+        try:
+            results = await AsyncAddFavorites(
+                self.repository,
+                self.product_gateway,
+                cache=self.favorite_cache,
+            ).execute(
+                customer_id=customer_id,
+                product_ids=serializer.validated_data["product_ids"],
+            )
+        except CustomerNotFoundError:
+            return self._error_response(message="Customer not found.", status=404)
+        except RuntimeError:
+            return self._error_response(
+                message="Unable to validate products with external service.",
+                status=503,
+            )
+
+        return Response({"results": [asdict(result) for result in results]}, status=200)
+
+
+class FavoriteChangesView(_FavoriteBaseView):
+    """Feed of favorite additions and removals for incremental client sync."""
+
+    permission_classes = [IsAuthenticated, IsStaffOrTargetCustomer]
+
+    @extend_schema(
+        summary="List favorite changes",
+        description=(
+            "Return favorite additions and removals with a sequence greater than `since`, oldest "
+            "first. Clients store `last_sequence` and pass it back as `since` to receive only what "
+            "changed; superseded entries may be compacted, but the latest entry per product is "
+            "always kept, so replaying the feed yields the current favorites."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Last sequence already applied by the client (default 0).",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Maximum number of changes, capped at API_MAX_PAGE_SIZE.",
+            ),
+        ],
+        responses={
+            200: FavoriteChangesSerializer,
+            400: OpenApiResponse(description="Invalid since or limit."),
+            404: OpenApiResponse(description="Customer not found."),
+        },
+        auth=[{'BearerAuth': []}],
+    )
+    async def get(self, request: Request, customer_id: int):
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            since = parse_since(request.query_params.get("since"))
+        except ValueError as exc:
+            return self._error_response(message=f"{exc}.", status=400)
+
+        try:
+            page = await sync_to_async(ListFavoriteChanges(self.repository).execute)(
+                customer_id=customer_id,
+                since=since,
+                limit=limit,
+            )
+        except CustomerNotFoundError:
+            return self._error_response(message="Customer not found.", status=404)
+
+        data = {
+            "changes": [asdict(change) for change in page.items],
+            "last_sequence": page.items[-1].sequence if page.items else since,
+            "has_more": page.next_after is not None,
+        }
+        return Response(data, status=200)
+
 
 class FavoriteDetailView(_FavoriteBaseView):
     """Remove a favorite product from a customer."""
@@ -363,9 +745,9 @@ class FavoriteDetailView(_FavoriteBaseView):
         },
         auth=[{'BearerAuth': []}],
     )
-    def delete(self, request: Request, customer_id: int, product_id: int):
+    async def delete(self, request: Request, customer_id: int, product_id: int):
         try:
-            RemoveFavorite(self.repository).execute(
+            await sync_to_async(RemoveFavorite(self.repository, cache=self.favorite_cache).execute)(
                 customer_id=customer_id,
                 product_id=product_id,
             )
@@ -373,3 +755,107 @@ class FavoriteDetailView(_FavoriteBaseView):
             return self._error_response(message="Favorite not found.", status=404)
 
         return Response(status=204)
+
+
+class MostFavoritedProductsView(_BaseAPIView):
+    """Rank products by how many customers favorited them."""
+
+    permission_classes = [IsAuthenticated]
+    repository_class = DjangoFavoriteRepository
+
+    @extend_schema(
+        summary="Most favorited products",
+        description=(
+            "Return the products favorited by the most customers, highest count first. Counts come "
+            "from a per-product counter maintained on every favorite write, so the ranking is one "
+            "index scan regardless of how many favorites exist."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Number of products, capped at API_MAX_PAGE_SIZE (default 10).",
+            ),
+        ],
+        responses={
+            200: MostFavoritedProductsSerializer,
+            400: OpenApiResponse(description="Invalid limit."),
+        },
+        auth=[{'BearerAuth': []}],
+    )
+    def get(self, request: Request):
+        try:
+            limit = parse_limit(request.query_params.get("limit") or "10")
+        except ValueError as exc:
+            return self._error_response(message=f"{exc}.", status=400)
+
+        products = ListMostFavoritedProducts(self.repository_class()).execute(limit=limit)
+        return Response({"results": [asdict(product) for product in products]}, status=200)
+
+
+class ProductFavoritersView(_BaseAPIView):
+    """Stream the ids of customers who favorited a product as newline-delimited JSON."""
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    repository_class = DjangoFavoriteRepository
+
+    @extend_schema(
+        summary="Customers who favorited a product",
+        description=(
+            "Stream one `{\"customer_id\": ...}` object per line, ordered by customer id. Rows are read "
+            "in keyset batches over the (product_id, customer_id) index; pass the last customer id "
+            "received as `after` to resume an interrupted stream. Requires staff credentials."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="after",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only return customers with an id greater than this one.",
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="NDJSON stream of customer ids."),
+            400: OpenApiResponse(description="Invalid after."),
+        },
+        auth=[{'BearerAuth': []}],
+    )
+    def get(self, request: Request, product_id: int):
+        try:
+            after = parse_after(request.query_params.get("after"))
+        except ValueError as exc:
+            return self._error_response(message=f"{exc}.", status=400)
+
+        customer_ids = ExportProductFavoriters(self.repository_class()).execute(product_id=product_id, after=after)
+        lines = (json.dumps({"customer_id": customer_id}) + "\n" for customer_id in customer_ids)
+        return _ndjson_response(request, lines, filename=f"product-{product_id}-favoriters.ndjson")
+
+
+class ProductGatewayStatsView(_BaseAPIView):
+    """Expose cache, circuit breaker and coalescing counters of the product gateway.
+
+    The counters come from the gateway the favorite views use. Those of the
+    favorite list cache are reported alongside them.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Product gateway stats",
+        description=(
+            "Return the counters of each product gateway layer and of the favorite list cache, "
+            "including its hit rate. Requires staff credentials."
+        ),
+        responses={200: OpenApiResponse(description="Counters keyed by gateway layer.")},
+        auth=[{'BearerAuth': []}],
+    )
+    def get(self, request: Request):
+        stats = product_gateway_stats(get_async_product_gateway())
+        favorite_cache = get_favorite_list_cache()
+        if favorite_cache is not None:
+            cache_stats = favorite_cache.stats
+            stats["favorite_list_cache"] = {**asdict(cache_stats), "hit_rate": cache_stats.hit_rate}
+        return Response(stats, status=200)
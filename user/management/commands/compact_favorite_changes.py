@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from user.application import CompactFavoriteChanges
+from user.infrastructure import DjangoFavoriteRepository
+
+
+class Command(BaseCommand):
+    help = "Delete favorite change log entries superseded by a later change for the same product."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of change sequences scanned per delete statement.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = CompactFavoriteChanges(DjangoFavoriteRepository()).execute(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} superseded favorite change(s)."))
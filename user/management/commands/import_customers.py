@@ -0,0 +1,93 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.infrastructure import import_customers, read_customer_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-create customers from a CSV or NDJSON file with name, email and password."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import; CSV needs a name,email,password header.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "ndjson"),
+            default=None,
+            help="Input format (default: guessed from the file extension).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows committed per COPY.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Processes hashing passwords (default: one per CPU core).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="File recording the last committed row (default: PATH.checkpoint).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and import from the first row.",
+        )
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        file_format = options["format"] or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        start_after = 0 if options["restart"] else self._read_checkpoint(checkpoint_path, path)
+        if start_after:
+            self.stdout.write(f"Resuming after row {start_after}.")
+
+        def save_checkpoint(result):
+            with open(checkpoint_path, "w", encoding="utf-8") as checkpoint:
+                json.dump({"source": path, "last_row": result.last_row}, checkpoint)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Committed up to row {result.last_row} ({result.imported} imported).")
+
+        def report_skipped(row, reason):
+            if options["verbosity"] > 1:
+                self.stderr.write(f"Row {row} skipped: {reason}.")
+
+        try:
+            with open(path, encoding="utf-8", newline="") as stream:
+                result = import_customers(
+                    read_customer_rows(stream, format=file_format),
+                    chunk_size=max(1, options["chunk_size"]),
+                    workers=options["workers"],
+                    start_after=start_after,
+                    progress=save_checkpoint,
+                    on_skipped=report_skipped,
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.imported} customer(s): {result.duplicates} duplicate and "
+                f"{result.invalid} invalid row(s) skipped."
+            )
+        )
+
+    def _read_checkpoint(self, checkpoint_path: str, source: str) -> int:
+        try:
+            with open(checkpoint_path, encoding="utf-8") as checkpoint:
+                state = json.load(checkpoint)
+        except FileNotFoundError:
+            return 0
+        except ValueError as exc:
+            raise CommandError(f"Unreadable checkpoint {checkpoint_path}: {exc}") from exc
+        if state.get("source") != source:
+            raise CommandError(f"Checkpoint {checkpoint_path} belongs to {state.get('source')}; use --restart.")
+        return int(state.get("last_row", 0))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user.infrastructure import FavoritePartitioner
+
+
+class Command(BaseCommand):
+    help = "Migrate the favorites table to hash partitions on customer_id without downtime."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=16,
+            help="Number of hash partitions created for a new migration.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Width of the id range copied per transaction.",
+        )
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=None,
+            help="Resume the backfill after this favorite id.",
+        )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            help="Replace the live table with the backfilled partitioned table.",
+        )
+
+    def handle(self, *args, **options):
+        partitioner = FavoritePartitioner()
+        try:
+            if options["swap"]:
+                partitioner.swap()
+                self.stdout.write(
+                    self.style.SUCCESS(f"{partitioner.table} is now partitioned; the old table is {partitioner.archive}.")
+                )
+                return
+
+            if partitioner.prepare(partitions=options["partitions"]):
+                self.stdout.write(f"Created {partitioner.shadow} with {options['partitions']} partition(s).")
+            copied = partitioner.backfill(
+                batch_size=max(1, options["batch_size"]),
+                after=options["after"],
+                progress=lambda last_id, total: self.stdout.write(f"Copied {total} row(s) up to id {last_id}."),
+            )
+        except (RuntimeError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled {copied} favorite(s); run with --swap to switch over.")
+        )
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.application import PurgeDeletedCustomers
+from user.infrastructure import DjangoCustomerRepository
+
+
+class Command(BaseCommand):
+    help = "Purge the favorites and change log of deleted customers in batches, then remove the customers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows removed per transaction.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=100,
+            help="Number of deleted customers handled per run.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep running and poll for deleted customers every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        use_case = PurgeDeletedCustomers(DjangoCustomerRepository())
+
+        while True:
+            purged = use_case.execute(
+                batch_size=options["batch_size"],
+                limit=options["limit"],
+                progress=self._report_progress if options["verbosity"] > 1 else None,
+            )
+            for result in purged:
+                self.stdout.write(f"Customer {result.customer_id} purged ({result.purged_rows} row(s)).")
+            if purged or not interval:
+                self.stdout.write(self.style.SUCCESS(f"Purged {len(purged)} deleted customer(s)."))
+
+            if not interval:
+                return
+            # A full run may leave more customers waiting; only sleep when caught up.
+            if len(purged) < options["limit"]:
+                time.sleep(interval)
+
+    def _report_progress(self, result):
+        self.stdout.write(f"Customer {result.customer_id}: {result.purged_rows} row(s) purged so far.")
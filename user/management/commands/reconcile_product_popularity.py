@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from user.application import ReconcileProductPopularity
+from user.infrastructure import DjangoFavoriteRepository
+
+
+class Command(BaseCommand):
+    help = "Recount favorites per product and correct drifted popularity counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of product ids recounted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        corrected = ReconcileProductPopularity(DjangoFavoriteRepository()).execute(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} product popularity counter(s)."))
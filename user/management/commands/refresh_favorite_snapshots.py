@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.application import RefreshFavoriteSnapshots
+from user.infrastructure import DjangoFavoriteRepository, get_product_gateway
+
+
+class Command(BaseCommand):
+    help = "Refresh the product details stored on favorites."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=float,
+            default=None,
+            help="Refresh snapshots older than MAX_AGE seconds (default: FAVORITE_SNAPSHOT_MAX_AGE).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every snapshot regardless of its age.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of products looked up per gateway call.",
+        )
+
+    def handle(self, *args, **options):
+        max_age = options["max_age"]
+        if options["all"]:
+            max_age = None
+        elif max_age is None:
+            max_age = settings.FAVORITE_SNAPSHOT_MAX_AGE
+
+        use_case = RefreshFavoriteSnapshots(DjangoFavoriteRepository(), get_product_gateway())
+        try:
+            updated = use_case.execute(max_age=max_age, batch_size=options["batch_size"])
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {updated} favorite snapshot(s)."))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.infrastructure import FakeStoreProductGateway, sync_product_catalog
+
+
+class Command(BaseCommand):
+    help = "Synchronise the local product mirror with the external product catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-prune",
+            action="store_true",
+            help="Keep mirrored products that are no longer present upstream.",
+        )
+        parser.add_argument(
+            "--min-prune-ratio",
+            type=float,
+            default=0.5,
+            help="Refuse to prune when upstream returns fewer products than this share of the mirror.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep running and re-sync every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        gateway = FakeStoreProductGateway()
+
+        while True:
+            try:
+                self._sync_once(
+                    gateway,
+                    prune=not options["no_prune"],
+                    min_prune_ratio=options["min_prune_ratio"],
+                )
+            except RuntimeError as exc:
+                if not interval:
+                    raise CommandError(str(exc)) from exc
+                self.stderr.write(self.style.ERROR(f"Catalog sync failed: {exc}"))
+
+            if not interval:
+                return
+            time.sleep(interval)
+
+    def _sync_once(self, gateway, *, prune: bool, min_prune_ratio: float) -> None:
+        result = sync_product_catalog(gateway.fetch_catalog(), prune=prune, min_prune_ratio=min_prune_ratio)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Catalog synced: {result.created} created, {result.updated} updated, "
+                f"{result.unchanged} unchanged, {result.deleted} deleted."
+            )
+        )
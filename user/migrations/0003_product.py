@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_favorite_favorite_unique_customer_favorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('category', models.CharField(blank=True, max_length=255)),
+                ('image', models.CharField(blank=True, max_length=500)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('rating', models.JSONField(blank=True, null=True)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='image',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='rating',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='snapshot_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='title',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['customer', 'id'], name='favorite_customer_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['snapshot_at'], name='favorite_snapshot_at_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_customer_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FavoriteChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('product_id', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('added', 'Added'), ('removed', 'Removed')], max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorite_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['customer', 'id'], name='favchange_customer_seq_idx'), models.Index(fields=['customer', 'product_id', 'id'], name='favchange_compaction_idx')],
+            },
+        ),
+    ]
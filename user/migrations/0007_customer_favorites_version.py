@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_favoritechange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='favorites_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:51
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_popularity(apps, schema_editor):
+    Favorite = apps.get_model('user', 'Favorite')
+    ProductPopularity = apps.get_model('user', 'ProductPopularity')
+    counts = Favorite.objects.values('product_id').annotate(total=Count('id')).order_by('product_id')
+    ProductPopularity.objects.bulk_create(
+        (ProductPopularity(product_id=row['product_id'], favorite_count=row['total']) for row in counts.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_customer_favorites_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPopularity',
+            fields=[
+                ('product_id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('favorite_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'product popularity',
+                'indexes': [models.Index(fields=['-favorite_count', 'product_id'], name='popularity_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building it
+    # concurrently keeps writes to the favorites table flowing meanwhile.
+    atomic = False
+
+    dependencies = [
+        ('user', '0008_productpopularity'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='favorite',
+            index=models.Index(fields=['product_id', 'customer'], name='favorite_product_customer_idx'),
+        ),
+    ]
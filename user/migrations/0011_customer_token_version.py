@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_customer_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
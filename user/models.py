@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class CustomerManager(BaseUserManager):
@@ -63,6 +65,31 @@ class User(AbstractUser):
 class Customer(User):
     """Concrete user type representing application customers."""
 
+    # Bumped in the same transaction as every change to the customer's
+    # favorites; served as the ETag of the favorites listing.
+    favorites_version = models.PositiveBigIntegerField(default=0, editable=False)
+    # Set when the customer is deleted through the API. The customer is hidden
+    # from then on and its rows are purged in batches by a background worker,
+    # which counts them in ``purged_rows`` and finally deletes this row.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    purged_rows = models.PositiveBigIntegerField(default=0, editable=False)
+    # Copied into every issued token; bumping it revokes the tokens issued
+    # before, which stateless authentication checks against a short-lived cache.
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        # Case-insensitive prefix filters (``istartswith``) compile to
+        # ``UPPER(col) LIKE 'X%'``, which these pattern-ops indexes can serve.
+        indexes = [
+            models.Index(OpClass(Upper("name"), name="text_pattern_ops"), name="customer_name_prefix_idx"),
+            models.Index(OpClass(Upper("email"), name="text_pattern_ops"), name="customer_email_prefix_idx"),
+            models.Index(
+                fields=["deleted_at"],
+                name="customer_pending_deletion_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
+
 
 class Favorite(models.Model):
     """Favorite product marked by a customer."""
@@ -74,6 +101,14 @@ class Favorite(models.Model):
     )
     product_id = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized product details captured when the favorite is written, so
+    # listings do not need the product service. ``snapshot_at`` records the
+    # last lookup, including those that found no product.
+    title = models.CharField(max_length=255, blank=True, null=True)
+    image = models.CharField(max_length=500, blank=True, null=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    rating = models.JSONField(null=True, blank=True)
+    snapshot_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         constraints = [
@@ -82,7 +117,86 @@ class Favorite(models.Model):
                 name="unique_customer_favorite",
             )
         ]
+        indexes = [
+            models.Index(fields=["customer", "id"], name="favorite_customer_id_idx"),
+            models.Index(fields=["snapshot_at"], name="favorite_snapshot_at_idx"),
+            # Reverse lookup: which customers favorited a product.
+            models.Index(fields=["product_id", "customer"], name="favorite_product_customer_idx"),
+        ]
         ordering = ("id",)
 
     def __str__(self) -> str:
         return f"{self.customer_id}:{self.product_id}"
+
+
+class FavoriteChange(models.Model):
+    """Append-only log of favorite additions and removals.
+
+    The auto-increment ``id`` is the sequence number clients poll with.
+    """
+
+    ADDED = "added"
+    REMOVED = "removed"
+    ACTION_CHOICES = [(ADDED, "Added"), (REMOVED, "Removed")]
+
+    id = models.BigAutoField(primary_key=True)
+    customer = models.ForeignKey(
+        "Customer",
+        related_name="favorite_changes",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    product_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=16, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "id"], name="favchange_customer_seq_idx"),
+            models.Index(fields=["customer", "product_id", "id"], name="favchange_compaction_idx"),
+        ]
+        ordering = ("id",)
+
+    def __str__(self) -> str:
+        return f"{self.id}:{self.customer_id}:{self.action}:{self.product_id}"
+
+
+class ProductPopularity(models.Model):
+    """Number of customers that favorited each product.
+
+    Maintained incrementally by every favorite write and corrected in batches
+    by the ``reconcile_product_popularity`` command.
+    """
+
+    product_id = models.PositiveIntegerField(primary_key=True)
+    favorite_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-favorite_count", "product_id"], name="popularity_rank_idx"),
+        ]
+        verbose_name_plural = "product popularity"
+
+    def __str__(self) -> str:
+        return f"{self.product_id}:{self.favorite_count}"
+
+
+class Product(models.Model):
+    """Local mirror of the external product catalog."""
+
+    id = models.PositiveIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=255, blank=True)
+    image = models.CharField(max_length=500, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    rating = models.JSONField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self) -> str:
+        return self.title
@@ -0,0 +1,107 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.admin import CustomerPasswordChangeForm
+from user.application import CreateCustomer, RevokeCustomerTokens
+from user.infrastructure import get_token_version_cache, reset_product_gateway
+from user.infrastructure.repositories import DjangoCustomerRepository
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        reset_product_gateway()
+        self.addCleanup(reset_product_gateway)
+        self.repository = DjangoCustomerRepository()
+        self.password = "prestidigitation1"
+        self.customer = CreateCustomer(self.repository).execute(
+            name="Caleb Widogast",
+            email="caleb@mightynein.example",
+            password=self.password,
+        )
+        self.other = CreateCustomer(self.repository).execute(
+            name="Nott Brave",
+            email="nott@mightynein.example",
+            password="acidvial123",
+        )
+
+    def _obtain_headers(self, email="caleb@mightynein.example", password=None):
+        response = self.client.post(
+            reverse("token-obtain-pair"),
+            data=json.dumps({"email": email, "password": password or self.password}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return {"HTTP_AUTHORIZATION": f"Bearer {response.json()['access']}"}
+
+    def test_cached_token_version_skips_the_customer_lookup(self):
+        headers = self._obtain_headers()
+        self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+
+        # Only the customer being read; authentication is served from claims and cache.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_token_version_cache().stats.hits, 1)
+
+    def test_claims_do_not_grant_access_to_other_customers(self):
+        response = self.client.get(reverse("user-detail", args=[self.other.id]), **self._obtain_headers())
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_password_change_revokes_issued_tokens(self):
+        headers = self._obtain_headers()
+        self.assertEqual(self.client.get(reverse("user-detail", args=[self.customer.id]), **headers).status_code, 200)
+
+        form = CustomerPasswordChangeForm(
+            get_user_model().objects.get(pk=self.customer.id),
+            {"password1": "transmutation2", "password2": "transmutation2"},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        response = self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("revoked", response.json()["error"])
+
+        fresh = self._obtain_headers(password="transmutation2")
+        response = self.client.get(reverse("user-detail", args=[self.customer.id]), **fresh)
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_hash_upgrade_keeps_issued_tokens_valid(self):
+        issued = self._obtain_headers()
+        outdated = PBKDF2PasswordHasher().encode(self.password, "outdatedsalt", iterations=1000)
+        get_user_model().objects.filter(pk=self.customer.id).update(password=outdated)
+
+        upgraded = self._obtain_headers()
+
+        self.assertNotEqual(get_user_model().objects.get(pk=self.customer.id).password, outdated)
+        for headers in (issued, upgraded):
+            response = self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+            self.assertEqual(response.status_code, 200)
+
+    def test_revoke_and_delete_reject_issued_tokens(self):
+        headers = self._obtain_headers()
+        self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+
+        RevokeCustomerTokens(self.repository).execute(customer_id=self.customer.id)
+        self.assertEqual(self.client.get(reverse("user-detail", args=[self.customer.id]), **headers).status_code, 401)
+
+        headers = self._obtain_headers()
+        response = self.client.delete(reverse("user-detail", args=[self.customer.id]), **headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(reverse("user-detail", args=[self.customer.id]), **headers).status_code, 401)
+
+    def test_tokens_without_version_claim_load_the_customer(self):
+        customer_model = get_user_model().objects.get(pk=self.customer.id)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(customer_model).access_token}"}
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("user-detail", args=[self.customer.id]), **headers)
+
+        self.assertEqual(response.status_code, 200)
@@ -1,5 +1,6 @@
 import json
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -67,11 +68,74 @@ class CustomerAPITests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        emails = {item["email"] for item in response.json()}
+        emails = {item["email"] for item in response.json()["results"]}
         self.assertTrue(
             {"scanlan@voxmachina.example", "percy@voxmachina.example"}.issubset(emails)
         )
 
+    def test_list_customers_paginates_and_filters_by_prefix(self):
+        for index in range(3):
+            self.factory_create.execute(
+                name=f"Vex {index}",
+                email=f"vex{index}@voxmachina.example",
+                password="trinket123",
+            )
+        self.factory_create.execute(name="Grog", email="grog@voxmachina.example", password="axe12345")
+
+        first = self.client.get(
+            reverse("user-list"),
+            {"limit": 2, "name_prefix": "vex"},
+            **self._auth_headers(self.staff_user),
+        )
+        second = self.client.get(
+            reverse("user-list"),
+            {"limit": 2, "name_prefix": "vex", "after": first.json()["next"]},
+            **self._auth_headers(self.staff_user),
+        )
+
+        self.assertEqual([item["name"] for item in first.json()["results"]], ["Vex 0", "Vex 1"])
+        self.assertEqual([item["name"] for item in second.json()["results"]], ["Vex 2"])
+        self.assertIsNone(second.json()["next"])
+
+    def test_export_customers_streams_ndjson(self):
+        self.factory_create.execute(name="Pike", email="pike@voxmachina.example", password="sarenrae1")
+
+        response = self.client.get(
+            reverse("user-export"),
+            {"email_prefix": "PIKE@"},
+            **self._auth_headers(self.staff_user),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["Pike"])
+
+    async def test_export_customers_streams_asynchronously_under_asgi(self):
+        for index in range(3):
+            await sync_to_async(self.factory_create.execute)(
+                name=f"Trinket {index}", email=f"trinket{index}@voxmachina.example", password="bearhug123"
+            )
+
+        response = await self.async_client.get(
+            reverse("user-export"),
+            {"name_prefix": "trinket"},
+            headers={"Authorization": self._auth_headers(self.staff_user)["HTTP_AUTHORIZATION"]},
+        )
+
+        self.assertTrue(response.is_async)
+        lines = b"".join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["Trinket 0", "Trinket 1", "Trinket 2"])
+
+    def test_export_customers_requires_staff(self):
+        customer = get_user_model().objects.create_user(
+            name="Tary", email="tary@voxmachina.example", password="doty1234"
+        )
+
+        response = self.client.get(reverse("user-export"), **self._auth_headers(customer))
+
+        self.assertEqual(response.status_code, 403)
+
     def test_retrieve_customer_requires_matching_credentials(self):
         customer_password = "heal123"
         customer = self.factory_create.execute(
@@ -140,6 +204,27 @@ class CustomerAPITests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["email"], "grog@herdstone.example")
 
+    def test_update_customer_rejects_taken_email(self):
+        customer = self.factory_create.execute(
+            name="Scanlan Shorthalt",
+            email="scanlan@voxmachina.example",
+            password="bard123",
+        )
+        customer_model = get_user_model().objects.get(pk=customer.id)
+        payload = {"name": "Scanlan Shorthalt", "email": self.staff_user.email}
+
+        # Authentication plus the UPDATE ... RETURNING.
+        with self.assertNumQueries(2):
+            response = self.client.put(
+                reverse("user-detail", args=[customer.id]),
+                data=json.dumps(payload),
+                content_type="application/json",
+                **self._auth_headers(customer_model),
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["details"], {"email": "Must be unique."})
+
     def test_delete_customer_requires_auth(self):
         customer_password = "arrow123"
         customer = self.factory_create.execute(
@@ -0,0 +1,132 @@
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from user.application import CreateCustomer
+from user.infrastructure import import_customers, read_customer_rows
+from user.infrastructure.repositories import DjangoCustomerRepository
+
+
+class CustomerImportTests(TestCase):
+    def setUp(self):
+        CreateCustomer(DjangoCustomerRepository()).execute(
+            name="Minsc",
+            email="minsc@rashemen.example",
+            password="boo12345",
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "customers.csv")
+        with open(self.path, "w", encoding="utf-8") as stream:
+            stream.write(
+                "name,email,password\n"
+                "Jaheira,jaheira@harpers.example,druid123\n"
+                "Khalid,khalid@harpers.example,sword123\n"
+                "Imoen,not-an-email,thief123\n"
+                "Minsc,minsc@rashemen.example,hamster123\n"
+                "Jaheira Again,jaheira@harpers.example,druid456\n"
+                "Viconia,viconia@menzoberranzan.example,shar1234\n"
+            )
+
+    def _emails(self):
+        return sorted(get_user_model().objects.values_list("email", flat=True))
+
+    def test_imports_in_chunks_skipping_duplicates_and_invalid_rows(self):
+        out = StringIO()
+        call_command("import_customers", self.path, chunk_size=2, workers=1, stdout=out)
+
+        self.assertIn("Imported 3 customer(s): 2 duplicate and 1 invalid row(s) skipped.", out.getvalue())
+        self.assertEqual(
+            self._emails(),
+            [
+                "jaheira@harpers.example",
+                "khalid@harpers.example",
+                "minsc@rashemen.example",
+                "viconia@menzoberranzan.example",
+            ],
+        )
+        jaheira = get_user_model().objects.get(email="jaheira@harpers.example")
+        self.assertEqual(jaheira.name, "Jaheira")
+        self.assertTrue(jaheira.check_password("druid123"))
+        self.assertTrue(jaheira.is_active)
+        self.assertIsNotNone(jaheira.date_joined)
+        self.assertFalse(os.path.exists(f"{self.path}.checkpoint"))
+
+    def test_resumes_after_the_checkpointed_row(self):
+        with open(f"{self.path}.checkpoint", "w", encoding="utf-8") as checkpoint:
+            json.dump({"source": self.path, "last_row": 5}, checkpoint)
+
+        call_command("import_customers", self.path, workers=1, stdout=StringIO())
+
+        self.assertEqual(self._emails(), ["minsc@rashemen.example", "viconia@menzoberranzan.example"])
+
+    def test_invalid_rows_are_reported_with_the_chunk_that_read_them(self):
+        records = [
+            (1, {"name": "Dynaheir", "email": "dynaheir@rashemen.example", "password": "wychlaran1"}),
+            (2, {"name": "Xzar", "email": "xzar@zhentarim.example", "password": "necro1234"}),
+            (3, {"name": "Montaron", "email": "", "password": "halfling1"}),
+            (4, {"name": "Yeslick", "email": "yeslick@cloakwood.example", "password": "dwarf1234"}),
+            (5, {"name": "Branwen", "email": "branwen@norheim.example", "password": "tempus123"}),
+            (6, {"name": "Tiax", "email": "tiax-rules", "password": "cyric1234"}),
+        ]
+        events = []
+
+        def crash_after_first_commit(result):
+            events.append(("commit", result.last_row, result.invalid))
+            raise RuntimeError("interrupted")
+
+        with self.assertRaises(RuntimeError):
+            import_customers(
+                iter(records),
+                chunk_size=2,
+                workers=1,
+                progress=crash_after_first_commit,
+                on_skipped=lambda row, reason: events.append(("skip", row, reason)),
+            )
+        result = import_customers(
+            iter(records),
+            chunk_size=2,
+            workers=1,
+            start_after=events[-1][1],
+            progress=lambda result: events.append(("commit", result.last_row, result.invalid)),
+            on_skipped=lambda row, reason: events.append(("skip", row, reason)),
+        )
+
+        self.assertEqual(
+            events,
+            [
+                ("commit", 2, 0),
+                ("skip", 3, "invalid"),
+                ("commit", 5, 1),
+                ("skip", 6, "invalid"),
+                ("commit", 6, 2),
+            ],
+        )
+        self.assertEqual((result.imported, result.invalid, result.last_row), (2, 2, 6))
+
+    def test_passwords_are_hashed_across_worker_processes(self):
+        stream = io.StringIO(
+            "\n".join(
+                json.dumps({"name": f"Edwin {index}", "email": f"edwin{index}@thay.example", "password": f"red{index}wizard"})
+                for index in range(4)
+            )
+        )
+        committed = []
+
+        result = import_customers(
+            read_customer_rows(stream, format="ndjson"),
+            chunk_size=2,
+            workers=2,
+            progress=committed.append,
+        )
+
+        self.assertEqual((result.imported, result.duplicates, result.invalid, result.last_row), (4, 0, 0, 4))
+        self.assertEqual([step.last_row for step in committed], [2, 4])
+        edwin = get_user_model().objects.get(email="edwin3@thay.example")
+        self.assertTrue(edwin.check_password("red3wizard"))
@@ -1,14 +1,19 @@
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 
+from user.application.favorite_use_cases import AddFavorites, ListFavorites
 from user.application.use_cases import (
     CreateCustomer,
     DeleteCustomer,
     GetCustomer,
     ListCustomers,
+    PurgeDeletedCustomers,
     UpdateCustomer,
 )
 from user.domain.exceptions import CustomerNotFoundError
-from user.infrastructure.repositories import DjangoCustomerRepository
+from user.infrastructure.repositories import DjangoCustomerRepository, DjangoFavoriteRepository
+from user.models import Customer, Favorite, FavoriteChange
+from user.tests.test_favorite_use_cases import StubProductGateway
 
 
 class CustomerUseCaseTests(TestCase):
@@ -91,3 +96,68 @@ class CustomerUseCaseTests(TestCase):
 
         with self.assertRaises(CustomerNotFoundError):
             GetCustomer(self.repository).execute(customer_id=created.id)
+
+    def test_update_customer_is_a_single_statement(self):
+        created = self.create_use_case.execute(
+            name="Artemis Entreri",
+            email="entreri@calimport.example",
+            password="dagger123",
+        )
+        taken = self.create_use_case.execute(
+            name="Dwahvel Tiggerwillies",
+            email="dwahvel@calimport.example",
+            password="copper123",
+        )
+
+        with self.assertNumQueries(1):
+            updated = UpdateCustomer(self.repository).execute(
+                customer_id=created.id,
+                name="Barrabus the Gray",
+                email="barrabus@netheril.example",
+            )
+
+        self.assertEqual(updated, GetCustomer(self.repository).execute(created.id))
+        with self.assertRaises(CustomerNotFoundError):
+            UpdateCustomer(self.repository).execute(customer_id=999, name="Nobody", email="nobody@nowhere.example")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UpdateCustomer(self.repository).execute(customer_id=created.id, name="Barrabus", email=taken.email)
+
+    def test_delete_hides_customer_until_purge_removes_its_rows(self):
+        created = self.create_use_case.execute(
+            name="Wulfgar",
+            email="wulfgar@icewind.example",
+            password="aegis123",
+        )
+        favorite_repo = DjangoFavoriteRepository()
+        product_gateway = StubProductGateway(
+            existing_ids={1, 2, 3},
+            details={product_id: {"title": f"Guenhwyvar {product_id}"} for product_id in (1, 2, 3)},
+        )
+        AddFavorites(favorite_repo, product_gateway).execute(customer_id=created.id, product_ids=[1, 2, 3])
+
+        # The soft-delete UPDATE and one popularity UPDATE in a savepoint, however
+        # many favorites the customer has.
+        with self.assertNumQueries(4):
+            DeleteCustomer(self.repository).execute(customer_id=created.id)
+
+        self.assertEqual(ListCustomers(self.repository).execute(), [])
+        with self.assertRaises(CustomerNotFoundError):
+            ListFavorites(favorite_repo, product_gateway).execute(customer_id=created.id)
+        with self.assertRaises(CustomerNotFoundError):
+            DeleteCustomer(self.repository).execute(customer_id=created.id)
+        self.assertFalse(Customer.objects.get(pk=created.id).is_active)
+        self.assertEqual(Favorite.objects.filter(customer_id=created.id).count(), 3)
+
+        progress = []
+        purged = PurgeDeletedCustomers(self.repository).execute(batch_size=2, progress=progress.append)
+
+        # Three favorites and three change log entries, two rows per batch; the
+        # last batch was full, so an empty one confirms nothing is left.
+        self.assertEqual(
+            [(step.purged_rows, step.completed) for step in progress],
+            [(2, False), (4, False), (6, False), (6, True)],
+        )
+        self.assertEqual([(result.customer_id, result.purged_rows) for result in purged], [(created.id, 6)])
+        self.assertFalse(Customer.objects.filter(pk=created.id).exists())
+        self.assertFalse(FavoriteChange.objects.filter(customer_id=created.id).exists())
+        self.assertEqual(PurgeDeletedCustomers(self.repository).execute(), [])
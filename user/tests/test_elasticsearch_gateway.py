@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+from elasticsearch import ConnectionError as TransportConnectionError
+
+from user.infrastructure.elasticsearch_gateway import ElasticsearchProductGateway
+
+
+class ElasticsearchProductGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.mget.return_value = {
+            "docs": [
+                {
+                    "_id": "3",
+                    "found": True,
+                    "_source": {
+                        "id": 3,
+                        "title": "Lightsaber Crystal",
+                        "image": "kyber.png",
+                        "price": 250.0,
+                        "rating": {"rate": 4.7},
+                    },
+                },
+                {"_id": "8", "found": False},
+            ]
+        }
+
+    def test_get_many_issues_single_filtered_mget(self):
+        gateway = ElasticsearchProductGateway(client=self.client, index="products")
+
+        details = gateway.get_many([3, 8, 3])
+
+        self.client.mget.assert_called_once_with(
+            index="products",
+            ids=["3", "8"],
+            source_includes=ElasticsearchProductGateway.SOURCE_FIELDS,
+        )
+        self.assertEqual(
+            details[3],
+            {
+                "id": 3,
+                "title": "Lightsaber Crystal",
+                "image": "kyber.png",
+                "price": 250.0,
+                "review": {"rate": 4.7},
+            },
+        )
+        self.assertIsNone(details[8])
+
+    def test_missing_documents_are_resolved_by_fallback(self):
+        fallback = MagicMock()
+        fallback.get_many.return_value = {8: {"title": "Holocron"}}
+        gateway = ElasticsearchProductGateway(client=self.client, index="products", fallback=fallback)
+
+        details = gateway.get_many([3, 8])
+
+        fallback.get_many.assert_called_once_with([8])
+        self.assertEqual(details[8], {"title": "Holocron"})
+
+    def test_exists_uses_the_index(self):
+        gateway = ElasticsearchProductGateway(client=self.client, index="products")
+
+        self.assertTrue(gateway.exists(3))
+
+    def test_transport_errors_become_runtime_errors(self):
+        self.client.mget.side_effect = TransportConnectionError("connection refused")
+        gateway = ElasticsearchProductGateway(client=self.client, index="products")
+
+        with self.assertRaises(RuntimeError):
+            gateway.get_details(3)
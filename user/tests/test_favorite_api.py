@@ -1,13 +1,22 @@
 import json
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from user.application import CreateCustomer
 from user.infrastructure.repositories import DjangoCustomerRepository
+from user.models import Favorite, ProductPopularity
+
+
+def patch_product_gateway():
+    return patch(
+        "user.interfaces.views.get_async_product_gateway",
+        new_callable=lambda: MagicMock(return_value=AsyncMock()),
+    )
 
 
 class FavoriteAPITests(TestCase):
@@ -24,8 +33,11 @@ class FavoriteAPITests(TestCase):
         access_token = RefreshToken.for_user(self.customer_model).access_token
         return {"HTTP_AUTHORIZATION": f"Bearer {access_token}"}
 
-    @patch("user.interfaces.views.FakeStoreProductGateway.exists", return_value=True)
-    def test_add_favorite_returns_201(self, exists_mock):
+    @patch_product_gateway()
+    def test_add_favorite_returns_201(self, get_gateway_mock):
+        get_details_mock = get_gateway_mock.return_value.get_details
+        get_details_mock.return_value = {"title": "Ring of Three Wishes", "image": "ring.png", "price": 10.0}
+
         response = self.client.post(
             reverse("favorite-list", args=[self.customer.id]),
             data=json.dumps({"product_id": 5}),
@@ -35,16 +47,31 @@ class FavoriteAPITests(TestCase):
 
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json()["product_id"], 5)
-        exists_mock.assert_called_once_with(5)
+        self.assertEqual(response.json()["title"], "Ring of Three Wishes")
+        get_details_mock.assert_awaited_once_with(5)
+
+    @patch_product_gateway()
+    def test_list_favorites_returns_503_when_product_service_fails(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_many.side_effect = RuntimeError("Could not reach product service")
+        Favorite.objects.create(customer_id=self.customer.id, product_id=3)
+
+        response = self.client.get(reverse("favorite-list", args=[self.customer.id]), **self._auth_headers())
+
+        self.assertEqual(response.status_code, 503)
 
     def test_list_favorites_requires_auth(self):
         response = self.client.get(reverse("favorite-list", args=[self.customer.id]))
         self.assertEqual(response.status_code, 401)
         self.assertIn("Authentication credentials", response.json()["error"])
 
-    @patch("user.interfaces.views.FakeStoreProductGateway.get_details")
-    @patch("user.interfaces.views.FakeStoreProductGateway.exists", return_value=True)
-    def test_list_favorites_returns_marked_products(self, _exists_mock, get_details_mock):
+    @patch_product_gateway()
+    def test_list_favorites_returns_marked_products(self, get_gateway_mock):
+        gateway = get_gateway_mock.return_value
+        gateway.get_details.side_effect = [
+            {"title": "Sunblade", "image": "sunblade.png", "price": 999.0, "review": {"rate": 4.9}},
+            {"title": "Mithral Armor", "image": "mithral_armor.png", "price": 499.0, "review": None},
+        ]
+
         self.client.post(
             reverse("favorite-list", args=[self.customer.id]),
             data=json.dumps({"product_id": 7}),
@@ -58,24 +85,169 @@ class FavoriteAPITests(TestCase):
             **self._auth_headers(),
         )
 
-        get_details_mock.side_effect = [
-            {"title": "Sunblade", "image": "sunblade.png", "price": 999.0, "review": {"rate": 4.9}},
-            {"title": "Mithral Armor", "image": "mithral_armor.png", "price": 499.0, "review": None},
-        ]
-
         response = self.client.get(reverse("favorite-list", args=[self.customer.id]), **self._auth_headers())
 
         self.assertEqual(response.status_code, 200)
-        payload = response.json()
+        payload = response.json()["results"]
+        self.assertIsNone(response.json()["next"])
         self.assertEqual({item["product_id"] for item in payload}, {7, 9})
         armor = next(item for item in payload if item["product_id"] == 9)
         self.assertEqual(armor["title"], "Mithral Armor")
         self.assertEqual(armor["image"], "mithral_armor.png")
         self.assertEqual(armor["price"], 499.0)
         self.assertIsNone(armor["review"])
+        gateway.get_many.assert_not_awaited()
+
+    def _create_snapshotted_favorites(self, product_ids):
+        return [
+            Favorite.objects.create(
+                customer_id=self.customer.id,
+                product_id=product_id,
+                title=f"Item {product_id}",
+                snapshot_at=timezone.now(),
+            )
+            for product_id in product_ids
+        ]
 
-    @patch("user.interfaces.views.FakeStoreProductGateway.exists", return_value=True)
-    def test_add_duplicate_favorite_returns_400(self, _exists_mock):
+    def test_list_favorites_paginates_with_cursor(self):
+        self._create_snapshotted_favorites([21, 22, 23, 24, 25])
+        url = reverse("favorite-list", args=[self.customer.id])
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["after"] = cursor
+            response = self.client.get(url, params, **self._auth_headers())
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["product_id"] for item in response.json()["results"])
+            pages += 1
+            cursor = response.json()["next"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [21, 22, 23, 24, 25])
+        self.assertEqual(pages, 3)
+
+    @patch_product_gateway()
+    def test_snapshot_backfill_keeps_the_served_etag(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_many.return_value = {3: {"title": "Bag of Holding"}}
+        Favorite.objects.create(customer_id=self.customer.id, product_id=3)
+        url = reverse("favorite-list", args=[self.customer.id])
+
+        first = self.client.get(url, **self._auth_headers())
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"], **self._auth_headers())
+
+        self.assertEqual(first.json()["results"][0]["title"], "Bag of Holding")
+        self.assertEqual(Favorite.objects.get().title, "Bag of Holding")
+        self.assertEqual(cached.status_code, 304)
+
+    @patch_product_gateway()
+    def test_list_favorites_answers_304_while_version_is_unchanged(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_details.return_value = {"title": "Cloak of Elvenkind"}
+        url = reverse("favorite-list", args=[self.customer.id])
+        self.client.post(
+            url,
+            data=json.dumps({"product_id": 11}),
+            content_type="application/json",
+            **self._auth_headers(),
+        )
+        first = self.client.get(url, **self._auth_headers())
+        headers = self._auth_headers()
+
+        # Authentication lookup plus the version lookup; favorites are not read.
+        with self.assertNumQueries(2):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"], **headers)
+        self.client.delete(reverse("favorite-detail", args=[self.customer.id, 11]), **headers)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"], **headers)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], first["ETag"])
+        get_gateway_mock.return_value.get_many.assert_not_awaited()
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertEqual(changed.json()["results"], [])
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_list_favorites_caps_page_size(self):
+        self._create_snapshotted_favorites([31, 32, 33, 34])
+
+        response = self.client.get(
+            reverse("favorite-list", args=[self.customer.id]),
+            {"limit": 1000},
+            **self._auth_headers(),
+        )
+
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertIsNotNone(response.json()["next"])
+
+    def test_list_favorites_rejects_invalid_cursor_and_limit(self):
+        url = reverse("favorite-list", args=[self.customer.id])
+
+        bad_cursor = self.client.get(url, {"after": "not-a-cursor"}, **self._auth_headers())
+        bad_limit = self.client.get(url, {"limit": 0}, **self._auth_headers())
+
+        self.assertEqual(bad_cursor.status_code, 400)
+        self.assertEqual(bad_cursor.json()["error"], "Invalid cursor.")
+        self.assertEqual(bad_limit.status_code, 400)
+
+    @patch_product_gateway()
+    def test_bulk_add_favorites_reports_each_product(self, get_gateway_mock):
+        self._create_snapshotted_favorites([41])
+        get_many_mock = get_gateway_mock.return_value.get_many
+        get_many_mock.return_value = {42: {"title": "Eye of Vecna"}, 43: None}
+
+        response = self.client.post(
+            reverse("favorite-bulk", args=[self.customer.id]),
+            data=json.dumps({"product_ids": [41, 42, 43]}),
+            content_type="application/json",
+            **self._auth_headers(),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"product_id": 41, "status": "duplicate"},
+                {"product_id": 42, "status": "added"},
+                {"product_id": 43, "status": "unknown_product"},
+            ],
+        )
+        get_many_mock.assert_awaited_once_with([42, 43])
+        self.assertTrue(Favorite.objects.filter(customer_id=self.customer.id, product_id=42).exists())
+
+    @patch_product_gateway()
+    def test_put_favorites_replaces_the_set(self, get_gateway_mock):
+        self._create_snapshotted_favorites([51, 52])
+        get_gateway_mock.return_value.get_many.return_value = {53: {"title": "Hand of Vecna"}}
+
+        response = self.client.put(
+            reverse("favorite-list", args=[self.customer.id]),
+            data=json.dumps({"product_ids": [52, 53]}),
+            content_type="application/json",
+            **self._auth_headers(),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"added": [53], "removed": [51], "unknown_products": []})
+        get_gateway_mock.return_value.get_many.assert_awaited_once_with([53])
+
+    def test_bulk_add_favorites_rejects_empty_payload(self):
+        response = self.client.post(
+            reverse("favorite-bulk", args=[self.customer.id]),
+            data=json.dumps({"product_ids": []}),
+            content_type="application/json",
+            **self._auth_headers(),
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch_product_gateway()
+    def test_add_duplicate_favorite_returns_400(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_details.return_value = {"title": "Cloak of Elvenkind"}
         payload = {"product_id": 8}
         self.client.post(
             reverse("favorite-list", args=[self.customer.id]),
@@ -94,8 +266,11 @@ class FavoriteAPITests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("already marked", response.json()["error"])
 
-    @patch("user.interfaces.views.FakeStoreProductGateway.exists", return_value=False)
-    def test_add_favorite_validates_external_product(self, exists_mock):
+    @patch_product_gateway()
+    def test_add_favorite_validates_external_product(self, get_gateway_mock):
+        get_details_mock = get_gateway_mock.return_value.get_details
+        get_details_mock.return_value = None
+
         response = self.client.post(
             reverse("favorite-list", args=[self.customer.id]),
             data=json.dumps({"product_id": 404}),
@@ -105,10 +280,11 @@ class FavoriteAPITests(TestCase):
 
         self.assertEqual(response.status_code, 404)
         self.assertIn("Product not found", response.json()["error"])
-        exists_mock.assert_called_once_with(404)
+        get_details_mock.assert_awaited_once_with(404)
 
-    @patch("user.interfaces.views.FakeStoreProductGateway.exists", return_value=True)
-    def test_remove_favorite_returns_204(self, _exists_mock):
+    @patch_product_gateway()
+    def test_remove_favorite_returns_204(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_details.return_value = {"title": "Cloak of Elvenkind"}
         self.client.post(
             reverse("favorite-list", args=[self.customer.id]),
             data=json.dumps({"product_id": 11}),
@@ -134,3 +310,217 @@ class FavoriteAPITests(TestCase):
 
         self.assertEqual(response.status_code, 404)
         self.assertIn("Favorite not found", response.json()["error"])
+
+    @patch_product_gateway()
+    def test_changes_feed_returns_changes_since_sequence(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_details.return_value = {"title": "Cloak of Elvenkind"}
+        for product_id in (11, 12):
+            self.client.post(
+                reverse("favorite-list", args=[self.customer.id]),
+                data=json.dumps({"product_id": product_id}),
+                content_type="application/json",
+                **self._auth_headers(),
+            )
+        url = reverse("favorite-changes", args=[self.customer.id])
+
+        first = self.client.get(url, {"limit": 1}, **self._auth_headers()).json()
+        self.client.delete(reverse("favorite-detail", args=[self.customer.id, 11]), **self._auth_headers())
+        rest = self.client.get(url, {"since": first["last_sequence"]}, **self._auth_headers()).json()
+
+        self.assertEqual([change["product_id"] for change in first["changes"]], [11])
+        self.assertTrue(first["has_more"])
+        self.assertEqual(
+            [(change["product_id"], change["action"]) for change in rest["changes"]],
+            [(12, "added"), (11, "removed")],
+        )
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(rest["last_sequence"], rest["changes"][-1]["sequence"])
+
+    def test_changes_feed_rejects_invalid_since(self):
+        response = self.client.get(
+            reverse("favorite-changes", args=[self.customer.id]),
+            {"since": "-1"},
+            **self._auth_headers(),
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid since", response.json()["error"])
+
+
+class FavoriteQueryBudgetTests(TestCase):
+    """Database round trips per favorites endpoint.
+
+    Each request pays one query to authenticate the token's user. Writes run in
+    ``transaction.atomic``, which shows up as SAVEPOINT/RELEASE inside a test
+    case and as BEGIN/COMMIT in production.
+    """
+
+    def setUp(self):
+        self.customer = CreateCustomer(DjangoCustomerRepository()).execute(
+            name="Caleb Widogast",
+            email="caleb@mightynein.example",
+            password="frumpkin123",
+        )
+        customer_model = get_user_model().objects.get(pk=self.customer.id)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(customer_model).access_token}"}
+        Favorite.objects.create(customer_id=self.customer.id, product_id=1, title="Item 1", snapshot_at=timezone.now())
+
+    def _json(self, method, url, payload):
+        return method(url, data=json.dumps(payload), content_type="application/json", **self.headers)
+
+    def test_list_favorites(self):
+        url = reverse("favorite-list", args=[self.customer.id])
+
+        # Authentication, favorites version, page (the customer check rides on the page query).
+        with self.assertNumQueries(3):
+            first = self.client.get(url, **self.headers)
+        # A repeated read is served from the favorite list cache.
+        with self.assertNumQueries(2):
+            self.client.get(url, **self.headers)
+        with self.assertNumQueries(2):
+            self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"], **self.headers)
+
+    @patch_product_gateway()
+    def test_add_and_remove_favorite(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_details.return_value = {"title": "Cloak of Elvenkind"}
+
+        # Authentication, then version bump (the customer check), insert, change log and
+        # popularity counter in one transaction.
+        with self.assertNumQueries(7):
+            added = self._json(self.client.post, reverse("favorite-list", args=[self.customer.id]), {"product_id": 2})
+        with self.assertNumQueries(7):
+            removed = self.client.delete(reverse("favorite-detail", args=[self.customer.id, 2]), **self.headers)
+
+        self.assertEqual((added.status_code, removed.status_code), (201, 204))
+
+    @patch_product_gateway()
+    def test_bulk_add_and_replace_favorites(self, get_gateway_mock):
+        get_gateway_mock.return_value.get_many.return_value = {2: {"title": "Item 2"}, 3: {"title": "Item 3"}}
+
+        # Authentication and stored ids, then version bump, stored ids re-read under
+        # the customer lock, insert, change log and popularity counters in one transaction.
+        with self.assertNumQueries(9):
+            bulk = self._json(
+                self.client.post,
+                reverse("favorite-bulk", args=[self.customer.id]),
+                {"product_ids": [1, 2, 3]},
+            )
+        get_gateway_mock.return_value.get_many.return_value = {}
+        # Same shape, with a delete of the dropped ids in place of the insert.
+        with self.assertNumQueries(9):
+            replaced = self._json(
+                self.client.put,
+                reverse("favorite-list", args=[self.customer.id]),
+                {"product_ids": [1, 2]},
+            )
+
+        self.assertEqual((bulk.status_code, replaced.status_code), (200, 200))
+
+    def test_changes_feed(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("favorite-changes", args=[self.customer.id]), **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+
+
+class MostFavoritedProductsAPITests(TestCase):
+    def setUp(self):
+        self.customer = CreateCustomer(DjangoCustomerRepository()).execute(
+            name="Jester Lavorre",
+            email="jester@mightynein.example",
+            password="traveler123",
+        )
+        customer_model = get_user_model().objects.get(pk=self.customer.id)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(customer_model).access_token}"}
+
+    def test_returns_products_by_favorite_count(self):
+        ProductPopularity.objects.bulk_create(
+            [
+                ProductPopularity(product_id=1, favorite_count=3),
+                ProductPopularity(product_id=2, favorite_count=7),
+                ProductPopularity(product_id=3, favorite_count=3),
+                ProductPopularity(product_id=4, favorite_count=0),
+            ]
+        )
+
+        # Authentication plus one index scan over the counters.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("product-most-favorited"), {"limit": 3}, **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item["product_id"], item["favorite_count"]) for item in response.json()["results"]],
+            [(2, 7), (1, 3), (3, 3)],
+        )
+
+    def test_requires_authentication(self):
+        response = self.client.get(reverse("product-most-favorited"))
+
+        self.assertEqual(response.status_code, 401)
+
+
+class ProductFavoritersAPITests(TestCase):
+    def setUp(self):
+        repository = DjangoCustomerRepository()
+        self.customers = [
+            CreateCustomer(repository).execute(
+                name=f"Caleb Widogast {index}",
+                email=f"caleb{index}@mightynein.example",
+                password="frumpkin123",
+            )
+            for index in range(3)
+        ]
+        Favorite.objects.bulk_create(
+            [Favorite(customer_id=customer.id, product_id=7) for customer in reversed(self.customers)]
+            + [Favorite(customer_id=self.customers[0].id, product_id=8)]
+        )
+        staff = get_user_model().objects.create_user(
+            name="Essek Thelyss",
+            email="essek@dynasty.example",
+            password="dunamancy123",
+            is_staff=True,
+        )
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(staff).access_token}"}
+
+    def _stream(self, response):
+        return [json.loads(line)["customer_id"] for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_streams_customer_ids_in_order_and_resumes_after_a_position(self):
+        customer_ids = [customer.id for customer in self.customers]
+        url = reverse("product-favoriters", args=[7])
+
+        response = self.client.get(url, **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(self._stream(response), customer_ids)
+        self.assertEqual(self._stream(self.client.get(url, {"after": customer_ids[0]}, **self.headers)), customer_ids[1:])
+
+    async def test_streams_asynchronously_under_asgi(self):
+        response = await self.async_client.get(
+            reverse("product-favoriters", args=[7]),
+            headers={"Authorization": self.headers["HTTP_AUTHORIZATION"]},
+        )
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(
+            [json.loads(line)["customer_id"] for line in content.splitlines()],
+            [customer.id for customer in self.customers],
+        )
+
+    def test_rejects_invalid_after(self):
+        response = self.client.get(reverse("product-favoriters", args=[7]), {"after": "-1"}, **self.headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_staff(self):
+        customer_model = get_user_model().objects.get(pk=self.customers[0].id)
+        token = RefreshToken.for_user(customer_model).access_token
+
+        response = self.client.get(
+            reverse("product-favoriters", args=[7]),
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 403)
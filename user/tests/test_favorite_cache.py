@@ -0,0 +1,100 @@
+from django.test import SimpleTestCase, TestCase
+
+from user.application import CreateCustomer, DeleteCustomer
+from user.application.favorite_use_cases import AddFavorite, GetFavoritesVersion, ListFavorites, RemoveFavorite
+from user.domain import FavoriteDTO, PageDTO
+from user.infrastructure.favorite_cache import VersionedFavoriteListCache
+from user.infrastructure.product_cache import LocalProductCache
+from user.infrastructure.repositories import DjangoCustomerRepository, DjangoFavoriteRepository
+from user.tests.test_favorite_use_cases import StubProductGateway
+
+
+def _page(*product_ids):
+    return PageDTO(
+        items=[FavoriteDTO(id=product_id, customer_id=1, product_id=product_id) for product_id in product_ids],
+    )
+
+
+class VersionedFavoriteListCacheTests(SimpleTestCase):
+    def test_pages_are_served_only_for_the_cached_version(self):
+        cache = VersionedFavoriteListCache()
+        cache.set(customer_id=1, version=3, after=None, limit=10, page=_page(7))
+
+        self.assertEqual(cache.get(customer_id=1, version=3, after=None, limit=10), _page(7))
+        self.assertIsNone(cache.get(customer_id=1, version=4, after=None, limit=10))
+        self.assertIsNone(cache.get(customer_id=1, version=3, after=7, limit=10))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 2))
+        self.assertAlmostEqual(cache.stats.hit_rate, 1 / 3)
+
+    def test_older_version_never_replaces_a_newer_entry(self):
+        cache = VersionedFavoriteListCache()
+        cache.set(customer_id=1, version=5, after=None, limit=10, page=_page(8))
+        cache.set(customer_id=1, version=4, after=None, limit=10, page=_page(7))
+
+        self.assertEqual(cache.get(customer_id=1, version=5, after=None, limit=10), _page(8))
+
+    def test_pages_per_customer_and_customers_are_bounded(self):
+        cache = VersionedFavoriteListCache(LocalProductCache(max_entries=1), max_pages_per_customer=2)
+        for after in (None, 1, 2):
+            cache.set(customer_id=1, version=1, after=after, limit=1, page=_page(after or 0))
+        cache.set(customer_id=2, version=1, after=None, limit=1, page=_page(9))
+
+        self.assertIsNone(cache.get(customer_id=1, version=1, after=2, limit=1))
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.size, 1)
+
+
+class CachedFavoriteListTests(TestCase):
+    def setUp(self):
+        self.favorite_repo = DjangoFavoriteRepository()
+        self.cache = VersionedFavoriteListCache()
+        self.product_gateway = StubProductGateway(
+            existing_ids={1, 2},
+            details={
+                1: {"title": "Ring of Three Wishes", "image": "ring.png", "price": 900.0, "review": None},
+                2: {"title": "Helm of Brilliance", "image": "helm.png", "price": 450.0, "review": None},
+            },
+        )
+        self.customer = CreateCustomer(DjangoCustomerRepository()).execute(
+            name="Tenser",
+            email="tenser@greyhawk.example",
+            password="disk12345",
+        )
+        AddFavorite(self.favorite_repo, self.product_gateway, cache=self.cache).execute(
+            customer_id=self.customer.id,
+            product_id=1,
+        )
+
+    def _list_page(self):
+        version = GetFavoritesVersion(self.favorite_repo).execute(customer_id=self.customer.id)
+        return ListFavorites(self.favorite_repo, self.product_gateway, cache=self.cache).execute_page(
+            customer_id=self.customer.id,
+            limit=10,
+            version=version,
+        )
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        first = self._list_page()
+
+        # Only the version lookup reaches the database.
+        with self.assertNumQueries(1):
+            second = self._list_page()
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.cache.stats.hits, 1)
+
+    def test_writes_invalidate_the_customer_entry(self):
+        self._list_page()
+        AddFavorite(self.favorite_repo, self.product_gateway, cache=self.cache).execute(
+            customer_id=self.customer.id,
+            product_id=2,
+        )
+        self.assertEqual(self.cache.stats.size, 0)
+        self.assertEqual([favorite.product_id for favorite in self._list_page().items], [1, 2])
+
+        RemoveFavorite(self.favorite_repo, cache=self.cache).execute(customer_id=self.customer.id, product_id=1)
+        self.assertEqual(self.cache.stats.size, 0)
+        self.assertEqual([favorite.product_id for favorite in self._list_page().items], [2])
+
+        DeleteCustomer(DjangoCustomerRepository(), favorite_cache=self.cache).execute(customer_id=self.customer.id)
+        self.assertEqual(self.cache.stats.size, 0)
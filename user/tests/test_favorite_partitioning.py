@@ -0,0 +1,130 @@
+import re
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from user.application import CreateCustomer, DeleteCustomer, PurgeDeletedCustomers
+from user.application.favorite_use_cases import AddFavorites, ListFavorites, RemoveFavorite, SyncFavorites
+from user.infrastructure import FavoritePartitioner
+from user.infrastructure.repositories import DjangoCustomerRepository, DjangoFavoriteRepository
+from user.models import Favorite
+from user.tests.test_favorite_use_cases import StubProductGateway
+
+
+class FavoritePartitioningTests(TestCase):
+    def setUp(self):
+        self.favorite_repo = DjangoFavoriteRepository()
+        self.product_gateway = StubProductGateway(
+            existing_ids={1, 2, 3, 4},
+            details={product_id: {"title": f"Scroll {product_id}"} for product_id in (1, 2, 3, 4)},
+        )
+        self.customers = [
+            CreateCustomer(DjangoCustomerRepository()).execute(
+                name=f"Rary {index}",
+                email=f"rary{index}@greyhawk.example",
+                password="lightning123",
+            )
+            for index in range(3)
+        ]
+        for customer in self.customers:
+            AddFavorites(self.favorite_repo, self.product_gateway).execute(customer_id=customer.id, product_ids=[1, 2])
+
+    def _partitions_scanned(self, fn):
+        with CaptureQueriesContext(connection) as queries:
+            fn()
+        partitions = set()
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if '"user_favorite"' not in query["sql"]:
+                    continue
+                cursor.execute(f"EXPLAIN {query['sql']}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                partitions.update(re.findall(r"user_favorite_p\d+", plan))
+        return partitions
+
+    def test_backfill_and_swap_keep_concurrent_writes(self):
+        call_command("partition_favorites", partitions=4, batch_size=2, stdout=StringIO())
+        # Writes between the backfill and the swap reach the shadow through the trigger.
+        SyncFavorites(self.favorite_repo, self.product_gateway).execute(
+            customer_id=self.customers[0].id,
+            product_ids=[2, 3],
+        )
+        Favorite.objects.filter(customer_id=self.customers[1].id, product_id=1).update(title="Chain Lightning")
+        expected = sorted(Favorite.objects.values_list("id", "customer_id", "product_id", "title"))
+
+        call_command("partition_favorites", swap=True, stdout=StringIO())
+
+        self.assertTrue(FavoritePartitioner().is_partitioned())
+        self.assertEqual(sorted(Favorite.objects.values_list("id", "customer_id", "product_id", "title")), expected)
+        AddFavorites(self.favorite_repo, self.product_gateway).execute(customer_id=self.customers[2].id, product_ids=[4])
+        self.assertGreater(Favorite.objects.get(customer_id=self.customers[2].id, product_id=4).id, expected[-1][0])
+
+        DeleteCustomer(DjangoCustomerRepository()).execute(customer_id=self.customers[1].id)
+        PurgeDeletedCustomers(DjangoCustomerRepository()).execute()
+        self.assertFalse(Favorite.objects.filter(customer_id=self.customers[1].id).exists())
+
+    def test_per_customer_operations_touch_one_partition(self):
+        partitioner = FavoritePartitioner()
+        partitioner.prepare(partitions=8)
+        partitioner.backfill()
+        partitioner.swap()
+        customer_id = self.customers[0].id
+
+        scans = [
+            self._partitions_scanned(
+                lambda: ListFavorites(self.favorite_repo, self.product_gateway).execute(customer_id=customer_id)
+            ),
+            self._partitions_scanned(
+                lambda: self.favorite_repo.existing_product_ids(customer_id=customer_id, product_ids=[1, 3])
+            ),
+            self._partitions_scanned(
+                lambda: RemoveFavorite(self.favorite_repo).execute(customer_id=customer_id, product_id=1)
+            ),
+        ]
+
+        for partitions in scans:
+            self.assertEqual(len(partitions), 1, partitions)
+
+    def _indexes(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT index_class.relname, pg_index.indisprimary, pg_get_indexdef(pg_index.indexrelid)
+                FROM pg_index JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+                WHERE pg_index.indrelid = to_regclass(%s)
+                """,
+                [table],
+            )
+            return {
+                name: (primary, re.sub(r"^.* USING ", "USING ", definition))
+                for name, primary, definition in cursor.fetchall()
+            }
+
+    def test_swap_keeps_every_index_and_widens_the_primary_key(self):
+        before = self._indexes("user_favorite")
+        partitioner = FavoritePartitioner()
+        partitioner.prepare(partitions=2)
+        partitioner.backfill()
+        partitioner.swap()
+
+        after = self._indexes("user_favorite")
+
+        self.assertEqual(set(after), set(before))
+        self.assertTrue(any(name.startswith("user_favorite_customer_id_") for name in after))
+        for name, (primary, definition) in before.items():
+            if primary:
+                self.assertEqual(after[name], (True, "USING btree (id, customer_id)"))
+            else:
+                self.assertEqual(after[name], (False, definition))
+
+    def test_prepare_refuses_an_already_partitioned_table(self):
+        partitioner = FavoritePartitioner()
+        partitioner.prepare(partitions=2)
+        self.assertFalse(partitioner.prepare(partitions=2))
+        partitioner.swap()
+
+        with self.assertRaises(RuntimeError):
+            partitioner.prepare(partitions=2)
@@ -1,15 +1,48 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from user.application import CreateCustomer
-from user.application.favorite_use_cases import AddFavorite, ListFavorites, RemoveFavorite
-from user.domain.exceptions import FavoriteAlreadyExistsError, FavoriteNotFoundError, ProductNotFoundError
+from user.application import CreateCustomer, PurgeDeletedCustomers
+from user.application.favorite_use_cases import (
+    AddFavorite,
+    AddFavorites,
+    AsyncAddFavorite,
+    AsyncListFavorites,
+    CompactFavoriteChanges,
+    ExportProductFavoriters,
+    ListMostFavoritedProducts,
+    ReconcileProductPopularity,
+    GetFavoritesVersion,
+    ListFavoriteChanges,
+    ListFavorites,
+    RefreshFavoriteSnapshots,
+    RemoveFavorite,
+    SyncFavorites,
+)
+from user.domain.exceptions import (
+    CustomerNotFoundError,
+    FavoriteAlreadyExistsError,
+    FavoriteNotFoundError,
+    ProductNotFoundError,
+)
 from user.infrastructure.repositories import DjangoCustomerRepository, DjangoFavoriteRepository
+from user.domain import BulkFavoriteResultDTO
+from user.models import Favorite, FavoriteChange, ProductPopularity
 
 
 class StubProductGateway:
     def __init__(self, existing_ids=None, details=None):
         self.existing_ids = set(existing_ids or [])
         self.details = details or {}
+        self.get_many_calls = []
+        self.failing = False
 
     def exists(self, product_id: int) -> bool:
         return product_id in self.existing_ids
@@ -17,6 +50,23 @@ class StubProductGateway:
     def get_details(self, product_id: int):
         return self.details.get(product_id)
 
+    def get_many(self, product_ids):
+        self.get_many_calls.append(list(product_ids))
+        if self.failing:
+            raise RuntimeError("Could not reach product service")
+        return {product_id: self.details.get(product_id) for product_id in product_ids}
+
+
+class AsyncStubProductGateway(StubProductGateway):
+    async def exists(self, product_id: int) -> bool:
+        return super().exists(product_id)
+
+    async def get_details(self, product_id: int):
+        return super().get_details(product_id)
+
+    async def get_many(self, product_ids):
+        return super().get_many(product_ids)
+
 
 class FavoriteUseCaseTests(TestCase):
     def setUp(self):
@@ -59,6 +109,99 @@ class FavoriteUseCaseTests(TestCase):
         with self.assertRaises(FavoriteAlreadyExistsError):
             use_case.execute(customer_id=self.customer.id, product_id=2)
 
+    def test_add_favorites_reports_status_per_product(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+        use_case = AddFavorites(self.favorite_repo, self.product_gateway)
+
+        # Existing ids (with the customer check), then version bump, existing ids again
+        # under the customer lock, favorites, change log and popularity counters in one savepoint.
+        with self.assertNumQueries(8):
+            results = use_case.execute(customer_id=self.customer.id, product_ids=[1, 2, 3, 99, 2])
+
+        self.assertEqual(
+            [(result.product_id, result.status) for result in results],
+            [(1, "duplicate"), (2, "added"), (3, "added"), (99, "unknown_product")],
+        )
+        self.assertEqual(self.product_gateway.get_many_calls, [[2, 3, 99]])
+        self.assertEqual(Favorite.objects.get(product_id=3).title, "Bag of Holding")
+
+    def test_sync_favorites_applies_minimal_diff(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=self.customer.id, product_id=2)
+        self.product_gateway.get_many_calls.clear()
+
+        # Stored ids, then version bump, stored ids again under the customer lock,
+        # insert, delete, change log and popularity counters in one savepoint.
+        with self.assertNumQueries(9):
+            result = SyncFavorites(self.favorite_repo, self.product_gateway).execute(
+                customer_id=self.customer.id,
+                product_ids=[2, 3, 99],
+            )
+
+        self.assertEqual(result.added, [3])
+        self.assertEqual(result.removed, [1])
+        self.assertEqual(result.unknown_products, [99])
+        self.assertEqual(self.product_gateway.get_many_calls, [[3, 99]])
+        self.assertEqual(
+            sorted(Favorite.objects.filter(customer_id=self.customer.id).values_list("product_id", flat=True)),
+            [2, 3],
+        )
+
+    def _during_validation(self, use_case):
+        """Make the next batched validation race with ``use_case`` run by another request."""
+        get_many = self.product_gateway.get_many
+
+        def racing_get_many(product_ids):
+            self.product_gateway.get_many = get_many
+            use_case()
+            return get_many(product_ids)
+
+        self.product_gateway.get_many = racing_get_many
+
+    def test_add_favorites_skips_ids_added_concurrently(self):
+        self._during_validation(
+            lambda: AddFavorite(self.favorite_repo, self.product_gateway).execute(
+                customer_id=self.customer.id, product_id=2
+            )
+        )
+
+        results = AddFavorites(self.favorite_repo, self.product_gateway).execute(
+            customer_id=self.customer.id, product_ids=[1, 2]
+        )
+
+        self.assertEqual(
+            [result.status for result in results],
+            [BulkFavoriteResultDTO.ADDED, BulkFavoriteResultDTO.DUPLICATE],
+        )
+        self.assertEqual(ProductPopularity.objects.get(product_id=2).favorite_count, 1)
+        self.assertEqual(FavoriteChange.objects.filter(product_id=2).count(), 1)
+
+    def test_sync_favorites_skips_changes_made_concurrently(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+        self._during_validation(
+            lambda: RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=1)
+        )
+
+        result = SyncFavorites(self.favorite_repo, self.product_gateway).execute(
+            customer_id=self.customer.id, product_ids=[2]
+        )
+
+        self.assertEqual((result.added, result.removed), ([2], []))
+        self.assertEqual(FavoriteChange.objects.filter(product_id=1, action=FavoriteChange.REMOVED).count(), 1)
+        self.assertEqual(ProductPopularity.objects.get(product_id=1).favorite_count, 0)
+
+    def test_sync_favorites_without_changes_writes_nothing(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+
+        with self.assertNumQueries(1):
+            result = SyncFavorites(self.favorite_repo, self.product_gateway).execute(
+                customer_id=self.customer.id,
+                product_ids=[1],
+            )
+
+        self.assertEqual((result.added, result.removed), ([], []))
+
     def test_list_favorites_returns_all_for_customer(self):
         add = AddFavorite(self.favorite_repo, self.product_gateway)
         add.execute(customer_id=self.customer.id, product_id=1)
@@ -75,6 +218,139 @@ class FavoriteUseCaseTests(TestCase):
         self.assertEqual(favorite.price, 199.99)
         self.assertEqual(favorite.review, {"rate": 5})
 
+    def test_list_favorites_serves_stored_snapshots(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+        self.product_gateway.details[1] = {"title": "Vorpal Sword +1"}
+
+        favorites = ListFavorites(self.favorite_repo, self.product_gateway, snapshot_max_age=60).execute(
+            customer_id=self.customer.id
+        )
+
+        self.assertEqual(favorites[0].title, "Vorpal Sword")
+        self.assertEqual(self.product_gateway.get_many_calls, [])
+
+    def test_list_favorites_refreshes_stale_snapshots(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+        Favorite.objects.update(snapshot_at=timezone.now() - timedelta(hours=2))
+        self.product_gateway.details[1] = {"title": "Vorpal Sword +1"}
+
+        favorites = ListFavorites(self.favorite_repo, self.product_gateway, snapshot_max_age=3600).execute(
+            customer_id=self.customer.id
+        )
+
+        self.assertEqual(favorites[0].title, "Vorpal Sword +1")
+        self.assertEqual(self.product_gateway.get_many_calls, [[1]])
+        self.assertEqual(Favorite.objects.get().title, "Vorpal Sword +1")
+
+    def test_list_favorites_refreshes_only_the_requesting_customer(self):
+        other = CreateCustomer(self.customer_repo).execute(
+            name="Tenser", email="tenser@greyhawk.example", password="wizard456"
+        )
+        for customer_id in (self.customer.id, other.id):
+            AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=customer_id, product_id=1)
+        Favorite.objects.update(snapshot_at=timezone.now() - timedelta(hours=2))
+        self.product_gateway.details[1] = {"title": "Vorpal Sword +1"}
+        versions = GetFavoritesVersion(self.favorite_repo)
+        own_version = versions.execute(customer_id=self.customer.id)
+        other_version = versions.execute(customer_id=other.id)
+
+        ListFavorites(self.favorite_repo, self.product_gateway, snapshot_max_age=3600).execute(
+            customer_id=self.customer.id
+        )
+
+        self.assertEqual(Favorite.objects.get(customer_id=self.customer.id).title, "Vorpal Sword +1")
+        self.assertEqual(Favorite.objects.get(customer_id=other.id).title, "Vorpal Sword")
+        # The listing already served the new details, so its ETag stays valid.
+        self.assertEqual(versions.execute(customer_id=self.customer.id), own_version)
+        self.assertEqual(versions.execute(customer_id=other.id), other_version)
+
+    def test_list_favorites_does_not_retry_unknown_products_until_stale(self):
+        Favorite.objects.create(customer_id=self.customer.id, product_id=404)
+        use_case = ListFavorites(self.favorite_repo, self.product_gateway, snapshot_max_age=3600)
+
+        for _ in range(2):
+            favorites = use_case.execute(customer_id=self.customer.id)
+
+        self.assertIsNone(favorites[0].title)
+        self.assertEqual(self.product_gateway.get_many_calls, [[404]])
+        self.assertIsNotNone(Favorite.objects.get().snapshot_at)
+
+    def test_list_favorites_serves_stale_snapshots_when_gateway_fails(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=1)
+        Favorite.objects.update(snapshot_at=timezone.now() - timedelta(hours=2))
+        self.product_gateway.failing = True
+
+        favorites = ListFavorites(self.favorite_repo, self.product_gateway, snapshot_max_age=3600).execute(
+            customer_id=self.customer.id
+        )
+
+        self.assertEqual(favorites[0].title, "Vorpal Sword")
+
+    def test_list_page_only_enriches_the_page(self):
+        for product_id in (1, 2, 3):
+            Favorite.objects.create(customer_id=self.customer.id, product_id=product_id)
+        use_case = ListFavorites(self.favorite_repo, self.product_gateway)
+
+        first = use_case.execute_page(customer_id=self.customer.id, limit=2)
+        second = use_case.execute_page(customer_id=self.customer.id, limit=2, after=first.next_after)
+
+        self.assertEqual([fav.product_id for fav in first.items], [1, 2])
+        self.assertEqual([fav.product_id for fav in second.items], [3])
+        self.assertIsNone(second.next_after)
+        self.assertEqual(self.product_gateway.get_many_calls, [[1, 2], [3]])
+
+    def test_refresh_snapshots_updates_stale_rows_in_batches(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        for product_id in (1, 2, 3):
+            add.execute(customer_id=self.customer.id, product_id=product_id)
+        Favorite.objects.filter(product_id__in=[1, 2]).update(snapshot_at=timezone.now() - timedelta(days=2))
+        self.product_gateway.details[1] = {"title": "Vorpal Sword +2"}
+
+        updated = RefreshFavoriteSnapshots(self.favorite_repo, self.product_gateway).execute(
+            max_age=86400,
+            batch_size=1,
+        )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.product_gateway.get_many_calls, [[1], [2]])
+        self.assertEqual(Favorite.objects.get(product_id=1).title, "Vorpal Sword +2")
+
+    def test_batch_refresh_commits_per_customer_batch(self):
+        other = CreateCustomer(self.customer_repo).execute(
+            name="Tenser", email="tenser@greyhawk.example", password="wizard456"
+        )
+        for customer_id in (self.customer.id, other.id):
+            AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=customer_id, product_id=1)
+        Favorite.objects.create(customer_id=other.id, product_id=404)
+        versions = GetFavoritesVersion(self.favorite_repo)
+        before = {customer_id: versions.execute(customer_id=customer_id) for customer_id in (self.customer.id, other.id)}
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = self.favorite_repo.save_snapshots(
+                {1: {"title": "Vorpal Sword +3"}, 404: None},
+                customer_batch_size=1,
+            )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(set(Favorite.objects.filter(product_id=1).values_list("title", flat=True)), {"Vorpal Sword +3"})
+        self.assertIsNotNone(Favorite.objects.get(product_id=404).snapshot_at)
+        for customer_id, version in before.items():
+            self.assertEqual(versions.execute(customer_id=customer_id), version + 1)
+        # One transaction per customer, plus the one finding no customers left.
+        self.assertEqual(sum(query["sql"].startswith("SAVEPOINT") for query in queries.captured_queries), 3)
+
+    def test_refresh_command_refreshes_every_snapshot(self):
+        AddFavorite(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_id=2)
+        out = StringIO()
+
+        with patch(
+            "user.management.commands.refresh_favorite_snapshots.get_product_gateway",
+            return_value=self.product_gateway,
+        ):
+            call_command("refresh_favorite_snapshots", "--all", stdout=out)
+
+        self.assertIn("Refreshed 1 favorite snapshot(s).", out.getvalue())
+
     def test_remove_favorite_deletes_entry(self):
         add = AddFavorite(self.favorite_repo, self.product_gateway)
         add.execute(customer_id=self.customer.id, product_id=3)
@@ -89,3 +365,215 @@ class FavoriteUseCaseTests(TestCase):
     def test_remove_favorite_raises_when_missing(self):
         with self.assertRaises(FavoriteNotFoundError):
             RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=77)
+
+    def test_repository_reads_check_the_customer_in_the_same_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.favorite_repo.list(customer_id=self.customer.id), [])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.favorite_repo.existing_product_ids(customer_id=self.customer.id), set())
+        with self.assertNumQueries(1), self.assertRaises(CustomerNotFoundError):
+            self.favorite_repo.list(customer_id=self.customer.id + 1000)
+        with self.assertNumQueries(1), self.assertRaises(CustomerNotFoundError):
+            self.favorite_repo.changes_since(customer_id=self.customer.id + 1000)
+
+    def test_repository_writes_reject_unknown_customers(self):
+        missing_id = self.customer.id + 1000
+
+        with self.assertRaises(CustomerNotFoundError):
+            self.favorite_repo.add(customer_id=missing_id, product_id=1, details={"title": "Vorpal Sword"})
+        with self.assertRaises(CustomerNotFoundError):
+            self.favorite_repo.remove(customer_id=missing_id, product_id=1)
+        with self.assertRaises(CustomerNotFoundError):
+            self.favorite_repo.add_many(customer_id=missing_id, details_by_product_id={1: {"title": "Vorpal Sword"}})
+
+        self.assertFalse(Favorite.objects.filter(customer_id=missing_id).exists())
+
+    def test_favorites_version_is_bumped_by_every_write(self):
+        version = GetFavoritesVersion(self.favorite_repo)
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        initial = version.execute(customer_id=self.customer.id)
+
+        add.execute(customer_id=self.customer.id, product_id=1)
+        after_add = version.execute(customer_id=self.customer.id)
+        with self.assertRaises(FavoriteAlreadyExistsError):
+            add.execute(customer_id=self.customer.id, product_id=1)
+        after_duplicate = version.execute(customer_id=self.customer.id)
+        RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=1)
+
+        self.assertEqual(after_add, initial + 1)
+        self.assertEqual(after_duplicate, after_add)
+        self.assertEqual(version.execute(customer_id=self.customer.id), initial + 2)
+
+    def _popularity(self):
+        return [
+            (product.product_id, product.favorite_count)
+            for product in ListMostFavoritedProducts(self.favorite_repo).execute(limit=10)
+        ]
+
+    def test_popularity_follows_every_favorite_write(self):
+        other = CreateCustomer(self.customer_repo).execute(
+            name="Bigby",
+            email="bigby@greyhawk.example",
+            password="hand12345",
+        )
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=other.id, product_id=1)
+        AddFavorites(self.favorite_repo, self.product_gateway).execute(customer_id=self.customer.id, product_ids=[2, 3])
+        RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=3)
+        self.assertEqual(self._popularity(), [(1, 2), (2, 1)])
+
+        SyncFavorites(self.favorite_repo, self.product_gateway).execute(customer_id=other.id, product_ids=[2, 3])
+        self.assertEqual(self._popularity(), [(2, 2), (1, 1), (3, 1)])
+
+        self.customer_repo.delete(other.id)
+        self.assertEqual(self._popularity(), [(1, 1), (2, 1)])
+        self.assertEqual(ReconcileProductPopularity(self.favorite_repo).execute(), 0)
+        PurgeDeletedCustomers(self.customer_repo).execute(batch_size=1)
+        self.assertEqual(self._popularity(), [(1, 1), (2, 1)])
+
+    def test_reconcile_corrects_drifted_counters(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=self.customer.id, product_id=2)
+        ProductPopularity.objects.filter(product_id=1).update(favorite_count=5)
+        ProductPopularity.objects.filter(product_id=2).delete()
+        ProductPopularity.objects.create(product_id=3, favorite_count=2)
+
+        corrected = ReconcileProductPopularity(self.favorite_repo).execute(batch_size=2)
+
+        self.assertEqual(corrected, 3)
+        self.assertEqual(self._popularity(), [(1, 1), (2, 1)])
+        self.assertEqual(ReconcileProductPopularity(self.favorite_repo).execute(), 0)
+
+    def test_reconcile_pages_over_sparse_product_ids(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        Favorite.objects.create(customer_id=self.customer.id, product_id=10**9)
+        ProductPopularity.objects.create(product_id=10**9, favorite_count=1)
+
+        # One short batch holding both ids: two keyset reads, a savepoint, the
+        # locked counters, the recount and the release.
+        with self.assertNumQueries(6):
+            corrected = ReconcileProductPopularity(self.favorite_repo).execute(batch_size=1000)
+
+        self.assertEqual(corrected, 0)
+
+    def test_favoriters_are_read_in_bounded_keyset_batches(self):
+        customers = [self.customer] + [
+            CreateCustomer(self.customer_repo).execute(
+                name=f"Otiluke {index}",
+                email=f"otiluke{index}@greyhawk.example",
+                password="sphere123",
+            )
+            for index in range(4)
+        ]
+        Favorite.objects.bulk_create([Favorite(customer_id=customer.id, product_id=1) for customer in customers[1:]])
+        Favorite.objects.create(customer_id=self.customer.id, product_id=2)
+        customer_ids = [customer.id for customer in customers[1:]]
+
+        # Two full batches of two plus the empty batch that ends the walk.
+        with self.assertNumQueries(3):
+            favoriters = list(ExportProductFavoriters(self.favorite_repo).execute(product_id=1, batch_size=2))
+        resumed = ExportProductFavoriters(self.favorite_repo).execute(product_id=1, after=customer_ids[1])
+
+        self.assertEqual(favoriters, customer_ids)
+        self.assertEqual(list(resumed), customer_ids[2:])
+
+    def test_deleted_customers_are_not_listed_as_favoriters(self):
+        other = CreateCustomer(self.customer_repo).execute(
+            name="Drawmij", email="drawmij@greyhawk.example", password="instant123"
+        )
+        for customer_id in (self.customer.id, other.id):
+            Favorite.objects.create(customer_id=customer_id, product_id=1)
+
+        self.customer_repo.delete(other.id)
+
+        self.assertEqual(list(ExportProductFavoriters(self.favorite_repo).execute(product_id=1)), [self.customer.id])
+
+    def test_changes_are_logged_and_paged_by_sequence(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=self.customer.id, product_id=2)
+        RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=1)
+        SyncFavorites(self.favorite_repo, self.product_gateway).execute(
+            customer_id=self.customer.id,
+            product_ids=[3],
+        )
+        use_case = ListFavoriteChanges(self.favorite_repo)
+
+        first = use_case.execute(customer_id=self.customer.id, limit=3)
+        rest = use_case.execute(customer_id=self.customer.id, since=first.next_after, limit=3)
+
+        self.assertEqual(
+            [(change.product_id, change.action) for change in first.items],
+            [(1, "added"), (2, "added"), (1, "removed")],
+        )
+        self.assertEqual(
+            [(change.product_id, change.action) for change in rest.items],
+            [(3, "added"), (2, "removed")],
+        )
+        self.assertIsNone(rest.next_after)
+
+    def test_failed_writes_are_not_logged(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        add.execute(customer_id=self.customer.id, product_id=1)
+
+        with self.assertRaises(FavoriteAlreadyExistsError):
+            add.execute(customer_id=self.customer.id, product_id=1)
+        with self.assertRaises(FavoriteNotFoundError):
+            RemoveFavorite(self.favorite_repo).execute(customer_id=self.customer.id, product_id=2)
+
+        page = ListFavoriteChanges(self.favorite_repo).execute(customer_id=self.customer.id)
+        self.assertEqual([change.product_id for change in page.items], [1])
+
+    def test_compaction_keeps_latest_change_per_product(self):
+        add = AddFavorite(self.favorite_repo, self.product_gateway)
+        remove = RemoveFavorite(self.favorite_repo)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=self.customer.id, product_id=2)
+        remove.execute(customer_id=self.customer.id, product_id=1)
+        add.execute(customer_id=self.customer.id, product_id=1)
+        remove.execute(customer_id=self.customer.id, product_id=2)
+
+        deleted = CompactFavoriteChanges(self.favorite_repo).execute(batch_size=2)
+
+        page = ListFavoriteChanges(self.favorite_repo).execute(customer_id=self.customer.id)
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            [(change.product_id, change.action) for change in page.items],
+            [(1, "added"), (2, "removed")],
+        )
+
+
+class AsyncFavoriteUseCaseTests(TestCase):
+    def setUp(self):
+        self.favorite_repo = DjangoFavoriteRepository()
+        self.product_gateway = AsyncStubProductGateway(
+            existing_ids={4},
+            details={4: {"title": "Wand of Wonder", "image": "wand.png", "price": 300.0, "review": None}},
+        )
+        self.customer = CreateCustomer(DjangoCustomerRepository()).execute(
+            name="Elminster",
+            email="elminster@realms.example",
+            password="sage12345",
+        )
+
+    def test_async_add_and_list_favorites(self):
+        async_to_sync(AsyncAddFavorite(self.favorite_repo, self.product_gateway).execute)(
+            customer_id=self.customer.id,
+            product_id=4,
+        )
+
+        favorites = async_to_sync(AsyncListFavorites(self.favorite_repo, self.product_gateway).execute)(
+            customer_id=self.customer.id
+        )
+
+        self.assertEqual([fav.product_id for fav in favorites], [4])
+        self.assertEqual(favorites[0].title, "Wand of Wonder")
+
+    def test_async_add_favorite_requires_valid_product(self):
+        use_case = AsyncAddFavorite(self.favorite_repo, self.product_gateway)
+
+        with self.assertRaises(ProductNotFoundError):
+            async_to_sync(use_case.execute)(customer_id=self.customer.id, product_id=5)
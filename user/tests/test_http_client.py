@@ -0,0 +1,78 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from user.infrastructure.http_client import PooledHTTPClient
+from user.infrastructure.product_gateway import FakeStoreProductGateway
+
+
+class _ProductHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        if self.path == "/products/1":
+            status, body = 200, json.dumps({"id": 1, "title": "Portable Hole", "rating": {"rate": 4.1}})
+        elif self.path == "/products/500":
+            status, body = 500, ""
+        else:
+            status, body = 404, ""
+        encoded = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledHTTPClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ProductHandler)
+        self.server.client_ports = set()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def test_sequential_requests_reuse_one_connection(self):
+        client = PooledHTTPClient(self.base_url, pool_size=2)
+        self.addCleanup(client.close)
+
+        for _ in range(5):
+            response = client.get("/products/1")
+            self.assertEqual(response.status, 200)
+
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_keep_alive_disabled_opens_a_connection_per_request(self):
+        client = PooledHTTPClient(self.base_url, keep_alive=False)
+
+        client.get("/products/1")
+        client.get("/products/1")
+
+        self.assertEqual(len(self.server.client_ports), 2)
+
+    def test_gateway_maps_responses(self):
+        client = PooledHTTPClient(self.base_url)
+        self.addCleanup(client.close)
+        gateway = FakeStoreProductGateway(http_client=client)
+
+        self.assertEqual(gateway.get_details(1)["title"], "Portable Hole")
+        self.assertEqual(gateway.get_details(1)["review"], {"rate": 4.1})
+        self.assertIsNone(gateway.get_details(2))
+        with self.assertRaises(RuntimeError):
+            gateway.get_details(500)
+
+    def test_gateway_reports_unreachable_service(self):
+        client = PooledHTTPClient("http://127.0.0.1:9", connect_timeout=0.5)
+        gateway = FakeStoreProductGateway(http_client=client)
+
+        with self.assertRaises(RuntimeError):
+            gateway.get_details(1)
+
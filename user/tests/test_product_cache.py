@@ -0,0 +1,170 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from user.infrastructure.product_cache import (
+    CachedProductGateway,
+    DjangoProductCache,
+    LocalProductCache,
+    bump_catalog_generation,
+)
+from user.infrastructure.signals import product_catalog_synced
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingProductGateway:
+    def __init__(self, details):
+        self.details = details
+        self.detail_calls = []
+        self.batch_calls = []
+
+    def exists(self, product_id: int) -> bool:
+        return self.get_details(product_id) is not None
+
+    def get_details(self, product_id: int):
+        self.detail_calls.append(product_id)
+        return self.details.get(product_id)
+
+    def get_many(self, product_ids):
+        product_ids = list(product_ids)
+        self.batch_calls.append(product_ids)
+        return {product_id: self.details.get(product_id) for product_id in product_ids}
+
+
+class LocalProductCacheTests(SimpleTestCase):
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LocalProductCache(ttl=10, clock=clock)
+        cache.set_many({1: {"title": "Ioun Stone"}})
+
+        clock.now = 9
+        self.assertEqual(cache.get_many([1]), {1: {"title": "Ioun Stone"}})
+
+        clock.now = 10
+        self.assertEqual(cache.get_many([1]), {})
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalProductCache(max_entries=2)
+        cache.set_many({1: "a", 2: "b"})
+        cache.get_many([1])
+        cache.set_many({3: "c"})
+
+        self.assertEqual(cache.get_many([1, 2, 3]), {1: "a", 3: "c"})
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.size, 2)
+
+
+class DjangoProductCacheTests(SimpleTestCase):
+    def tearDown(self):
+        caches["default"].clear()
+
+    def test_clear_only_drops_product_entries(self):
+        backend = caches["default"]
+        backend.set("unrelated", "kept")
+        cache = DjangoProductCache(ttl=60)
+        cache.set_many({1: {"title": "Bag of Tricks"}})
+
+        cache.clear()
+
+        self.assertEqual(cache.get_many([1]), {})
+        self.assertEqual(backend.get("unrelated"), "kept")
+
+
+class CachedProductGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.inner = CountingProductGateway(
+            {
+                1: {"title": "Cloak of Elvenkind"},
+                2: {"title": "Boots of Speed"},
+            }
+        )
+        self.gateway = CachedProductGateway(self.inner, LocalProductCache(ttl=60))
+
+    def test_repeated_lookups_are_served_from_cache(self):
+        self.assertTrue(self.gateway.exists(1))
+        self.assertEqual(self.gateway.get_details(1), {"title": "Cloak of Elvenkind"})
+
+        self.assertEqual(self.inner.detail_calls, [1])
+        self.assertEqual(self.gateway.stats.hits, 1)
+        self.assertEqual(self.gateway.stats.misses, 1)
+
+    def test_get_many_only_fetches_missing_products(self):
+        self.gateway.get_details(1)
+
+        details = self.gateway.get_many([1, 2, 3])
+
+        self.assertEqual(
+            details,
+            {1: {"title": "Cloak of Elvenkind"}, 2: {"title": "Boots of Speed"}, 3: None},
+        )
+        self.assertEqual(self.inner.batch_calls, [[2, 3]])
+
+    def test_unknown_products_are_not_cached(self):
+        self.assertFalse(self.gateway.exists(3))
+        self.assertFalse(self.gateway.exists(3))
+
+        self.assertEqual(self.inner.detail_calls, [3, 3])
+
+
+class NegativeProductCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.inner = CountingProductGateway({1: {"title": "Wand of Wonder"}})
+        self.gateway = CachedProductGateway(
+            self.inner,
+            LocalProductCache(ttl=300, clock=self.clock),
+            LocalProductCache(max_entries=2, ttl=30, clock=self.clock),
+        )
+
+    def test_unknown_product_is_remembered_until_ttl(self):
+        self.assertFalse(self.gateway.exists(404))
+        self.assertFalse(self.gateway.exists(404))
+        self.assertEqual(self.inner.detail_calls, [404])
+
+        self.clock.now = 30
+        self.assertFalse(self.gateway.exists(404))
+        self.assertEqual(self.inner.detail_calls, [404, 404])
+
+    def test_get_many_skips_known_missing_products(self):
+        self.gateway.get_many([1, 404])
+
+        details = self.gateway.get_many([1, 404, 405])
+
+        self.assertEqual(details, {1: {"title": "Wand of Wonder"}, 404: None, 405: None})
+        self.assertEqual(self.inner.batch_calls, [[1, 404], [405]])
+
+    def test_missing_entries_never_evict_known_products(self):
+        self.gateway.exists(1)
+        for product_id in (500, 501, 502):
+            self.gateway.exists(product_id)
+
+        self.assertTrue(self.gateway.exists(1))
+        self.assertEqual(self.inner.detail_calls.count(1), 1)
+        self.assertEqual(self.gateway.stats.evictions, 0)
+        self.assertEqual(self.gateway.negative_stats.evictions, 1)
+
+    def test_new_catalog_generation_expires_missing_entries(self):
+        self.gateway.exists(404)
+
+        # What a sync in another process leaves behind in the shared cache.
+        bump_catalog_generation()
+        self.gateway.exists(404)
+        self.gateway.exists(404)
+
+        self.assertEqual(self.inner.detail_calls, [404, 404])
+
+    def test_catalog_sync_clears_missing_entries(self):
+        self.gateway.exists(404)
+
+        product_catalog_synced.send(sender=self.__class__)
+        self.gateway.exists(404)
+
+        self.assertEqual(self.inner.detail_calls, [404, 404])
@@ -0,0 +1,94 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from user.infrastructure.product_gateway import FakeStoreProductGateway, ProductServiceBusy, ProductServiceTimeout
+
+
+class FakeStoreProductGatewayTests(SimpleTestCase):
+    def test_get_many_fetches_each_unique_product_once(self):
+        gateway = FakeStoreProductGateway(max_workers=4)
+
+        with patch.object(
+            FakeStoreProductGateway,
+            "get_details",
+            side_effect=lambda product_id: {"id": product_id} if product_id != 3 else None,
+        ) as get_details_mock:
+            details = gateway.get_many([1, 2, 3, 2])
+
+        self.assertEqual(details, {1: {"id": 1}, 2: {"id": 2}, 3: None})
+        self.assertEqual(get_details_mock.call_count, 3)
+
+    def test_get_many_runs_lookups_concurrently(self):
+        gateway = FakeStoreProductGateway(max_workers=3)
+        barrier = threading.Barrier(3, timeout=2)
+
+        def slow_lookup(product_id):
+            barrier.wait()
+            return {"id": product_id}
+
+        with patch.object(FakeStoreProductGateway, "get_details", side_effect=slow_lookup):
+            details = gateway.get_many([1, 2, 3])
+
+        self.assertEqual(set(details), {1, 2, 3})
+
+    def test_get_many_raises_when_deadline_expires(self):
+        gateway = FakeStoreProductGateway(max_workers=2, batch_deadline=0.05)
+
+        def stalled_lookup(product_id):
+            time.sleep(0.5)
+            return {"id": product_id}
+
+        with patch.object(FakeStoreProductGateway, "get_details", side_effect=stalled_lookup):
+            with self.assertRaises(ProductServiceTimeout):
+                gateway.get_many([1, 2])
+
+    def test_batches_share_one_bounded_worker_pool(self):
+        gateway = FakeStoreProductGateway(max_workers=2)
+        threads = set()
+
+        def lookup(product_id):
+            threads.add(threading.current_thread())
+            return {"id": product_id}
+
+        with patch.object(FakeStoreProductGateway, "get_details", side_effect=lookup):
+            for start in range(0, 12, 3):
+                gateway.get_many(range(start, start + 3))
+
+        self.assertLessEqual(len(threads), 2)
+
+    def test_batch_queued_behind_a_saturated_pool_reports_busy(self):
+        gateway = FakeStoreProductGateway(max_workers=1, batch_deadline=0.05)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stalled_lookup(product_id):
+            release.wait(timeout=2)
+            return {"id": product_id}
+
+        with patch.object(FakeStoreProductGateway, "get_details", side_effect=stalled_lookup):
+            with self.assertRaises(ProductServiceTimeout):
+                gateway.get_many([1])
+            with self.assertRaises(ProductServiceBusy):
+                gateway.get_many([2])
+
+    def test_get_many_propagates_service_errors(self):
+        gateway = FakeStoreProductGateway()
+
+        with patch.object(
+            FakeStoreProductGateway,
+            "get_details",
+            side_effect=RuntimeError("Could not reach product service"),
+        ):
+            with self.assertRaises(RuntimeError):
+                gateway.get_many([1])
+
+    def test_get_many_with_no_ids_skips_the_network(self):
+        gateway = FakeStoreProductGateway()
+
+        with patch.object(FakeStoreProductGateway, "get_details") as get_details_mock:
+            self.assertEqual(gateway.get_many([]), {})
+
+        get_details_mock.assert_not_called()
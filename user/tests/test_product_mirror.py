@@ -0,0 +1,130 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from user.infrastructure.product_cache import catalog_generation
+from user.infrastructure.product_mirror import DjangoProductGateway, sync_product_catalog
+from user.infrastructure.signals import product_catalog_synced
+from user.models import Product
+
+
+def product_payload(product_id, title, price=10.0):
+    return {
+        "id": product_id,
+        "title": title,
+        "description": f"{title} from the Yawning Portal.",
+        "category": "wondrous items",
+        "image": f"{product_id}.png",
+        "price": price,
+        "rating": {"rate": 4.5, "count": 12},
+    }
+
+
+class StubFallbackGateway:
+    def __init__(self, details=None):
+        self.details = details or {}
+        self.batch_calls = []
+
+    def exists(self, product_id):
+        return product_id in self.details
+
+    def get_details(self, product_id):
+        return self.details.get(product_id)
+
+    def get_many(self, product_ids):
+        product_ids = list(product_ids)
+        self.batch_calls.append(product_ids)
+        return {product_id: self.details.get(product_id) for product_id in product_ids}
+
+
+class ProductCatalogSyncTests(TestCase):
+    def test_sync_creates_updates_and_prunes(self):
+        sync_product_catalog([product_payload(1, "Flame Tongue"), product_payload(2, "Frost Brand")])
+
+        result = sync_product_catalog([product_payload(1, "Flame Tongue"), product_payload(3, "Dancing Sword")])
+
+        self.assertEqual((result.created, result.updated, result.unchanged, result.deleted), (1, 0, 1, 1))
+        self.assertEqual(set(Product.objects.values_list("id", flat=True)), {1, 3})
+
+    def test_sync_refuses_to_prune_from_a_truncated_catalog(self):
+        sync_product_catalog([product_payload(product_id, f"Item {product_id}") for product_id in range(1, 5)])
+
+        for payloads in ([], [product_payload(1, "Item 1 renamed")]):
+            with self.assertRaisesMessage(RuntimeError, "Refusing to prune"):
+                sync_product_catalog(payloads)
+
+        self.assertEqual(Product.objects.count(), 4)
+        self.assertEqual(Product.objects.get(pk=1).title, "Item 1")
+        self.assertEqual(sync_product_catalog([], prune=False).deleted, 0)
+
+    def test_sync_only_rewrites_changed_products(self):
+        sync_product_catalog([product_payload(1, "Flame Tongue"), product_payload(2, "Frost Brand")])
+        synced_at = Product.objects.get(pk=1).synced_at
+
+        result = sync_product_catalog(
+            [product_payload(1, "Flame Tongue"), product_payload(2, "Frost Brand", price=12.5)]
+        )
+
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 1, 1))
+        self.assertEqual(Product.objects.get(pk=1).synced_at, synced_at)
+        self.assertEqual(float(Product.objects.get(pk=2).price), 12.5)
+
+    def test_sync_emits_catalog_synced_signal(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(sender)
+
+        product_catalog_synced.connect(receiver)
+        self.addCleanup(product_catalog_synced.disconnect, receiver)
+
+        sync_product_catalog([product_payload(1, "Flame Tongue")])
+
+        self.assertEqual(received, [Product])
+
+    def test_sync_bumps_shared_catalog_generation(self):
+        generation = catalog_generation()
+
+        sync_product_catalog([product_payload(1, "Flame Tongue")])
+
+        self.assertNotEqual(catalog_generation(), generation)
+
+    @patch("user.management.commands.sync_products.FakeStoreProductGateway.fetch_catalog")
+    def test_command_syncs_remote_catalog(self, fetch_catalog_mock):
+        fetch_catalog_mock.return_value = [product_payload(4, "Holy Avenger")]
+        out = StringIO()
+
+        call_command("sync_products", stdout=out)
+
+        self.assertTrue(Product.objects.filter(pk=4, title="Holy Avenger").exists())
+        self.assertIn("1 created", out.getvalue())
+
+
+class DjangoProductGatewayTests(TestCase):
+    def setUp(self):
+        sync_product_catalog([product_payload(1, "Flame Tongue"), product_payload(2, "Frost Brand")])
+
+    def test_reads_details_from_mirror(self):
+        gateway = DjangoProductGateway()
+
+        details = gateway.get_details(1)
+
+        self.assertEqual(details["title"], "Flame Tongue")
+        self.assertEqual(details["price"], 10.0)
+        self.assertEqual(details["review"], {"rate": 4.5, "count": 12})
+        self.assertTrue(gateway.exists(2))
+        self.assertFalse(gateway.exists(3))
+
+    def test_get_many_uses_one_query_and_falls_back_on_misses(self):
+        fallback = StubFallbackGateway({9: {"title": "Sword of Kas"}})
+        gateway = DjangoProductGateway(fallback=fallback)
+
+        with self.assertNumQueries(1):
+            details = gateway.get_many([1, 2, 9, 10])
+
+        self.assertEqual(details[1]["title"], "Flame Tongue")
+        self.assertEqual(details[9], {"title": "Sword of Kas"})
+        self.assertIsNone(details[10])
+        self.assertEqual(fallback.batch_calls, [[9, 10]])
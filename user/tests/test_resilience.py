@@ -0,0 +1,244 @@
+import threading
+from concurrent.futures import Executor, Future
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.infrastructure.async_gateway import SyncToAsyncProductGateway
+from user.infrastructure.product_cache import DjangoProductCache, LocalProductCache
+from user.infrastructure.product_gateway import FakeStoreProductGateway, ProductServiceBusy, ProductServiceTimeout
+from user.infrastructure.product_mirror import DjangoProductGateway
+from user.infrastructure.providers import (
+    build_async_product_gateway,
+    build_product_gateway,
+    get_product_gateway,
+    reset_product_gateway,
+)
+from user.infrastructure.resilience import CircuitBreaker, CircuitState, ResilientProductGateway
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+class FlakyProductGateway:
+    def __init__(self, details):
+        self.details = details
+        self.failing = False
+        self.error = RuntimeError("Could not reach product service")
+        self.calls = []
+        self.threads = []
+
+    def exists(self, product_id):
+        return self.get_details(product_id) is not None
+
+    def get_details(self, product_id):
+        return self.get_many([product_id]).get(product_id)
+
+    def get_many(self, product_ids):
+        product_ids = list(product_ids)
+        self.calls.append(product_ids)
+        self.threads.append(threading.current_thread())
+        if self.failing:
+            raise self.error
+        return {product_id: self.details.get(product_id) for product_id in product_ids}
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        with self.assertLogs("user.infrastructure.resilience", level="WARNING"):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe_reopens_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        with self.assertLogs("user.infrastructure.resilience", level="WARNING"):
+            breaker.record_failure()
+
+        clock.now = 10
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+
+class ResilientProductGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.inner = FlakyProductGateway({1: {"title": "Staff of the Magi"}})
+        self.gateway = ResilientProductGateway(
+            self.inner,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=self.clock),
+            stale_cache=LocalProductCache(ttl=3600, clock=self.clock),
+            fresh_ttl=60,
+            executor=InlineExecutor(),
+            clock=self.clock,
+        )
+
+    def test_fresh_details_are_served_without_upstream_call(self):
+        self.gateway.get_details(1)
+        self.clock.now = 59
+
+        self.assertEqual(self.gateway.get_details(1), {"title": "Staff of the Magi"})
+        self.assertEqual(self.inner.calls, [[1]])
+        self.assertEqual(self.gateway.stats.stale_served, 0)
+
+    def test_stale_details_are_served_and_refreshed_in_background(self):
+        self.gateway.get_details(1)
+        self.inner.details[1] = {"title": "Staff of Power"}
+        self.clock.now = 61
+
+        self.assertEqual(self.gateway.get_details(1), {"title": "Staff of the Magi"})
+        self.assertEqual(self.gateway.get_details(1), {"title": "Staff of Power"})
+        self.assertEqual(self.gateway.stats.stale_served, 1)
+        self.assertEqual(self.gateway.stats.background_refreshes, 1)
+
+    def test_open_circuit_serves_stale_and_fails_fast_otherwise(self):
+        self.gateway.get_details(1)
+        self.inner.failing = True
+        self.clock.now = 61
+
+        with self.assertLogs("user.infrastructure.resilience", level="WARNING"):
+            self.assertEqual(self.gateway.get_details(1), {"title": "Staff of the Magi"})
+        self.assertEqual(self.gateway.stats.state, "open")
+
+        with self.assertRaises(RuntimeError):
+            self.gateway.get_details(2)
+        self.assertEqual(self.gateway.stats.short_circuited, 1)
+        self.assertEqual(self.inner.calls, [[1], [1]])
+
+    def test_half_open_probe_closes_circuit(self):
+        self.inner.failing = True
+        with self.assertLogs("user.infrastructure.resilience", level="WARNING"):
+            with self.assertRaises(RuntimeError):
+                self.gateway.get_details(1)
+
+        self.inner.failing = False
+        self.clock.now = 30
+
+        self.assertEqual(self.gateway.get_details(1), {"title": "Staff of the Magi"})
+        self.assertEqual(self.gateway.stats.state, "closed")
+
+    def test_foreground_lookups_run_on_the_calling_thread(self):
+        self.gateway.get_details(1)
+
+        self.assertEqual(self.inner.threads, [threading.current_thread()])
+
+    def test_upstream_timeouts_open_the_circuit(self):
+        self.inner.failing = True
+        self.inner.error = ProductServiceTimeout("Product service timed out")
+
+        with self.assertLogs("user.infrastructure.resilience", level="WARNING"):
+            with self.assertRaises(RuntimeError):
+                self.gateway.get_details(1)
+
+        self.assertEqual(self.gateway.stats.timeouts, 1)
+        self.assertEqual(self.gateway.stats.state, "open")
+
+    def test_local_saturation_does_not_trip_the_breaker(self):
+        self.inner.failing = True
+        self.inner.error = ProductServiceBusy("No free connection to the product service")
+
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.gateway.get_details(1)
+
+        self.assertEqual(self.gateway.stats.state, "closed")
+        self.assertEqual(self.gateway.stats.timeouts, 0)
+
+
+class ProductGatewayStatsAPITests(TestCase):
+    def test_staff_can_read_gateway_stats(self):
+        staff = get_user_model().objects.create_user(
+            name="Tasha",
+            email="tasha@greyhawk.example",
+            password="hideous123",
+            is_staff=True,
+        )
+        token = RefreshToken.for_user(staff).access_token
+
+        response = self.client.get(
+            reverse("product-gateway-stats"),
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["resilience"]["state"], "closed")
+        self.assertIn("hits", response.json()["cache"])
+        self.assertIn("hit_rate", response.json()["favorite_list_cache"])
+
+    def test_stats_require_staff(self):
+        customer = get_user_model().objects.create_user(
+            name="Iggwilv",
+            email="iggwilv@greyhawk.example",
+            password="witch123",
+        )
+        token = RefreshToken.for_user(customer).access_token
+
+        response = self.client.get(
+            reverse("product-gateway-stats"),
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+class BuildProductGatewayTests(SimpleTestCase):
+    def test_resilience_layer_sits_below_the_cache(self):
+        gateway = build_product_gateway({"cache_backend": "local", "resilience_enabled": True})
+
+        self.assertIsInstance(gateway.inner, ResilientProductGateway)
+
+    def test_database_backend_only_protects_the_remote_fallback(self):
+        gateway = build_product_gateway({"backend": "database", "cache_backend": "", "resilience_enabled": True})
+
+        self.assertIsInstance(gateway, DjangoProductGateway)
+        self.assertIsInstance(gateway.inner, ResilientProductGateway)
+        self.assertIsInstance(gateway.inner.inner, FakeStoreProductGateway)
+
+    def test_async_gateway_shares_the_blocking_stack(self):
+        reset_product_gateway()
+        self.addCleanup(reset_product_gateway)
+
+        gateway = build_async_product_gateway()
+
+        self.assertIsInstance(gateway, SyncToAsyncProductGateway)
+        self.assertIs(gateway.inner, get_product_gateway())
+
+    def test_async_gateway_follows_the_gateway_settings(self):
+        gateway = build_async_product_gateway({"cache_backend": "django", "resilience_enabled": True})
+
+        self.assertIsInstance(gateway.inner._cache, DjangoProductCache)
+        self.assertIsInstance(gateway.inner.inner, ResilientProductGateway)
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from user.infrastructure.product_gateway import FakeStoreProductGateway
+from user.infrastructure.single_flight import SingleFlight
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time")
+        time.sleep(0.001)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def _run_concurrently(self, flight, fn, callers=5):
+        started = threading.Event()
+        release = threading.Event()
+
+        def leader_fn():
+            started.set()
+            release.wait(timeout=2)
+            return fn()
+
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            leader = executor.submit(flight.do, "key", leader_fn)
+            started.wait(timeout=2)
+            followers = [executor.submit(flight.do, "key", fn) for _ in range(callers - 1)]
+            wait_until(lambda: flight.stats.collapsed == callers - 1)
+            release.set()
+            return [leader] + followers
+
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        futures = self._run_concurrently(flight, lambda: calls.append(1) or "ring of three wishes")
+
+        self.assertEqual({future.result() for future in futures}, {"ring of three wishes"})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats.calls, 1)
+        self.assertEqual(flight.stats.collapsed, 4)
+
+    def test_concurrent_threads_share_the_error(self):
+        flight = SingleFlight()
+
+        def failing():
+            raise RuntimeError("Could not reach product service")
+
+        futures = self._run_concurrently(flight, failing, callers=3)
+
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result()
+
+    def test_sequential_calls_are_not_collapsed(self):
+        flight = SingleFlight()
+
+        flight.do("key", lambda: 1)
+        flight.do("key", lambda: 2)
+
+        self.assertEqual(flight.stats.calls, 2)
+        self.assertEqual(flight.stats.collapsed, 0)
+
+    async def test_concurrent_tasks_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"title": "Decanter of Endless Water"}
+
+        results = await asyncio.gather(*(flight.do_async(7, fetch) for _ in range(10)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {"title": "Decanter of Endless Water"} for result in results))
+        self.assertEqual(flight.stats.collapsed, 9)
+
+    async def test_concurrent_tasks_share_the_error(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Could not reach product service")
+
+        results = await asyncio.gather(
+            *(flight.do_async(7, fetch) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+
+class FakeStoreSingleFlightTests(SimpleTestCase):
+    def test_gateway_collapses_concurrent_lookups_for_same_product(self):
+        gateway = FakeStoreProductGateway()
+        release = threading.Event()
+        fetched = []
+
+        def slow_fetch(product_id):
+            fetched.append(product_id)
+            release.wait(timeout=2)
+            return {"id": product_id}
+
+        gateway._fetch_details = slow_fetch
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(gateway.get_details, 3) for _ in range(4)]
+            wait_until(lambda: gateway.single_flight_stats.collapsed == 3)
+            release.set()
+
+        self.assertEqual([future.result() for future in futures], [{"id": 3}] * 4)
+        self.assertEqual(fetched, [3])
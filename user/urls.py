@@ -2,22 +2,54 @@ from django.urls import path
 
 from user.interfaces.views import (
     CustomerDetailView,
+    CustomerExportView,
     CustomerListCreateView,
+    FavoriteBulkCreateView,
+    FavoriteChangesView,
     FavoriteDetailView,
     FavoriteListCreateView,
+    MostFavoritedProductsView,
+    ProductFavoritersView,
+    ProductGatewayStatsView,
 )
 
 urlpatterns = [
     path("users/", CustomerListCreateView.as_view(), name="user-list"),
+    path("users/export/", CustomerExportView.as_view(), name="user-export"),
     path("users/<int:customer_id>/", CustomerDetailView.as_view(), name="user-detail"),
     path(
         "users/<int:customer_id>/favorites/",
         FavoriteListCreateView.as_view(),
         name="favorite-list",
     ),
+    path(
+        "users/<int:customer_id>/favorites/bulk/",
+        FavoriteBulkCreateView.as_view(),
+        name="favorite-bulk",
+    ),
+    path(
+        "users/<int:customer_id>/favorites/changes/",
+        FavoriteChangesView.as_view(),
+        name="favorite-changes",
+    ),
     path(
         "users/<int:customer_id>/favorites/<int:product_id>/",
         FavoriteDetailView.as_view(),
         name="favorite-detail",
     ),
+    path(
+        "products/most-favorited/",
+        MostFavoritedProductsView.as_view(),
+        name="product-most-favorited",
+    ),
+    path(
+        "products/<int:product_id>/favorited-by/",
+        ProductFavoritersView.as_view(),
+        name="product-favoriters",
+    ),
+    path(
+        "product-gateway/stats/",
+        ProductGatewayStatsView.as_view(),
+        name="product-gateway-stats",
+    ),
 ]
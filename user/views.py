@@ -1,13 +1,25 @@
 from user.interfaces.views import (
     CustomerDetailView,
+    CustomerExportView,
     CustomerListCreateView,
+    FavoriteBulkCreateView,
+    FavoriteChangesView,
     FavoriteDetailView,
     FavoriteListCreateView,
+    MostFavoritedProductsView,
+    ProductFavoritersView,
+    ProductGatewayStatsView,
 )
 
 __all__ = [
     "CustomerListCreateView",
     "CustomerDetailView",
+    "CustomerExportView",
     "FavoriteListCreateView",
+    "FavoriteBulkCreateView",
+    "FavoriteChangesView",
     "FavoriteDetailView",
+    "MostFavoritedProductsView",
+    "ProductFavoritersView",
+    "ProductGatewayStatsView",
 ]